@@ -0,0 +1,415 @@
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+import argparse
+from solana.rpc.async_api import AsyncClient
+from dotenv import load_dotenv
+
+from blockhash_provider import BlockhashProvider
+from confirmations import COMMITMENT_LEVELS, ConfirmationTracker
+from create import (
+    PumpTokenCreator,
+    EVENT_AUTHORITY,
+    build_metadata,
+    get_storage,
+    metadata_to_data_uri,
+)
+from images import DEFAULT_TARGET_FORMAT, TARGET_FORMATS, ImagePreprocessor
+from lookup_table import DEFAULT_TABLE_PATH, attach_lookup_table
+from priority_fees import DEFAULT_FEE_CAP, DEFAULT_FEE_POLICY, FEE_POLICIES, PriorityFeeEstimator
+from rate_limit import BLOCKHASH_NOT_FOUND, backoff_delay, get_limiter, limiter_stats
+from rpc_router import RpcRouter
+from storage import file_content_type
+from vanity import KeyPool
+import tracing
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_CONCURRENCY = 4
+
+def load_manifest(path):
+    """
+    Load a launch manifest from a JSONL or CSV file.
+
+    Each entry describes one token: name, symbol, description, image (local
+    path or URL), optional socials (telegram, website, twitter), dev_buy in SOL
+    and an optional creator address.
+
+    Args:
+        path (str): Path to a .jsonl/.json or .csv manifest
+
+    Returns:
+        list: List of manifest entries (dict)
+    """
+    entries = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                entries.append({k.strip(): (v or "").strip() for k, v in row.items() if k})
+    else:
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON ({e})")
+
+    for index, entry in enumerate(entries):
+        missing = [k for k in ("name", "symbol", "image") if not entry.get(k)]
+        if missing:
+            raise ValueError(f"Manifest entry {index} is missing: {', '.join(missing)}")
+        try:
+            entry["dev_buy"] = float(entry.get("dev_buy") or 0)
+        except ValueError:
+            raise ValueError(f"Manifest entry {index} has an invalid dev_buy: {entry.get('dev_buy')}")
+        if entry["dev_buy"] < 0:
+            raise ValueError(f"Manifest entry {index} has a negative dev_buy")
+    return entries
+
+
+class BatchLauncher:
+    """
+    Launch many tokens concurrently from a manifest.
+
+    Each launch runs the full pipeline (image upload, metadata upload, global
+    state lookup, blockhash, signing and sending) on an AsyncClient. The number
+    of launches in flight is bounded by the concurrency setting.
+    """
+    def __init__(self, private_key=None, rpc_url=None, concurrency=DEFAULT_CONCURRENCY, max_retries=3,
+                 blockhash_provider=None, global_state=None, key_pool=None, storage=None,
+                 image_preprocessor=None, confirm_commitment=None, priority_fees=None,
+                 subscribe_global_state=False, subscribe_signatures=False, ws_url=None):
+        """
+        Initialize the BatchLauncher.
+
+        Args:
+            private_key (str, optional): Base58 encoded private key
+            rpc_url (str or list, optional): Custom RPC URL for Solana connection, or several
+                (list or comma-separated) to route over with an RpcRouter
+            concurrency (int): Maximum number of launches in flight
+            max_retries (int): Attempts per launch on "Blockhash not found"
+            blockhash_provider (BlockhashProvider, optional): Shared blockhash source;
+                one is created (and started during run()) when omitted
+            global_state (GlobalStateCache, optional): Shared cache of the Pump global account
+            key_pool (KeyPool, optional): Pool of pre-ground vanity mint keypairs
+            storage (StorageClient, optional): Upload backend (defaults to the shared Pinata client)
+            image_preprocessor (ImagePreprocessor, optional): Process pool that shrinks local
+                images before upload (images are uploaded as-is if None)
+            confirm_commitment (str, optional): If set ("processed", "confirmed" or "finalized"),
+                wait for each launch to reach it; signatures are polled in batches
+            priority_fees (PriorityFeeEstimator, optional): Source of the compute unit price
+                (started during run(); no priority fee is paid if None)
+            subscribe_global_state (bool): Keep the global account current through an
+                accountSubscribe websocket (see PumpTokenCreator)
+            subscribe_signatures (bool): With confirm_commitment, also resolve confirmations
+                through signatureSubscribe notifications as well as polling
+            ws_url (str, optional): Websocket RPC URL for subscriptions (derived from the
+                RPC URL if None)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.creator = PumpTokenCreator(
+            private_key=private_key, rpc_url=rpc_url, global_state=global_state, key_pool=key_pool,
+            priority_fees=priority_fees, subscribe_global_state=subscribe_global_state, ws_url=ws_url,
+        )
+        self.rpc_url = self.creator.rpc_url
+        self.router = self.creator.client if isinstance(self.creator.client, RpcRouter) else None
+        self.blockhash_provider = blockhash_provider or BlockhashProvider(client=self.creator.client)
+        self.creator.blockhash_provider = self.blockhash_provider
+        self.storage = storage or get_storage()
+        self.image_preprocessor = image_preprocessor
+        self.confirmation_tracker = None
+        if confirm_commitment:
+            self.confirmation_tracker = ConfirmationTracker(
+                self.creator.client, commitment=confirm_commitment, blockhash_provider=self.blockhash_provider,
+                ws_url=self.creator.ws_url if subscribe_signatures else None,
+            )
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    async def _fetch_global_state(self):
+        try:
+            return await self.creator.global_state.get_async()
+        except Exception as e:
+            print(f"Error retrieving global state: {str(e)}")
+        return None
+
+    async def _resolve_image(self, entry):
+        image = entry["image"]
+        if not os.path.exists(image):
+            return image, None
+        if self.image_preprocessor is None:
+            # Uploaded unchanged: record the real type, not a guess from the extension-less gateway URI
+            image_type = await asyncio.to_thread(file_content_type, image)
+            return await asyncio.wrap_future(self.storage.submit_file(image, image_type)), image_type
+        processed = await asyncio.wrap_future(self.image_preprocessor.submit(image))
+        uri = await asyncio.wrap_future(
+            self.storage.submit_bytes(processed.data, processed.filename, processed.mime_type)
+        )
+        return uri, processed.mime_type
+
+    async def _resolve_metadata_uri(self, entry, image_uri, image_type):
+        metadata = build_metadata(
+            entry["name"], entry["symbol"], entry.get("description", ""), image_uri,
+            entry.get("telegram", ""), entry.get("website", ""), entry.get("twitter", ""),
+            image_type,
+        )
+        try:
+            return await asyncio.wrap_future(self.storage.submit_json(metadata))
+        except Exception as e:
+            print(f"Error uploading metadata to IPFS: {str(e)}")
+            return metadata_to_data_uri(metadata)
+
+    async def launch_one(self, client, index, entry):
+        """
+        Run the full launch pipeline for a single manifest entry.
+
+        Args:
+            client (AsyncClient): Shared async RPC client
+            index (int): Position of the entry in the manifest
+            entry (dict): Manifest entry
+
+        Returns:
+            dict: Result record for this launch
+        """
+        started = time.perf_counter()
+        record = {"index": index, "name": entry["name"], "symbol": entry["symbol"]}
+        mint_keypair = None
+        with tracing.span("launch", index=index, symbol=entry["symbol"]) as launch_span:
+            try:
+                with tracing.span("upload_image"):
+                    image_uri, image_type = await self._resolve_image(entry)
+                with tracing.span("upload_metadata"):
+                    metadata_uri = await self._resolve_metadata_uri(entry, image_uri, image_type)
+                creator_key = self.creator.resolve_creator(entry.get("creator") or None)
+                dev_buy_amount = entry["dev_buy"]
+                mint_keypair = await asyncio.to_thread(self.creator.new_mint_keypair)
+
+                for attempt in range(1, self.max_retries + 1):
+                    try:
+                        with tracing.span("attempt", attempt=attempt):
+                            with tracing.span("global_state"):
+                                global_state = await self._fetch_global_state()
+                            fee_recipient = global_state.fee_recipient if global_state else EVENT_AUTHORITY
+                            with tracing.span("build_instructions"):
+                                buy_quote = self.creator.quote_dev_buy(dev_buy_amount, global_state)
+                                instructions, pdas = self.creator.build_instructions(
+                                    mint_keypair, entry["name"], entry["symbol"], metadata_uri,
+                                    dev_buy_amount, creator_key, fee_recipient, buy_quote
+                                )
+                            if self.creator.priority_fees is not None:
+                                # May sample over the network, so it stays off the event loop
+                                price = await asyncio.to_thread(self.creator.priority_fee, fee_recipient)
+                            else:
+                                price = 0
+                            budgeted = self.creator.add_compute_budget(instructions, fee_recipient, price)
+                            with tracing.span("blockhash"):
+                                blockhash_info = await self.blockhash_provider.get_async()
+                            with tracing.span("sign"):
+                                tx = self.creator.build_transaction(
+                                    budgeted, mint_keypair, blockhash_info.blockhash
+                                )
+                            # Validated offline, so the node's preflight simulation is skipped
+                            opts = self.creator.preflight(tx, fee_recipient)
+                            with tracing.span("send"):
+                                tracing.count("rpc_calls", method="sendTransaction")
+                                if self.router is not None:
+                                    # Broadcast to the best endpoints; the router does its own fan-out
+                                    result = await asyncio.to_thread(
+                                        self.router.send_raw_transaction, bytes(tx), opts
+                                    )
+                                else:
+                                    # Throttled or timed-out sends are retried within the endpoint's limit
+                                    result = await get_limiter(self.rpc_url).call_async(
+                                        client.send_raw_transaction, bytes(tx), opts=opts
+                                    )
+                        record.update({
+                            "success": True,
+                            "mint": str(mint_keypair.pubkey()),
+                            "tx_signature": str(result.value),
+                            "bonding_curve": str(pdas["bonding_curve"]),
+                            "metadata_uri": metadata_uri,
+                            "dev_buy_amount": dev_buy_amount,
+                            "dev_buy_tokens": buy_quote.tokens_out,
+                            "attempts": attempt,
+                        })
+                        if self.confirmation_tracker is not None:
+                            record["confirmation"] = self.confirmation_tracker.track(
+                                result.value,
+                                blockhash_info.last_valid_block_height,
+                                resend=lambda: self.creator.resend_transaction(instructions, mint_keypair),
+                            )
+                        break
+                    except Exception as e:
+                        if "Blockhash not found" in str(e) and attempt < self.max_retries:
+                            tracing.count("retries", cause="blockhash_not_found")
+                            self.blockhash_provider.invalidate()
+                            await asyncio.sleep(backoff_delay(BLOCKHASH_NOT_FOUND, attempt - 1))
+                            continue
+                        raise
+            except Exception as e:
+                record.update({"success": False, "error": str(e)})
+            if mint_keypair is not None and self.creator.key_pool is not None:
+                # A pre-ground vanity key goes back to the pool unless the launch was sent
+                await asyncio.to_thread(self.creator.release_mint_keypair, mint_keypair, record["success"])
+            launch_span.set(success=record["success"], signature=record.get("tx_signature"))
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        return record
+
+    async def run(self, entries, output_path=None):
+        """
+        Launch every manifest entry with bounded concurrency.
+
+        Args:
+            entries (list): Manifest entries from load_manifest()
+            output_path (str, optional): JSONL file receiving one record per launch
+
+        Returns:
+            list: Result records ordered by manifest index
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        output = open(output_path, "a", encoding="utf-8") if output_path else None
+        results = []
+
+        async def guarded(client, index, entry):
+            async with semaphore:
+                record = await self.launch_one(client, index, entry)
+            # Wait for confirmation outside the semaphore so it does not hold a launch slot
+            confirmation = record.pop("confirmation", None)
+            if confirmation is not None:
+                try:
+                    landed = await asyncio.wrap_future(confirmation)
+                    record.update({
+                        "tx_signature": landed["signature"],
+                        "confirmation_status": landed["confirmation_status"],
+                        "slot": landed["slot"],
+                        "resends": landed["resends"],
+                    })
+                except Exception as e:
+                    record.update({"success": False, "error": f"Not confirmed: {str(e)}"})
+            status = record.get("tx_signature") if record["success"] else f"FAILED: {record['error']}"
+            print(f"[{index}] {entry['symbol']}: {status}")
+            if output:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+            results.append(record)
+
+        # Everything started here is stopped in finally, even if warm-up fails
+        try:
+            self.blockhash_provider.start()
+            if self.confirmation_tracker is not None:
+                self.confirmation_tracker.start()
+            if self.creator.priority_fees is not None:
+                # Sample the fee recipient and payer before the first launch needs a price
+                global_state = await self._fetch_global_state()
+                fee_recipient = global_state.fee_recipient if global_state else EVENT_AUTHORITY
+                await asyncio.to_thread(self.creator.priority_fee, fee_recipient)
+                self.creator.priority_fees.start()
+            # One-time simulation sizing the compute unit limit of both launch paths
+            await asyncio.to_thread(self.creator.profile_compute_units)
+            async with AsyncClient(self.rpc_url) as client:
+                await asyncio.gather(*(guarded(client, i, e) for i, e in enumerate(entries)))
+        finally:
+            if self.confirmation_tracker is not None:
+                self.confirmation_tracker.stop()
+            if self.creator.priority_fees is not None:
+                self.creator.priority_fees.stop()
+            self.blockhash_provider.stop()
+            if output:
+                output.close()
+        return sorted(results, key=lambda r: r["index"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Launch Pump tokens in batch from a manifest")
+    parser.add_argument("manifest", help="JSONL or CSV manifest")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL file for result records")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Launches in flight")
+    parser.add_argument("--rpc-url", default=os.getenv("RPC_URL"),
+                        help="Solana RPC URL, or a comma-separated list to route over")
+    parser.add_argument("--key-pool", default=None, help="Encrypted vanity mint key pool (see vanity.py)")
+    parser.add_argument("--image-format", default=DEFAULT_TARGET_FORMAT, choices=sorted(TARGET_FORMATS),
+                        help="Format local images are recompressed to")
+    parser.add_argument("--no-preprocess", action="store_true", help="Upload local images unchanged")
+    parser.add_argument("--confirm", choices=COMMITMENT_LEVELS, default=None,
+                        help="Wait for each launch to reach this commitment")
+    parser.add_argument("--priority-fee", choices=FEE_POLICIES + ("none",), default=DEFAULT_FEE_POLICY,
+                        help="Priority fee policy: percentile of recent fees, the cap, or none")
+    parser.add_argument("--priority-fee-cap", type=int, default=DEFAULT_FEE_CAP,
+                        help="Maximum priority fee in micro-lamports per compute unit")
+    parser.add_argument("--trace", default=os.getenv("TRACE_FILE"),
+                        help="Append per-phase spans to this JSONL file")
+    parser.add_argument("--metrics", default=os.getenv("METRICS_FILE"),
+                        help="Write phase histograms and counters to this file (Prometheus text format)")
+    parser.add_argument("--lookup-table", nargs="?", const=DEFAULT_TABLE_PATH, default=None,
+                        help="Send v0 transactions through the address lookup table remembered in this "
+                             f"file (default {DEFAULT_TABLE_PATH}; created if missing)")
+    parser.add_argument("--remote-preflight", action="store_true",
+                        help="Let the RPC node simulate each launch instead of validating it locally")
+    parser.add_argument("--subscribe-global-state", action="store_true",
+                        help="Receive Pump global account updates over a websocket instead of refetching them")
+    parser.add_argument("--subscribe-signatures", action="store_true",
+                        help="With --confirm, also receive confirmations over a websocket as well as polling")
+    parser.add_argument("--ws-url", default=os.getenv("WS_URL"),
+                        help="Websocket RPC URL for subscriptions (defaults to WS_URL, then the RPC URL)")
+    args = parser.parse_args(argv)
+
+    sinks = []
+    if args.trace:
+        sinks.append(tracing.JsonLinesSink(args.trace))
+    if args.metrics:
+        sinks.append(tracing.PrometheusSink(args.metrics))
+    tracer = tracing.configure(*sinks)
+
+    entries = load_manifest(args.manifest)
+    print(f"Loaded {len(entries)} launches from {args.manifest}")
+    launcher = BatchLauncher(
+        private_key=os.getenv("PRIVATE_KEY"),
+        rpc_url=args.rpc_url,
+        concurrency=args.concurrency,
+        key_pool=KeyPool(args.key_pool) if args.key_pool else None,
+        image_preprocessor=None if args.no_preprocess else ImagePreprocessor(target_format=args.image_format),
+        confirm_commitment=args.confirm,
+        subscribe_global_state=args.subscribe_global_state,
+        subscribe_signatures=args.subscribe_signatures,
+        ws_url=args.ws_url,
+    )
+    if args.priority_fee != "none":
+        launcher.creator.priority_fees = PriorityFeeEstimator(
+            launcher.rpc_url, policy=args.priority_fee, cap=args.priority_fee_cap
+        )
+    if args.lookup_table:
+        attach_lookup_table(launcher.creator, args.lookup_table)
+    launcher.creator.local_preflight = not args.remote_preflight
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(launcher.run(entries, args.output))
+    finally:
+        if launcher.image_preprocessor:
+            launcher.image_preprocessor.close()
+        launcher.creator.global_state.unsubscribe()
+        tracer.close()
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in results if r["success"])
+    print(f"\n{succeeded}/{len(results)} launches succeeded in {elapsed:.2f}s")
+    if launcher.router is not None:
+        for endpoint in launcher.router.stats():
+            print(f"{endpoint['url']}: {endpoint['requests']} requests, "
+                  f"{endpoint['latency_ms']} ms avg, {endpoint['error_rate']:.1%} errors")
+    for limiter in limiter_stats():
+        print(f"{limiter['endpoint']}: {limiter['requests']} requests at {limiter['rate']} req/s, "
+              f"window {limiter['concurrency']}, {limiter['throttled']} throttled, "
+              f"{limiter['timeouts']} timeouts, {limiter['retries']} retries, {limiter['wait_s']} s waiting")
+    print(f"Results written to {args.output}")
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
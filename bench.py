@@ -0,0 +1,590 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import struct
+import sys
+import time
+from types import SimpleNamespace
+import solders
+from solders.hash import Hash
+from solders.instruction import Instruction, AccountMeta
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import Transaction
+
+from solders.address_lookup_table_account import AddressLookupTableAccount
+
+from bonding_curve import (
+    BuyQuote,
+    DEFAULT_FEE_BASIS_POINTS,
+    DEFAULT_REAL_TOKEN_RESERVES,
+    DEFAULT_VIRTUAL_SOL_RESERVES,
+    DEFAULT_VIRTUAL_TOKEN_RESERVES,
+)
+from constants import (
+    PUMP_PROGRAM_ID,
+    TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM,
+    SYSTEM_PROGRAM,
+    MPL_TOKEN_METADATA,
+    RENT_SYSVAR,
+    EVENT_AUTHORITY,
+)
+from create import PumpTokenCreator
+from global_state import GLOBAL_DISCRIMINATOR, GlobalStateCache
+from lookup_table import build_versioned_transaction, launch_table_addresses
+from preflight import resolve_accounts
+from priority_fees import ComputeProfile
+from templates import LaunchTemplates
+
+SAMPLE_NAME = "Benchmark Token"
+SAMPLE_SYMBOL = "BENCH"
+SAMPLE_URI = "https://gateway.pinata.cloud/ipfs/QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+# Metadata of varying length, so reused template buffers are exercised long-to-short
+SAMPLE_METADATA = [
+    (SAMPLE_NAME, SAMPLE_SYMBOL, SAMPLE_URI),
+    ("A" * 32, "B" * 10, "https://example.com/" + "c" * 180),
+    ("x", "Y", "ipfs://Q"),
+]
+
+DEFAULT_BASELINE_PATH = "bench_baseline.json"
+# Relative p50 slowdown reported as a regression
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+# Sub-microsecond differences are timer noise, not regressions
+MIN_REGRESSION_US = 1.0
+
+# Units the stub RPC reports for simulations
+STUB_UNITS_CONSUMED = 120_000
+
+
+def stub_global_account_data(fee_recipient):
+    """Encode a Pump Global account with the default curve parameters."""
+    return GLOBAL_DISCRIMINATOR + struct.pack(
+        "<?32s32sQQQQQ", True, bytes(Pubkey.new_unique()), bytes(fee_recipient),
+        DEFAULT_VIRTUAL_TOKEN_RESERVES, DEFAULT_VIRTUAL_SOL_RESERVES, DEFAULT_REAL_TOKEN_RESERVES,
+        1_000_000_000_000_000, DEFAULT_FEE_BASIS_POINTS,
+    )
+
+
+class StubClient:
+    """
+    Offline stand-in for solana.rpc.api.Client.
+
+    Answers the calls made by create_token_with_buy() from memory, so the
+    benchmarks measure the client-side hot path and nothing else.
+    """
+    def __init__(self, fee_recipient=None):
+        self.fee_recipient = fee_recipient or Pubkey.new_unique()
+        self.global_data = stub_global_account_data(self.fee_recipient)
+        self.blockhash = Hash.new_unique()
+        self.block_height = 1_000
+        self.sent = 0
+
+    def get_account_info(self, pubkey, *args, **kwargs):
+        return SimpleNamespace(value=SimpleNamespace(data=self.global_data))
+
+    def get_latest_blockhash(self, *args, **kwargs):
+        return SimpleNamespace(value=SimpleNamespace(
+            blockhash=self.blockhash, last_valid_block_height=self.block_height + 150
+        ))
+
+    def get_block_height(self, *args, **kwargs):
+        return SimpleNamespace(value=self.block_height)
+
+    def simulate_transaction(self, txn, *args, **kwargs):
+        return SimpleNamespace(value=SimpleNamespace(err=None, units_consumed=STUB_UNITS_CONSUMED))
+
+    def send_raw_transaction(self, txn, opts=None):
+        # The first signature follows the one-byte signature count
+        self.sent += 1
+        return SimpleNamespace(value=Signature.from_bytes(txn[1:65]))
+
+
+def stub_creator(client=None):
+    """
+    Build a PumpTokenCreator wired to a StubClient.
+
+    Args:
+        client (StubClient, optional): Stub to use (a new one if None)
+
+    Returns:
+        PumpTokenCreator: Creator that never touches the network or the disk
+    """
+    client = client or StubClient()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        creator = PumpTokenCreator(
+            private_key=str(Keypair()), global_state=GlobalStateCache(client),
+            compute_profile=ComputeProfile(path=None),
+        )
+    creator.client = client
+    return creator
+
+
+def _legacy_mint_pdas(mint_keypair):
+    # Reference copy of the pre-template get_mint_pda(): every PDA derived per call
+    global_key, _ = Pubkey.find_program_address([b"global"], PUMP_PROGRAM_ID)
+    bonding_curve_key, _ = Pubkey.find_program_address(
+        [b"bonding-curve", bytes(mint_keypair.pubkey())], PUMP_PROGRAM_ID
+    )
+    mint_authority_key, _ = Pubkey.find_program_address([b"mint-authority"], PUMP_PROGRAM_ID)
+    metadata_key, _ = Pubkey.find_program_address(
+        [b"metadata", bytes(MPL_TOKEN_METADATA), bytes(mint_keypair.pubkey())], MPL_TOKEN_METADATA
+    )
+    return {
+        "global": global_key,
+        "bonding_curve": bonding_curve_key,
+        "mint_authority": mint_authority_key,
+        "metadata": metadata_key
+    }
+
+
+def _legacy_ata(owner, mint):
+    return Pubkey.find_program_address(
+        [bytes(owner), bytes(TOKEN_PROGRAM), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM
+    )[0]
+
+
+def legacy_build_instructions(payer, mint_keypair, name, symbol, uri, dev_buy_amount, creator, fee_recipient):
+    """
+    Reference copy of the instruction builder before templates were introduced.
+
+    Kept only as the baseline for bench_instruction_build().
+    """
+    # Get necessary PDAs
+    pdas = _legacy_mint_pdas(mint_keypair)
+
+    # Find associated token account for bonding curve
+    associated_bonding_curve = _legacy_ata(
+        pdas["bonding_curve"],
+        mint_keypair.pubkey()
+    )
+
+    # Find associated token account for user
+    associated_user = _legacy_ata(
+        payer,
+        mint_keypair.pubkey()
+    )
+
+    # Construct creation instruction
+    create_ix_data = bytes([24, 30, 200, 40, 5, 28, 7, 119])
+    name_bytes = name.encode('utf-8')
+    symbol_bytes = symbol.encode('utf-8')
+    uri_bytes = uri.encode('utf-8')
+
+    create_ix_data += len(name_bytes).to_bytes(4, byteorder='little')
+    create_ix_data += name_bytes
+    create_ix_data += len(symbol_bytes).to_bytes(4, byteorder='little')
+    create_ix_data += symbol_bytes
+    create_ix_data += len(uri_bytes).to_bytes(4, byteorder='little')
+    create_ix_data += uri_bytes
+    create_ix_data += bytes(creator)
+
+    create_accounts = [
+        AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=True, is_writable=True),
+        AccountMeta(pubkey=pdas["mint_authority"], is_signer=False, is_writable=False),
+        AccountMeta(pubkey=pdas["bonding_curve"], is_signer=False, is_writable=True),
+        AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=pdas["global"], is_signer=False, is_writable=False),
+        AccountMeta(pubkey=MPL_TOKEN_METADATA, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=pdas["metadata"], is_signer=False, is_writable=True),
+        AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=ASSOCIATED_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
+    ]
+
+    create_ix = Instruction(
+        program_id=PUMP_PROGRAM_ID,
+        accounts=create_accounts,
+        data=create_ix_data
+    )
+
+    # List of instructions
+    instructions = [create_ix]
+
+    if dev_buy_amount > 0:
+        # Add instruction to create user ATA
+        ata_ix_data = bytes([])  # No data needed for create_associated_token_account
+        ata_accounts = [
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),  # Payer
+            AccountMeta(pubkey=associated_user, is_signer=False, is_writable=True),  # ATA
+            AccountMeta(pubkey=payer, is_signer=False, is_writable=False),  # Owner
+            AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=False, is_writable=False),  # Mint
+            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
+        ]
+
+        ata_ix = Instruction(
+            program_id=ASSOCIATED_TOKEN_PROGRAM,
+            accounts=ata_accounts,
+            data=ata_ix_data
+        )
+
+        instructions.append(ata_ix)
+
+        # Construct buy instruction
+        buy_ix_data = bytes([102, 6, 61, 18, 1, 218, 235, 234])
+        buy_amount = 1_000_000  # Adjust for 1 token with 6 decimals (e.g.)
+        max_sol_cost = int(dev_buy_amount * 1_000_000_000)  # Conversion to lamports
+
+        buy_ix_data += buy_amount.to_bytes(8, byteorder='little')
+        buy_ix_data += max_sol_cost.to_bytes(8, byteorder='little')
+
+        buy_accounts = [
+            AccountMeta(pubkey=pdas["global"], is_signer=False, is_writable=False),
+            AccountMeta(pubkey=fee_recipient, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=False, is_writable=False),
+            AccountMeta(pubkey=pdas["bonding_curve"], is_signer=False, is_writable=True),
+            AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=associated_user, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
+        ]
+
+        buy_ix = Instruction(
+            program_id=PUMP_PROGRAM_ID,
+            accounts=buy_accounts,
+            data=buy_ix_data
+        )
+
+        instructions.append(buy_ix)
+
+    return instructions, pdas
+
+
+
+def _resolved_instructions(message, lookup_tables=()):
+    # (program, [(key, is_signer, is_writable)], data) per instruction, with lookup table indexes expanded
+    accounts = resolve_accounts(message, lookup_tables)
+    return [
+        (accounts[ix.program_id_index][0], [accounts[i] for i in ix.accounts], bytes(ix.data))
+        for ix in message.instructions
+    ]
+
+
+def check_builds(launches=20, dev_buy_amount=0.5):
+    """
+    Check that the cached and template builders match the reference builder byte for byte.
+
+    For each launch, the instructions of legacy_build_instructions() are
+    compared with those of PumpTokenCreator.build_instructions() (with PDAs
+    derived on the call and precomputed), as compiled messages and signed
+    transactions. The v0 lookup table transaction must load the same
+    accounts, with the same flags, and carry the same instruction data.
+
+    Args:
+        launches (int): Mint keypairs to check, cycling through SAMPLE_METADATA
+        dev_buy_amount (float): Dev buy in SOL (0 checks the create-only path)
+
+    Raises:
+        AssertionError: On the first launch whose builds differ
+    """
+    creator = stub_creator()
+    payer_key = creator.public_key
+    fee_recipient = creator.client.fee_recipient
+    blockhash = creator.client.blockhash
+    # The reference builder buys a fixed amount at a max cost of the whole dev buy
+    buy_quote = BuyQuote(0, 0, 1_000_000, int(dev_buy_amount * 1_000_000_000))
+    table = AddressLookupTableAccount(Pubkey.new_unique(), launch_table_addresses(fee_recipient))
+
+    for i in range(launches):
+        mint_keypair = Keypair()
+        name, symbol, uri = SAMPLE_METADATA[i % len(SAMPLE_METADATA)]
+        reference, legacy_pdas = legacy_build_instructions(
+            payer_key, mint_keypair, name, symbol, uri, dev_buy_amount, payer_key, fee_recipient
+        )
+        expected = bytes(Message(reference, payer_key))
+        expected_tx = bytes(Transaction([creator.keypair, mint_keypair], Message(reference, payer_key), blockhash))
+        builds = {
+            "build_instructions": creator.build_instructions(
+                mint_keypair, name, symbol, uri, dev_buy_amount, payer_key, fee_recipient, buy_quote
+            ),
+            "build_instructions (precomputed PDAs)": creator.build_instructions(
+                mint_keypair, name, symbol, uri, dev_buy_amount, payer_key, fee_recipient, buy_quote,
+                pdas=creator.templates.derive_addresses(mint_keypair.pubkey()),
+            ),
+        }
+        for label, (instructions, pdas) in builds.items():
+            if any(pdas[key] != legacy_pdas[key] for key in legacy_pdas):
+                raise AssertionError(f"{label}: PDAs differ from the reference for {mint_keypair.pubkey()}")
+            if bytes(Message(instructions, payer_key)) != expected:
+                raise AssertionError(f"{label}: message differs from the reference ({name!r}, {symbol!r})")
+            tx = Transaction([creator.keypair, mint_keypair], Message(instructions, payer_key), blockhash)
+            if bytes(tx) != expected_tx:
+                raise AssertionError(f"{label}: signed transaction differs from the reference")
+
+        v0 = build_versioned_transaction(
+            builds["build_instructions"][0], payer_key, [creator.keypair, mint_keypair], blockhash, [table]
+        )
+        if _resolved_instructions(v0.message, [table]) != _resolved_instructions(Message(reference, payer_key)):
+            raise AssertionError(f"lookup table message differs from the reference ({name!r}, {symbol!r})")
+
+
+def time_per_call(fn, iterations):
+    """
+    Time repeated calls of fn.
+
+    Args:
+        fn (callable): Function called with the iteration index
+        iterations (int): Number of calls
+
+    Returns:
+        dict: mean/p50/p99 latency in microseconds and ops/sec
+    """
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        fn(i)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "mean_us": round(mean, 2),
+        "p50_us": round(samples[len(samples) // 2], 2),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 2),
+        "ops_per_sec": round(1_000_000 / mean, 1) if mean else None,
+    }
+
+
+def bench_instruction_build(iterations=2000, dev_buy_amount=0.5):
+    """
+    Compare per-transaction build time of the legacy builder and the templates.
+
+    Args:
+        iterations (int): Launches to build per variant
+        dev_buy_amount (float): Dev buy in SOL (adds the ATA + buy instructions when > 0)
+
+    Returns:
+        dict: Timings for instruction assembly and full signed transaction build
+    """
+    payer = Keypair()
+    payer_key = payer.pubkey()
+    fee_recipient = Pubkey.new_unique()
+    blockhash = Hash.new_unique()
+    mints = [Keypair() for _ in range(iterations)]
+    templates = LaunchTemplates(payer_key)
+
+    def legacy(i):
+        return legacy_build_instructions(
+            payer_key, mints[i], SAMPLE_NAME, SAMPLE_SYMBOL, SAMPLE_URI,
+            dev_buy_amount, payer_key, fee_recipient
+        )[0]
+
+    def templated(i):
+        mint = mints[i].pubkey()
+        addresses = templates.derive_addresses(mint)
+        instructions = [templates.create_instruction(
+            mint, addresses, SAMPLE_NAME, SAMPLE_SYMBOL, SAMPLE_URI, payer_key
+        )]
+        if dev_buy_amount > 0:
+            instructions.append(templates.ata_instruction(mint, addresses))
+            instructions.append(templates.buy_instruction(
+                mint, addresses, fee_recipient, 1_000_000, int(dev_buy_amount * 1_000_000_000)
+            ))
+        return instructions
+
+    def signed(build):
+        def run(i):
+            message = Message(build(i), payer_key)
+            return bytes(Transaction([payer, mints[i]], message, blockhash))
+        return run
+
+    # Both builders must produce identical transactions
+    assert signed(legacy)(0) == signed(templated)(0)
+
+    results = {
+        "instructions_legacy": time_per_call(legacy, iterations),
+        "instructions_template": time_per_call(templated, iterations),
+        "transaction_legacy": time_per_call(signed(legacy), iterations),
+        "transaction_template": time_per_call(signed(templated), iterations),
+    }
+    for stage in ("instructions", "transaction"):
+        before = results[f"{stage}_legacy"]["mean_us"]
+        after = results[f"{stage}_template"]["mean_us"]
+        results[f"{stage}_speedup"] = round(before / after, 2) if after else None
+    return results
+
+
+def bench_launch_stages(iterations=2000, dev_buy_amount=0.5):
+    """
+    Time each stage of create_token_with_buy() on its own and end to end.
+
+    Runs fully offline against a StubClient. Inputs of every stage are
+    prepared up front, so each timing covers that stage only.
+
+    Args:
+        iterations (int): Calls per stage
+        dev_buy_amount (float): Dev buy in SOL (adds the ATA + buy instructions when > 0)
+
+    Returns:
+        dict: Timings per stage
+    """
+    creator = stub_creator()
+    payer_key = creator.public_key
+    fee_recipient = creator.client.fee_recipient
+    blockhash = creator.client.blockhash
+    mints = [Keypair() for _ in range(iterations)]
+    global_state = creator.get_global_state()
+    buy_quote = creator.quote_dev_buy(dev_buy_amount, global_state)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        creator.profile_compute_units()
+
+    def build(i):
+        return creator.build_instructions(
+            mints[i], SAMPLE_NAME, SAMPLE_SYMBOL, SAMPLE_URI, dev_buy_amount, payer_key,
+            fee_recipient, buy_quote
+        )[0]
+
+    launch_instructions = [build(i) for i in range(iterations)]
+    instructions = [creator.add_compute_budget(launch_instructions[i]) for i in range(iterations)]
+    messages = [Message(instructions[i], payer_key) for i in range(iterations)]
+    transactions = [Transaction([creator.keypair, mints[i]], messages[i], blockhash) for i in range(iterations)]
+
+    results = {
+        "mint_pda": time_per_call(lambda i: creator.get_mint_pda(mints[i]), iterations),
+        "associated_token_address": time_per_call(
+            lambda i: creator.get_associated_token_address(payer_key, mints[i].pubkey()), iterations
+        ),
+        "global_state": time_per_call(lambda i: creator.get_global_state(), iterations),
+        "quote_dev_buy": time_per_call(lambda i: creator.quote_dev_buy(dev_buy_amount, global_state), iterations),
+        "build_instructions": time_per_call(build, iterations),
+        "compute_budget": time_per_call(lambda i: creator.add_compute_budget(launch_instructions[i]), iterations),
+        "blockhash": time_per_call(lambda i: creator.get_recent_blockhash(), iterations),
+        "message": time_per_call(lambda i: Message(instructions[i], payer_key), iterations),
+        "sign": time_per_call(
+            lambda i: Transaction([creator.keypair, mints[i]], messages[i], blockhash), iterations
+        ),
+        "serialize": time_per_call(lambda i: bytes(transactions[i]), iterations),
+        "preflight": time_per_call(lambda i: creator.preflight(transactions[i], fee_recipient), iterations),
+    }
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results["end_to_end"] = time_per_call(
+            lambda i: creator.create_token_with_buy(SAMPLE_NAME, SAMPLE_SYMBOL, SAMPLE_URI, dev_buy_amount),
+            iterations,
+        )
+    return results
+
+
+def run_suite(iterations=2000, dev_buy_amount=0.5):
+    """
+    Run every benchmark and attach the environment they ran in.
+
+    Args:
+        iterations (int): Calls per stage
+        dev_buy_amount (float): Dev buy in SOL
+
+    Returns:
+        dict: {"meta": environment and parameters, "results": timings per benchmark}
+
+    Raises:
+        AssertionError: If the builders under test do not match the reference (see check_builds())
+    """
+    check_builds(dev_buy_amount=dev_buy_amount)
+    results = bench_launch_stages(iterations, dev_buy_amount)
+    build = bench_instruction_build(iterations, dev_buy_amount)
+    for name, timing in build.items():
+        results[name] = timing
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "solders": solders.__version__,
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "dev_buy_amount": dev_buy_amount,
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    Compare p50 latencies against a stored baseline.
+
+    Args:
+        results (dict): Timings per benchmark (the "results" of run_suite())
+        baseline (dict): Baseline timings in the same format
+        threshold (float): Relative p50 slowdown reported as a regression
+
+    Returns:
+        list: One dict per benchmark present in both (name, baseline and current p50,
+            relative change, regression flag)
+    """
+    rows = []
+    for name, timing in results.items():
+        before = baseline.get(name)
+        if not isinstance(timing, dict) or not isinstance(before, dict) or not before.get("p50_us"):
+            continue
+        change = timing["p50_us"] / before["p50_us"] - 1
+        rows.append({
+            "name": name,
+            "baseline_p50_us": before["p50_us"],
+            "p50_us": timing["p50_us"],
+            "change": round(change, 4),
+            "regression": change > threshold and timing["p50_us"] - before["p50_us"] > MIN_REGRESSION_US,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the launch hot path offline")
+    parser.add_argument("-n", "--iterations", type=int, default=2000, help="Calls per stage")
+    parser.add_argument("--dev-buy", type=float, default=0.5, help="Dev buy in SOL (0 for create only)")
+    parser.add_argument("-o", "--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Relative p50 slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 on any regression")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.iterations, args.dev_buy)
+    results = suite["results"]
+    print(f"{'stage':<26}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'ops/s':>12}")
+    for name, timing in results.items():
+        if isinstance(timing, dict):
+            print(f"{name:<26}{timing['mean_us']:>10}{timing['p50_us']:>10}"
+                  f"{timing['p99_us']:>10}{timing['ops_per_sec']:>12}")
+    print(f"\nInstruction assembly speedup: {results['instructions_speedup']}x")
+    print(f"Signed transaction speedup:   {results['transaction_speedup']}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    regressions = []
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_to_baseline(results, baseline["results"], args.threshold)
+        print(f"\nCompared to {args.baseline} ({baseline['meta']['timestamp']}):")
+        print(f"{'stage':<26}{'base p50':>10}{'p50 us':>10}{'change':>10}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<26}{row['baseline_p50_us']:>10}{row['p50_us']:>10}{row['change']:>+10.1%}{flag}")
+        regressions = [row for row in rows if row["regression"]]
+    else:
+        print(f"\nNo baseline at {args.baseline}; record one on this machine with --update-baseline")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from collections import namedtuple
+from solana.rpc.api import Client
+
+import tracing
+
+# A blockhash stays valid for 150 blocks after the block it was taken from
+MAX_PROCESSING_AGE = 150
+
+DEFAULT_REFRESH_INTERVAL = 2.0
+# Solana blocks are ~400ms, so 150 blocks is ~60s; stay well inside that window
+DEFAULT_MAX_AGE = 30.0
+
+BlockhashInfo = namedtuple("BlockhashInfo", ["blockhash", "last_valid_block_height", "fetched_at"])
+
+
+class BlockhashProvider:
+    """
+    Keep a recent blockhash warm in the background.
+
+    A daemon thread refreshes the latest blockhash at a fixed interval so that
+    transaction builders can get one without an RPC round-trip. One provider is
+    meant to be shared by every PumpTokenCreator / BatchLauncher in a process.
+    """
+    def __init__(self, rpc_url=None, client=None, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 max_age=DEFAULT_MAX_AGE):
+        """
+        Initialize the provider (call start() to begin background refreshes).
+
+        Args:
+            rpc_url (str, optional): RPC URL used when no client is given
+            client (Client, optional): Synchronous RPC client to fetch with
+            refresh_interval (float): Seconds between background refreshes
+            max_age (float): Seconds after which a cached blockhash is not handed out
+        """
+        if client is None:
+            if rpc_url is None:
+                raise ValueError("Either rpc_url or client is required")
+            client = Client(rpc_url)
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.fetch_count = 0
+        self.served_count = 0
+        self.last_error = None
+        self._latest = None
+        self._block_height = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="blockhash-provider", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.refresh_interval)
+
+    def refresh(self):
+        """
+        Fetch the latest blockhash from the RPC and cache it.
+
+        Returns:
+            BlockhashInfo: The freshly fetched blockhash
+        """
+        tracing.count("rpc_calls", method="getLatestBlockhash")
+        response = self.client.get_latest_blockhash()
+        info = BlockhashInfo(
+            response.value.blockhash,
+            response.value.last_valid_block_height,
+            time.monotonic(),
+        )
+        with self._lock:
+            self.fetch_count += 1
+            self.last_error = None
+            self._latest = info
+            # The RPC hands out blockhashes valid for MAX_PROCESSING_AGE more blocks
+            self._block_height = info.last_valid_block_height - MAX_PROCESSING_AGE
+        return info
+
+    @property
+    def block_height(self):
+        """Best known current block height, estimated from the last refresh."""
+        return self._block_height
+
+    def is_expired(self, info):
+        """
+        Check whether a blockhash should no longer be used.
+
+        Args:
+            info (BlockhashInfo): Blockhash to check
+
+        Returns:
+            bool: True if the blockhash is too old or past its last valid block height
+        """
+        if info is None:
+            return True
+        if time.monotonic() - info.fetched_at > self.max_age:
+            return True
+        height = self._block_height
+        return height is not None and height > info.last_valid_block_height
+
+    def invalidate(self):
+        """Drop the cached blockhash, e.g. after a "Blockhash not found" error."""
+        with self._lock:
+            self._latest = None
+
+    def get(self):
+        """
+        Return a fresh-enough blockhash, fetching one only if the cache is empty or expired.
+
+        Returns:
+            BlockhashInfo: Blockhash and its last valid block height
+        """
+        info = self._latest
+        if self.is_expired(info):
+            info = self.refresh()
+        with self._lock:
+            self.served_count += 1
+        return info
+
+    async def get_async(self):
+        """
+        Async variant of get() that never blocks the event loop.
+
+        Returns:
+            BlockhashInfo: Blockhash and its last valid block height
+        """
+        info = self._latest
+        if self.is_expired(info):
+            return await asyncio.to_thread(self.get)
+        with self._lock:
+            self.served_count += 1
+        return info
+
+    def stats(self):
+        """
+        Return provider statistics.
+
+        Returns:
+            dict: RPC fetches, blockhashes served, age of the cached blockhash and last error
+        """
+        info = self._latest
+        return {
+            "fetches": self.fetch_count,
+            "served": self.served_count,
+            "age_s": None if info is None else round(time.monotonic() - info.fetched_at, 3),
+            "last_valid_block_height": None if info is None else info.last_valid_block_height,
+            "last_error": self.last_error,
+        }
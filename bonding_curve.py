@@ -0,0 +1,171 @@
+import hashlib
+import struct
+from collections import namedtuple
+
+from defaults import LAMPORTS_PER_SOL
+
+# Kept free of solana/solders imports so quotes stay cheap to import;
+# NumPy is only imported by the batch API.
+
+BASIS_POINTS = 10_000
+TOKEN_DECIMALS = 6
+
+DEFAULT_SLIPPAGE_BPS = 100
+
+# Pump launch parameters (used when no Global state is available)
+DEFAULT_VIRTUAL_TOKEN_RESERVES = 1_073_000_000_000_000
+DEFAULT_VIRTUAL_SOL_RESERVES = 30_000_000_000
+DEFAULT_REAL_TOKEN_RESERVES = 793_100_000_000_000
+DEFAULT_FEE_BASIS_POINTS = 100
+
+# Anchor account discriminator of BondingCurve accounts
+BONDING_CURVE_DISCRIMINATOR = hashlib.sha256(b"account:BondingCurve").digest()[:8]
+# discriminator, virtual_token_reserves, virtual_sol_reserves, real_token_reserves,
+# real_sol_reserves, token_total_supply, complete
+BONDING_CURVE_LAYOUT = struct.Struct("<8sQQQQQ?")
+
+CurveState = namedtuple("CurveState", [
+    "virtual_token_reserves", "virtual_sol_reserves", "real_token_reserves",
+    "real_sol_reserves", "token_total_supply", "complete",
+])
+
+BuyQuote = namedtuple("BuyQuote", ["sol_in", "fee", "tokens_out", "max_sol_cost"])
+
+
+def initial_curve(global_state=None):
+    """
+    Curve state of a freshly created token.
+
+    Args:
+        global_state (GlobalState, optional): Decoded Pump Global account
+
+    Returns:
+        CurveState: Initial reserves (real SOL reserves are zero)
+    """
+    if global_state is None:
+        return CurveState(DEFAULT_VIRTUAL_TOKEN_RESERVES, DEFAULT_VIRTUAL_SOL_RESERVES,
+                          DEFAULT_REAL_TOKEN_RESERVES, 0, 1_000_000_000_000_000, False)
+    return CurveState(
+        global_state.initial_virtual_token_reserves,
+        global_state.initial_virtual_sol_reserves,
+        global_state.initial_real_token_reserves,
+        0,
+        global_state.token_total_supply,
+        False,
+    )
+
+
+def quote_buy(sol_in, curve, fee_basis_points=DEFAULT_FEE_BASIS_POINTS, slippage_bps=DEFAULT_SLIPPAGE_BPS):
+    """
+    Exact token output for spending `sol_in` lamports on the curve.
+
+    The fee is charged on top of the SOL that enters the curve, so the part
+    that buys tokens is sol_in * 10000 / (10000 + fee_bps). Tokens out follow
+    the constant product of the virtual reserves, capped at the real reserves.
+
+    Args:
+        sol_in (int): Total lamports to spend, fee included
+        curve (CurveState): Current curve state
+        fee_basis_points (int): Protocol fee in basis points
+        slippage_bps (int): Tolerance added to the max SOL cost
+
+    Returns:
+        BuyQuote: Lamports in, fee, tokens out (raw units) and max_sol_cost
+    """
+    if sol_in <= 0:
+        return BuyQuote(0, 0, 0, 0)
+    if curve.complete:
+        raise ValueError("Bonding curve is complete")
+    net_sol = sol_in * BASIS_POINTS // (BASIS_POINTS + fee_basis_points)
+    tokens_out = (net_sol * curve.virtual_token_reserves) // (curve.virtual_sol_reserves + net_sol)
+    tokens_out = min(tokens_out, curve.real_token_reserves)
+    # Lamports the program will charge for exactly tokens_out, fee included
+    cost = sol_cost_for_tokens(tokens_out, curve, fee_basis_points)
+    max_sol_cost = cost * (BASIS_POINTS + slippage_bps) // BASIS_POINTS
+    return BuyQuote(cost, cost - _net_cost(tokens_out, curve), tokens_out, max_sol_cost)
+
+
+def _net_cost(tokens_out, curve):
+    if tokens_out <= 0:
+        return 0
+    if tokens_out >= curve.virtual_token_reserves:
+        raise ValueError("Token amount exceeds virtual reserves")
+    return (tokens_out * curve.virtual_sol_reserves) // (curve.virtual_token_reserves - tokens_out) + 1
+
+
+def sol_cost_for_tokens(tokens_out, curve, fee_basis_points=DEFAULT_FEE_BASIS_POINTS):
+    """
+    Lamports charged by the program for buying exactly `tokens_out`, fee included.
+
+    Args:
+        tokens_out (int): Token amount (raw units)
+        curve (CurveState): Current curve state
+        fee_basis_points (int): Protocol fee in basis points
+
+    Returns:
+        int: Lamports
+    """
+    net = _net_cost(tokens_out, curve)
+    return net + net * fee_basis_points // BASIS_POINTS
+
+
+def apply_buy(curve, quote):
+    """Return the curve state after a buy has executed."""
+    net = quote.sol_in - quote.fee
+    return curve._replace(
+        virtual_token_reserves=curve.virtual_token_reserves - quote.tokens_out,
+        virtual_sol_reserves=curve.virtual_sol_reserves + net,
+        real_token_reserves=curve.real_token_reserves - quote.tokens_out,
+        real_sol_reserves=curve.real_sol_reserves + net,
+    )
+
+
+def quote_buy_batch(sol_in, virtual_sol_reserves=DEFAULT_VIRTUAL_SOL_RESERVES,
+                    virtual_token_reserves=DEFAULT_VIRTUAL_TOKEN_RESERVES,
+                    real_token_reserves=DEFAULT_REAL_TOKEN_RESERVES,
+                    fee_basis_points=DEFAULT_FEE_BASIS_POINTS):
+    """
+    Vectorized buy quotes for many buy sizes and/or reserve states at once.
+
+    All arguments broadcast against each other, so one call can sweep
+    thousands of buy sizes on one curve or one buy size over many curves.
+    Computed in float64: results can differ from quote_buy() by a few raw
+    token units, which is fine for sizing and simulation but quote_buy()
+    should be used to fill actual instructions.
+
+    Args:
+        sol_in (array_like): Total lamports to spend, fee included
+        virtual_sol_reserves (array_like): Virtual SOL reserves (lamports)
+        virtual_token_reserves (array_like): Virtual token reserves (raw units)
+        real_token_reserves (array_like): Real token reserves (raw units)
+        fee_basis_points (array_like): Protocol fee in basis points
+
+    Returns:
+        dict: "tokens_out", "net_sol" (lamports entering the curve), "fee", "sol_cost"
+            (net_sol + fee, as BuyQuote.sol_in) and "price_impact" NumPy arrays
+    """
+    import numpy as np
+
+    sol_in = np.asarray(sol_in, dtype=np.float64)
+    vsr = np.asarray(virtual_sol_reserves, dtype=np.float64)
+    vtr = np.asarray(virtual_token_reserves, dtype=np.float64)
+    rtr = np.asarray(real_token_reserves, dtype=np.float64)
+    fee_bps = np.asarray(fee_basis_points, dtype=np.float64)
+
+    net_sol = np.floor(np.maximum(sol_in, 0.0) * BASIS_POINTS / (BASIS_POINTS + fee_bps))
+    tokens_out = np.minimum(np.floor(net_sol * vtr / (vsr + net_sol)), rtr)
+    # Same definitions as _net_cost() and sol_cost_for_tokens(): the fee is charged on
+    # what exactly tokens_out costs on the curve
+    with np.errstate(divide="ignore", invalid="ignore"):
+        net_cost = np.where(tokens_out > 0, np.floor(tokens_out * vsr / (vtr - tokens_out)) + 1, 0.0)
+    fee = np.floor(net_cost * fee_bps / BASIS_POINTS)
+    spot_price = vsr / vtr
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_price = np.where(tokens_out > 0, net_cost / tokens_out, spot_price)
+    return {
+        "tokens_out": tokens_out.astype(np.int64),
+        "net_sol": net_cost.astype(np.int64),
+        "fee": fee.astype(np.int64),
+        "sol_cost": (net_cost + fee).astype(np.int64),
+        "price_impact": avg_price / spot_price - 1.0,
+    }
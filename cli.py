@@ -0,0 +1,355 @@
+import argparse
+import os
+import sys
+
+from bonding_curve import DEFAULT_SLIPPAGE_BPS
+from defaults import (
+    COMMITMENT_LEVELS,
+    DEFAULT_FEE_CAP,
+    DEFAULT_FEE_POLICY,
+    DEFAULT_TABLE_PATH,
+    DEFAULT_TARGET_FORMAT,
+    FEE_POLICIES,
+    TARGET_FORMATS,
+)
+
+# Only the standard library and dependency-free modules are imported at module
+# load. Subcommands import solana/solders/PIL/requests when they run, so
+# `--help` and `quote` start about as fast as the interpreter itself.
+
+# Startup-time budgets in milliseconds, on top of a bare `python -c pass`
+STARTUP_BUDGETS_MS = {
+    "--help": 50,
+    "quote 1": 75,
+}
+DEFAULT_STARTUP_RUNS = 7
+
+FEE_POLICY_CHOICES = FEE_POLICIES + ("none",)
+
+
+def non_negative_float(value):
+    """argparse type accepting floats >= 0."""
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+
+def _load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def cmd_launch(args):
+    """Launch one token without prompts."""
+    _load_env()
+    import contextlib
+    import json
+
+    # Progress goes to stderr when stdout carries the JSON result
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with progress:
+        import tracing
+        from create import CONFIRMATION_TIMEOUT, PumpTokenCreator
+        from pipeline import format_report, launch_token
+
+        private_key = os.getenv("PRIVATE_KEY")
+        if not private_key:
+            print("PRIVATE_KEY is not set", file=sys.stderr)
+            return 2
+        tracer = tracing.configure_from_env()
+        try:
+            key_pool = None
+            if args.key_pool:
+                from vanity import KeyPool
+                key_pool = KeyPool(args.key_pool)
+            creator = PumpTokenCreator(
+                private_key=private_key, rpc_url=args.rpc_url or os.getenv("RPC_URL"), key_pool=key_pool,
+                slippage_bps=args.slippage_bps, local_preflight=not args.remote_preflight,
+                ws_url=args.ws_url or os.getenv("WS_URL"),
+            )
+            if args.priority_fee != "none":
+                from priority_fees import PriorityFeeEstimator
+                creator.priority_fees = PriorityFeeEstimator(
+                    creator.rpc_url, policy=args.priority_fee, cap=args.priority_fee_cap
+                )
+            if args.lookup_table:
+                from lookup_table import attach_lookup_table
+                attach_lookup_table(creator, args.lookup_table)
+            if args.confirm:
+                from confirmations import ConfirmationTracker
+                creator.confirmation_tracker = ConfirmationTracker(
+                    creator.client, commitment=args.confirm,
+                    ws_url=creator.ws_url if args.subscribe_signatures else None,
+                ).start()
+
+            # Uploads, RPC state, mint keypair, priority fee and blockhash are fetched concurrently
+            result = launch_token(
+                creator, args.name, args.symbol, args.image, args.dev_buy,
+                description=args.description, telegram=args.telegram, website=args.website,
+                twitter=args.twitter, creator_address=args.creator, image_format=args.image_format,
+            )
+            if args.report:
+                print(format_report(result["pipeline"]))
+            confirmation = result.pop("confirmation", None)
+            if confirmation is not None:
+                try:
+                    landed = confirmation.result(timeout=args.confirm_timeout or CONFIRMATION_TIMEOUT)
+                    result.update({
+                        "tx_signature": landed["signature"],
+                        "confirmation_status": landed["confirmation_status"],
+                        "slot": landed["slot"],
+                    })
+                except Exception as e:
+                    result.update({"success": False, "error": f"Not confirmed: {str(e) or 'timed out'}"})
+                finally:
+                    creator.confirmation_tracker.stop()
+        finally:
+            tracer.close()
+
+    if args.json:
+        print(json.dumps(result, default=str))
+    elif result["success"]:
+        print(f"Mint: {result['mint']}")
+        print(f"Transaction: {result['tx_signature']}")
+    else:
+        print(f"Launch failed: {result['error']}", file=sys.stderr)
+    return 0 if result["success"] else 1
+
+
+def cmd_quote(args):
+    """Quote dev buys on a fresh bonding curve."""
+    from bonding_curve import LAMPORTS_PER_SOL, TOKEN_DECIMALS, initial_curve, quote_buy
+
+    global_state = None
+    fee_bps = args.fee_bps
+    if args.live:
+        _load_env()
+        from solana.rpc.api import Client
+        from constants import MAINNET_RPC_URL
+        from global_state import GlobalStateCache
+
+        global_state = GlobalStateCache(Client(args.rpc_url or os.getenv("RPC_URL") or MAINNET_RPC_URL)).get()
+        if fee_bps is None:
+            fee_bps = global_state.fee_basis_points + (global_state.creator_fee_basis_points or 0)
+    if fee_bps is None:
+        from bonding_curve import DEFAULT_FEE_BASIS_POINTS
+        fee_bps = DEFAULT_FEE_BASIS_POINTS
+
+    curve = initial_curve(global_state)
+    print(f"{'SOL in':>10}{'tokens out':>22}{'fee SOL':>14}{'max SOL cost':>16}{'avg price':>16}")
+    for sol in args.sol:
+        quote = quote_buy(int(sol * LAMPORTS_PER_SOL), curve, fee_bps, args.slippage_bps)
+        tokens = quote.tokens_out / 10 ** TOKEN_DECIMALS
+        price = quote.sol_in / LAMPORTS_PER_SOL / tokens if tokens else 0
+        print(f"{sol:>10}{tokens:>22,.2f}{quote.fee / LAMPORTS_PER_SOL:>14.6f}"
+              f"{quote.max_sol_cost / LAMPORTS_PER_SOL:>16.6f}{price:>16.10f}")
+    return 0
+
+
+def cmd_batch(args):
+    """Launch tokens from a manifest (see batch.py)."""
+    import batch
+    return batch.main(args.args)
+
+
+def cmd_grind(args):
+    """Grind vanity mint keypairs (see vanity.py)."""
+    _load_env()
+    import vanity
+    return vanity.main(args.args)
+
+
+def cmd_schedule(args):
+    """Pre-sign launches on durable nonces and fire them on schedule (see durable_nonce.py)."""
+    _load_env()
+    import durable_nonce
+    return durable_nonce.main(args.args)
+
+
+def measure_startup(budgets=None, runs=DEFAULT_STARTUP_RUNS):
+    """
+    Measure the startup time of CLI invocations against their budgets.
+
+    Each command is run `runs` times in a fresh interpreter and the median
+    is compared, after subtracting the median of a bare `python -c pass`,
+    to its budget.
+
+    Args:
+        budgets (dict, optional): Command line -> budget in ms (defaults to STARTUP_BUDGETS_MS)
+        runs (int): Runs per command
+
+    Returns:
+        list: One dict per command (command, median_ms, overhead_ms, budget_ms, ok)
+    """
+    import shlex
+    import statistics
+    import subprocess
+    import time
+
+    budgets = budgets or STARTUP_BUDGETS_MS
+    script = os.path.abspath(__file__)
+
+    def median_ms(argv):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    interpreter_ms = median_ms([sys.executable, "-c", "pass"])
+    rows = []
+    for command, budget in budgets.items():
+        median = median_ms([sys.executable, script] + shlex.split(command))
+        overhead = median - interpreter_ms
+        rows.append({
+            "command": command,
+            "median_ms": round(median, 1),
+            "overhead_ms": round(overhead, 1),
+            "budget_ms": budget,
+            "ok": overhead <= budget,
+        })
+    return rows
+
+
+def cmd_lookup_table(args):
+    """Manage the launch address lookup table (see lookup_table.py)."""
+    _load_env()
+    import lookup_table
+    return lookup_table.main(args.args)
+
+
+def cmd_monitor(args):
+    """Watch launched bonding curves (see curve_monitor.py)."""
+    _load_env()
+    import curve_monitor
+    return curve_monitor.main(args.args)
+
+
+def cmd_load_test(args):
+    """Replay launches against local mock endpoints (see load_test.py)."""
+    _load_env()
+    import load_test
+    return load_test.main(args.args)
+
+
+def cmd_mock_server(args):
+    """Serve the mock RPC node and Pinata API (see mock_server.py)."""
+    import mock_server
+    return mock_server.main(args.args)
+
+
+def cmd_bench(args):
+    """Run the offline benchmarks (see bench.py), or check startup-time budgets."""
+    if args.startup:
+        rows = measure_startup(runs=args.runs)
+        print(f"{'command':<16}{'median ms':>12}{'overhead ms':>14}{'budget ms':>12}")
+        for row in rows:
+            status = "" if row["ok"] else "  OVER BUDGET"
+            print(f"{row['command']:<16}{row['median_ms']:>12}{row['overhead_ms']:>14}{row['budget_ms']:>12}{status}")
+        return 0 if all(row["ok"] for row in rows) else 1
+    import bench
+    return bench.main(args.args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Pump token launcher")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    launch = subparsers.add_parser("launch", help="Launch one token without prompts",
+                                   description="Launch one token without prompts. "
+                                               "The private key is read from PRIVATE_KEY.")
+    launch.add_argument("--name", required=True, help="Token name")
+    launch.add_argument("--symbol", required=True, help="Token symbol")
+    launch.add_argument("--image", required=True, help="Local image file (uploaded to IPFS) or image URL")
+    launch.add_argument("--description", default="", help="Token description")
+    launch.add_argument("--dev-buy", type=non_negative_float, default=0.0, help="Initial dev buy in SOL")
+    launch.add_argument("--telegram", default="", help="Telegram link")
+    launch.add_argument("--website", default="", help="Website")
+    launch.add_argument("--twitter", default="", help="Twitter link")
+    launch.add_argument("--creator", default=None, help="Creator address (defaults to the wallet)")
+    launch.add_argument("--rpc-url", default=None,
+                        help="Solana RPC URL, or a comma-separated list to route over (defaults to RPC_URL)")
+    launch.add_argument("--key-pool", default=None, help="Encrypted vanity mint key pool (see grind)")
+    launch.add_argument("--image-format", default=DEFAULT_TARGET_FORMAT, choices=sorted(TARGET_FORMATS),
+                        help="Format a local image is recompressed to")
+    launch.add_argument("--slippage-bps", type=int, default=DEFAULT_SLIPPAGE_BPS,
+                        help="Slippage on the dev buy's max SOL cost")
+    launch.add_argument("--priority-fee", choices=FEE_POLICY_CHOICES, default=DEFAULT_FEE_POLICY,
+                        help="Priority fee policy: percentile of recent fees, the cap, or none")
+    launch.add_argument("--priority-fee-cap", type=int, default=DEFAULT_FEE_CAP,
+                        help="Maximum priority fee in micro-lamports per compute unit")
+    launch.add_argument("--confirm", choices=COMMITMENT_LEVELS, default=None,
+                        help="Wait for the launch to reach this commitment")
+    launch.add_argument("--confirm-timeout", type=float, default=None, help="Seconds to wait for confirmation")
+    launch.add_argument("--subscribe-signatures", action="store_true",
+                        help="With --confirm, receive the confirmation over a websocket as well as polling")
+    launch.add_argument("--ws-url", default=None,
+                        help="Websocket RPC URL for subscriptions (defaults to WS_URL, then the RPC URL)")
+    launch.add_argument("--lookup-table", nargs="?", const=DEFAULT_TABLE_PATH, default=None,
+                        help="Send a v0 transaction through the address lookup table remembered in this "
+                             "file (default .lookup_table.json; created if missing)")
+    launch.add_argument("--remote-preflight", action="store_true",
+                        help="Let the RPC node simulate the launch instead of validating it locally")
+    launch.add_argument("--report", action="store_true", help="Print a timeline of the launch stages and their overlap")
+    launch.add_argument("--json", action="store_true", help="Print the result as JSON on stdout")
+    launch.set_defaults(func=cmd_launch)
+
+    quote = subparsers.add_parser("quote", help="Quote dev buys on a fresh bonding curve")
+    quote.add_argument("sol", type=non_negative_float, nargs="+", help="SOL amounts to quote")
+    quote.add_argument("--slippage-bps", type=int, default=DEFAULT_SLIPPAGE_BPS, help="Slippage on the max SOL cost")
+    quote.add_argument("--fee-bps", type=int, default=None, help="Protocol fee in basis points")
+    quote.add_argument("--live", action="store_true", help="Use the on-chain Global curve parameters")
+    quote.add_argument("--rpc-url", default=None, help="Solana RPC URL with --live (defaults to RPC_URL)")
+    quote.set_defaults(func=cmd_quote)
+
+    batch = subparsers.add_parser("batch", help="Launch tokens from a manifest (batch.py options)",
+                                  add_help=False)
+    batch.set_defaults(func=cmd_batch, passthrough=True)
+
+    grind = subparsers.add_parser("grind", help="Grind vanity mint keypairs (vanity.py options)",
+                                  add_help=False)
+    grind.set_defaults(func=cmd_grind, passthrough=True)
+
+    schedule = subparsers.add_parser("schedule", help="Pre-signed launches on durable nonces "
+                                                      "(durable_nonce.py options)", add_help=False)
+    schedule.set_defaults(func=cmd_schedule, passthrough=True)
+
+    lookup_table = subparsers.add_parser("lookup-table", help="Manage the launch address lookup table "
+                                                              "(lookup_table.py options)", add_help=False)
+    lookup_table.set_defaults(func=cmd_lookup_table, passthrough=True)
+
+    monitor = subparsers.add_parser("monitor", help="Watch bonding curves and print changes "
+                                                    "(curve_monitor.py options)", add_help=False)
+    monitor.set_defaults(func=cmd_monitor, passthrough=True)
+
+    load_test = subparsers.add_parser("load-test", help="Replay launches against a local mock RPC node and "
+                                                        "Pinata API (load_test.py options)", add_help=False)
+    load_test.set_defaults(func=cmd_load_test, passthrough=True)
+
+    mock_server = subparsers.add_parser("mock-server", help="Serve a mock RPC node and Pinata API "
+                                                            "(mock_server.py options)", add_help=False)
+    mock_server.set_defaults(func=cmd_mock_server, passthrough=True)
+
+    bench = subparsers.add_parser("bench", help="Run benchmarks (bench.py options) or check startup time",
+                                  add_help=False)
+    bench.add_argument("--startup", action="store_true", help="Check CLI startup-time budgets")
+    bench.add_argument("--runs", type=int, default=DEFAULT_STARTUP_RUNS, help="Runs per command (--startup)")
+    bench.set_defaults(func=cmd_bench, passthrough=True)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # batch, grind and bench hand their remaining arguments to the underlying script
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, "passthrough", False):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.args = extra
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from solders.signature import Signature
+
+from defaults import COMMITMENT_LEVELS
+import tracing
+
+# getSignatureStatuses accepts at most 256 signatures per call
+MAX_SIGNATURES_PER_REQUEST = 256
+
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_RESENDS = 3
+
+
+class TransactionFailedError(Exception):
+    """The transaction landed but failed on-chain."""
+
+
+class TransactionExpiredError(Exception):
+    """The transaction's blockhash expired before it was confirmed."""
+
+
+def _commitment_rank(status):
+    # TransactionConfirmationStatus converts to 0 (processed), 1 (confirmed), 2 (finalized)
+    return -1 if status is None else int(status)
+
+
+class _Entry:
+    __slots__ = ("signature", "last_valid_block_height", "target", "future", "resend", "resends",
+                 "subscribed", "landed")
+
+    def __init__(self, signature, last_valid_block_height, target, future, resend):
+        self.signature = signature
+        self.last_valid_block_height = last_valid_block_height
+        self.target = target
+        self.future = future
+        self.resend = resend
+        self.resends = 0
+        self.subscribed = False
+        self.landed = False
+
+
+class ConfirmationTracker:
+    """
+    Track outstanding transaction signatures from every launch.
+
+    Signatures are polled together through getSignatureStatuses, up to 256 per
+    RPC call, so the cost per tick does not grow with the number of launches.
+    When a websocket URL is given, each signature also gets a
+    signatureSubscribe subscription and resolves as soon as it is notified.
+    Entries whose blockhash expires are re-sent through their resend callback.
+    """
+    def __init__(self, client, poll_interval=DEFAULT_POLL_INTERVAL, commitment="confirmed",
+                 blockhash_provider=None, ws_url=None, max_resends=DEFAULT_MAX_RESENDS):
+        """
+        Initialize the tracker (call start() to begin polling).
+
+        Args:
+            client (Client): Synchronous RPC client (or RpcRouter)
+            poll_interval (float): Seconds between status polls
+            commitment (str): Default target commitment ("processed", "confirmed" or "finalized")
+            blockhash_provider (BlockhashProvider, optional): Source of the current block height;
+                getBlockHeight is called once per tick otherwise
+            ws_url (str, optional): Websocket URL for signature subscriptions
+            max_resends (int): Maximum re-sends of an expired transaction
+        """
+        if commitment not in COMMITMENT_LEVELS:
+            raise ValueError(f"commitment must be one of {COMMITMENT_LEVELS}")
+        self.client = client
+        self.poll_interval = poll_interval
+        self.commitment = commitment
+        self.blockhash_provider = blockhash_provider
+        self.ws_url = ws_url
+        self.max_resends = max_resends
+        self.rpc_calls = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.expired = 0
+        self.resent = 0
+        self.last_error = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws_thread = None
+        self._ws_loop = None
+        self._ws_queue = None
+
+    def track(self, signature, last_valid_block_height=None, commitment=None, callback=None, resend=None):
+        """
+        Start tracking a sent transaction.
+
+        Args:
+            signature (Signature or str): Transaction signature
+            last_valid_block_height (int, optional): Block height after which the blockhash expires
+            commitment (str, optional): Target commitment (defaults to the tracker's)
+            callback (callable, optional): Called with the resolved Future
+            resend (callable, optional): Called on expiry; must re-sign with a fresh blockhash,
+                send, and return (new signature, new last valid block height)
+
+        Returns:
+            Future: Resolves to {"signature", "slot", "confirmation_status", "resends"}, or
+                raises TransactionFailedError / TransactionExpiredError
+        """
+        commitment = commitment or self.commitment
+        if commitment not in COMMITMENT_LEVELS:
+            raise ValueError(f"commitment must be one of {COMMITMENT_LEVELS}")
+        if isinstance(signature, str):
+            signature = Signature.from_string(signature)
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        entry = _Entry(signature, last_valid_block_height, COMMITMENT_LEVELS.index(commitment), future, resend)
+        with self._lock:
+            self._entries[signature] = entry
+        self._subscribe(entry)
+        return future
+
+    def pending(self):
+        """Number of signatures still being tracked."""
+        return len(self._entries)
+
+    def _resolve(self, entry, slot, status):
+        with self._lock:
+            if self._entries.get(entry.signature) is not entry:
+                return
+            del self._entries[entry.signature]
+            self.confirmed += 1
+        entry.future.set_result({
+            "signature": str(entry.signature),
+            "slot": slot,
+            "confirmation_status": status,
+            "resends": entry.resends,
+        })
+
+    def _fail(self, entry, error):
+        with self._lock:
+            if self._entries.get(entry.signature) is not entry:
+                return
+            del self._entries[entry.signature]
+            if isinstance(error, TransactionExpiredError):
+                self.expired += 1
+            else:
+                self.failed += 1
+        entry.future.set_exception(error)
+
+    def _current_block_height(self):
+        if self.blockhash_provider is not None and self.blockhash_provider.block_height is not None:
+            return self.blockhash_provider.block_height
+        self.rpc_calls += 1
+        tracing.count("rpc_calls", method="getBlockHeight")
+        return self.client.get_block_height().value
+
+    def poll_once(self):
+        """Poll every tracked signature once and resolve, fail or re-send entries."""
+        with self._lock:
+            entries = list(self._entries.values())
+        if not entries:
+            return
+
+        for start in range(0, len(entries), MAX_SIGNATURES_PER_REQUEST):
+            chunk = entries[start:start + MAX_SIGNATURES_PER_REQUEST]
+            self.rpc_calls += 1
+            tracing.count("rpc_calls", method="getSignatureStatuses")
+            statuses = self.client.get_signature_statuses([e.signature for e in chunk]).value
+            for entry, status in zip(chunk, statuses):
+                if status is None:
+                    continue
+                # Seen on-chain: it can no longer expire, only reach the target commitment
+                entry.landed = True
+                if status.err is not None:
+                    self._fail(entry, TransactionFailedError(str(status.err)))
+                elif _commitment_rank(status.confirmation_status) >= entry.target:
+                    self._resolve(entry, status.slot, COMMITMENT_LEVELS[int(status.confirmation_status)])
+
+        with self._lock:
+            expirable = [
+                e for e in self._entries.values()
+                if e.last_valid_block_height is not None and not e.landed
+            ]
+        if not expirable:
+            return
+        block_height = self._current_block_height()
+        for entry in expirable:
+            if block_height > entry.last_valid_block_height:
+                self._handle_expired(entry)
+
+    def _handle_expired(self, entry):
+        if entry.resend is None or entry.resends >= self.max_resends:
+            self._fail(entry, TransactionExpiredError(
+                f"{entry.signature} expired at block height {entry.last_valid_block_height}"
+            ))
+            return
+        try:
+            new_signature, new_last_valid = entry.resend()
+        except Exception as e:
+            self._fail(entry, e)
+            return
+        if isinstance(new_signature, str):
+            new_signature = Signature.from_string(new_signature)
+        with self._lock:
+            if self._entries.get(entry.signature) is not entry:
+                return
+            del self._entries[entry.signature]
+            entry.signature = new_signature
+            entry.last_valid_block_height = new_last_valid
+            entry.resends += 1
+            entry.subscribed = False
+            self._entries[new_signature] = entry
+            self.resent += 1
+        self._subscribe(entry)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start the polling thread (and the subscription thread when ws_url is set)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="confirmation-tracker", daemon=True)
+        self._thread.start()
+        if self.ws_url:
+            ready = threading.Event()
+            self._ws_thread = threading.Thread(
+                target=lambda: asyncio.run(self._ws_main(ready)), name="signature-subscriptions", daemon=True
+            )
+            self._ws_thread.start()
+            ready.wait(timeout=5)
+            with self._lock:
+                entries = list(self._entries.values())
+            for entry in entries:
+                self._subscribe(entry)
+        return self
+
+    def stop(self):
+        """Stop polling and subscriptions. Unresolved futures stay pending."""
+        self._stop.set()
+        if self._ws_loop is not None:
+            self._ws_loop.call_soon_threadsafe(self._ws_queue.put_nowait, None)
+        for thread in (self._thread, self._ws_thread):
+            if thread:
+                thread.join(timeout=self.poll_interval + 5)
+        self._thread = self._ws_thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _subscribe(self, entry):
+        loop = self._ws_loop
+        if loop is None or entry.subscribed:
+            return
+        entry.subscribed = True
+        loop.call_soon_threadsafe(self._ws_queue.put_nowait, entry)
+
+    async def _ws_main(self, ready):
+        from solana.rpc.websocket_api import connect
+
+        self._ws_queue = asyncio.Queue()
+        self._ws_loop = asyncio.get_running_loop()
+        ready.set()
+        while not self._stop.is_set():
+            try:
+                async with connect(self.ws_url) as websocket:
+                    sender = asyncio.create_task(self._ws_send(websocket))
+                    try:
+                        await self._ws_receive(websocket)
+                    finally:
+                        sender.cancel()
+            except Exception as e:
+                self.last_error = str(e)
+                # Polling keeps working; retry the socket later
+                await asyncio.sleep(self.poll_interval)
+        self._ws_loop = None
+
+    async def _ws_send(self, websocket):
+        while True:
+            entry = await self._ws_queue.get()
+            if entry is None:
+                await websocket.close()
+                return
+            await websocket.signature_subscribe(entry.signature, COMMITMENT_LEVELS[entry.target])
+
+    async def _ws_receive(self, websocket):
+        # Iterating the protocol yields parsed messages until the socket closes
+        async for messages in websocket:
+            for message in messages:
+                request = websocket.subscriptions.get(getattr(message, "subscription", None))
+                if request is None or not hasattr(message.result, "value"):
+                    continue
+                with self._lock:
+                    entry = self._entries.get(request.signature)
+                if entry is None:
+                    continue
+                err = getattr(message.result.value, "err", None)
+                if err is not None:
+                    self._fail(entry, TransactionFailedError(str(err)))
+                else:
+                    self._resolve(entry, message.result.context.slot, COMMITMENT_LEVELS[entry.target])
+
+    def stats(self):
+        """
+        Return tracker statistics.
+
+        Returns:
+            dict: Pending, confirmed, failed, expired and re-sent counts, RPC calls and last error
+        """
+        return {
+            "pending": self.pending(),
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "resent": self.resent,
+            "rpc_calls": self.rpc_calls,
+            "last_error": self.last_error,
+        }
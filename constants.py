@@ -0,0 +1,17 @@
+from solders.pubkey import Pubkey
+
+from defaults import LAMPORTS_PER_SOL  # noqa: F401 (re-exported)
+
+# Default configuration
+MAINNET_RPC_URL = "https://api.mainnet-beta.solana.com"
+PUMP_PROGRAM_ID = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+TOKEN_PROGRAM = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+ASSOCIATED_TOKEN_PROGRAM = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+SYSTEM_PROGRAM = Pubkey.from_string("11111111111111111111111111111111")
+MPL_TOKEN_METADATA = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
+RENT_SYSVAR = Pubkey.from_string("SysvarRent111111111111111111111111111111111")
+EVENT_AUTHORITY = Pubkey.from_string("Ce6TQqeHC9p8KetsN6JsjHK7UTZk7nasjjnr7XxXp9F1")
+
+# Anchor instruction discriminators
+CREATE_DISCRIMINATOR = bytes([24, 30, 200, 40, 5, 28, 7, 119])
+BUY_DISCRIMINATOR = bytes([102, 6, 61, 18, 1, 218, 235, 234])
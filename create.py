@@ -3,52 +3,119 @@ import base58
 from solana.rpc.api import Client
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solders.transaction import Transaction
+from solders.transaction import Transaction, VersionedTransaction
 from solders.message import Message
-from solders.instruction import Instruction, AccountMeta
-import struct
 import time
 import os
 import base64
-from PIL import Image
-import io
-import requests
 from dotenv import load_dotenv
 
+from bonding_curve import (
+    DEFAULT_FEE_BASIS_POINTS,
+    DEFAULT_SLIPPAGE_BPS,
+    TOKEN_DECIMALS,
+    initial_curve,
+    quote_buy,
+)
+from blockhash_provider import BlockhashInfo
+from confirmations import ConfirmationTracker
+from constants import (
+    MAINNET_RPC_URL,
+    PUMP_PROGRAM_ID,
+    TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM,
+    MPL_TOKEN_METADATA,
+    EVENT_AUTHORITY,
+    LAMPORTS_PER_SOL,
+)
+from global_state import GlobalStateCache, to_ws_url
+from images import ImageError, guess_mime_type, preprocess_image_file
+from lookup_table import build_versioned_transaction
+from preflight import validate_launch
+from priority_fees import (
+    CREATE,
+    CREATE_BUY,
+    MAX_COMPUTE_UNIT_LIMIT,
+    ComputeProfile,
+    PriorityFeeEstimator,
+    compute_budget_instructions,
+    launch_path,
+)
+from rate_limit import BLOCKHASH_NOT_FOUND, RateLimitedClient, backoff_delay, get_limiter
+from rpc_router import RpcRouter, parse_rpc_urls
+from storage import CidIndex, PinataStorage
+from templates import LaunchTemplates, GLOBAL, MINT_AUTHORITY
+import tracing
+
 # Load environment variables
 load_dotenv()
 
-# Default configuration
-MAINNET_RPC_URL = "https://api.mainnet-beta.solana.com"
-PUMP_PROGRAM_ID = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
-TOKEN_PROGRAM = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-ASSOCIATED_TOKEN_PROGRAM = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
-SYSTEM_PROGRAM = Pubkey.from_string("11111111111111111111111111111111")
-MPL_TOKEN_METADATA = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
-RENT_SYSVAR = Pubkey.from_string("SysvarRent111111111111111111111111111111111")
-EVENT_AUTHORITY = Pubkey.from_string("Ce6TQqeHC9p8KetsN6JsjHK7UTZk7nasjjnr7XxXp9F1")
-
 # Get API keys from environment variables
 PINATA_API_KEY = os.getenv("PINATA_API_KEY")
 PINATA_SECRET_KEY = os.getenv("PINATA_SECRET_KEY")
 
 PRIVATE_KEY = "VOTRE_CLE_PRIVEE_ICI"  # base58 format
 
+# Seconds the interactive flow waits for the launch to be confirmed
+CONFIRMATION_TIMEOUT = 90
+
 class PumpTokenCreator:
     """
     A class to handle the creation of Pump tokens on the Solana blockchain.
     This class manages token creation, metadata handling, and IPFS uploads.
     """
-    def __init__(self, private_key=None, rpc_url=None):
+    def __init__(self, private_key=None, rpc_url=None, blockhash_provider=None, global_state=None,
+                 key_pool=None, slippage_bps=DEFAULT_SLIPPAGE_BPS, confirmation_tracker=None,
+                 priority_fees=None, compute_profile=None, lookup_table=None, local_preflight=True,
+                 subscribe_global_state=False, ws_url=None):
         """
         Initialize the PumpTokenCreator with optional private key and RPC URL.
         
         Args:
             private_key (str, optional): Base58 encoded private key
-            rpc_url (str, optional): Custom RPC URL for Solana connection
+            rpc_url (str or list, optional): Custom RPC URL for Solana connection, or several
+                (list or comma-separated) to route over with an RpcRouter
+            blockhash_provider (BlockhashProvider, optional): Shared background blockhash source
+            global_state (GlobalStateCache, optional): Shared cache of the Pump global account
+            key_pool (KeyPool, optional): Pool of pre-ground vanity mint keypairs
+            slippage_bps (int): Slippage tolerance on the dev buy's max SOL cost
+            confirmation_tracker (ConfirmationTracker, optional): Shared tracker that launches
+                register their signature with
+            priority_fees (PriorityFeeEstimator, optional): Source of the compute unit price
+                (no priority fee is paid if None)
+            compute_profile (ComputeProfile, optional): Simulated compute units per launch path
+                (loaded from .cu_profile.json if None)
+            lookup_table (AddressLookupTableAccount, optional): Address lookup table holding the
+                static launch accounts; launches are sent as v0 transactions when set
+            local_preflight (bool): Validate launches offline and send them without the RPC
+                node's preflight simulation (the node simulates them if False)
+            subscribe_global_state (bool): Keep the global account cache current through an
+                accountSubscribe websocket instead of refetching it every TTL
+            ws_url (str, optional): Websocket RPC URL for subscriptions (derived from the
+                RPC URL if None)
         """
-        self.rpc_url = rpc_url or MAINNET_RPC_URL
-        self.client = Client(self.rpc_url)
+        rpc_urls = parse_rpc_urls(rpc_url) if isinstance(rpc_url, str) else list(rpc_url or [])
+        if len(rpc_urls) > 1:
+            # Reads go to the healthiest endpoint, transactions are broadcast to the top ones
+            self.rpc_url = rpc_urls[0]
+            self.client = RpcRouter(rpc_urls).start()
+        else:
+            self.rpc_url = rpc_urls[0] if rpc_urls else MAINNET_RPC_URL
+            # Shares the endpoint's rate limiter with every other client of the same host
+            self.client = RateLimitedClient(Client(self.rpc_url), get_limiter(self.rpc_url))
+        self.ws_url = ws_url or to_ws_url(self.rpc_url)
+        self.blockhash_provider = blockhash_provider
+        self.global_state = global_state or GlobalStateCache(self.client)
+        if subscribe_global_state:
+            self.global_state.subscribe(self.ws_url)
+        self.key_pool = key_pool
+        self.slippage_bps = slippage_bps
+        self.confirmation_tracker = confirmation_tracker
+        self.priority_fees = priority_fees
+        self.compute_profile = compute_profile if compute_profile is not None else ComputeProfile()
+        self.lookup_table = lookup_table
+        self.local_preflight = local_preflight
+        self._profiled = False
         
         # Initialize keypair
         if private_key:
@@ -59,6 +126,7 @@ class PumpTokenCreator:
             self.keypair = Keypair()
         
         self.public_key = self.keypair.pubkey()
+        self.templates = LaunchTemplates(self.public_key)
         print(f"Using address: {self.public_key}")
     
     @staticmethod
@@ -86,21 +154,12 @@ class PumpTokenCreator:
         Returns:
             dict: Dictionary containing all necessary PDA addresses
         """
-        global_seed = b"global"
-        global_key, _ = self.find_pda([global_seed], PUMP_PROGRAM_ID)
-        
         bonding_curve_seed = b"bonding-curve"
         bonding_curve_key, _ = self.find_pda(
             [bonding_curve_seed, bytes(mint_keypair.pubkey())], 
             PUMP_PROGRAM_ID
         )
         
-        mint_authority_seed = b"mint-authority"
-        mint_authority_key, _ = self.find_pda(
-            [mint_authority_seed], 
-            PUMP_PROGRAM_ID
-        )
-        
         # Derive metadata address
         seeds = bytes([109, 101, 116, 97, 100, 97, 116, 97])  # "metadata" in bytes
         metadata_key, _ = self.find_pda(
@@ -108,10 +167,11 @@ class PumpTokenCreator:
             MPL_TOKEN_METADATA
         )
         
+        # global and mint_authority do not depend on the mint and are derived once
         return {
-            "global": global_key,
+            "global": GLOBAL,
             "bonding_curve": bonding_curve_key,
-            "mint_authority": mint_authority_key,
+            "mint_authority": MINT_AUTHORITY,
             "metadata": metadata_key
         }
     
@@ -133,39 +193,338 @@ class PumpTokenCreator:
         ]
         return self.find_pda(seeds, ASSOCIATED_TOKEN_PROGRAM)[0]
     
+    def get_global_state(self):
+        """
+        Retrieve the decoded global state from the cache.
+        
+        Returns:
+            GlobalState: Decoded global account or None if not found
+        """
+        try:
+            return self.global_state.get()
+        except Exception as e:
+            print(f"Error retrieving global state: {str(e)}")
+            return None
+    
     def get_fee_recipient(self):
         """
-        Retrieve the fee recipient address from the global state.
+        Retrieve the fee recipient address from the cached global state.
         
         Returns:
             Pubkey: Fee recipient address or None if not found
         """
-        try:
-            global_seed = b"global"
-            global_key, _ = self.find_pda([global_seed], PUMP_PROGRAM_ID)
+        global_state = self.get_global_state()
+        return global_state.fee_recipient if global_state else None
+    
+    def quote_dev_buy(self, dev_buy_amount, global_state=None):
+        """
+        Quote the initial dev buy on a freshly created bonding curve.
+        
+        Args:
+            dev_buy_amount (float): Amount of SOL to spend, fees included
+            global_state (GlobalState, optional): Decoded global account (defaults apply if None)
+            
+        Returns:
+            BuyQuote: Tokens out and max SOL cost for the buy instruction
+        """
+        fee_basis_points = DEFAULT_FEE_BASIS_POINTS
+        if global_state is not None:
+            fee_basis_points = global_state.fee_basis_points + (global_state.creator_fee_basis_points or 0)
+        return quote_buy(
+            int(dev_buy_amount * LAMPORTS_PER_SOL),  # Conversion to lamports
+            initial_curve(global_state),
+            fee_basis_points,
+            self.slippage_bps,
+        )
+    
+    def build_instructions(self, mint_keypair, name, symbol, uri, dev_buy_amount, creator, fee_recipient,
+                           buy_quote=None, pdas=None):
+        """
+        Build the create (and optional ATA + buy) instructions for a new token.
+        
+        Args:
+            mint_keypair (Keypair): The mint keypair
+            name (str): Token name
+            symbol (str): Token symbol
+            uri (str): Metadata URI
+            dev_buy_amount (float): Amount of SOL to spend on initial buy
+            creator (Pubkey): Creator's public key
+            fee_recipient (Pubkey): Fee recipient from the global state
+            buy_quote (BuyQuote, optional): Dev buy quote (computed with default curve parameters if None)
+            pdas (dict, optional): Addresses from LaunchTemplates.derive_addresses() for this mint
+                (derived if None)
             
-            # RPC call to get account data
-            response = self.client.get_account_info(global_key)
-            if response.value is None:
-                print("Unable to retrieve global state.")
-                return None
+        Returns:
+            tuple: (list of instructions, dictionary of PDAs)
+        """
+        mint = mint_keypair.pubkey()
+        
+        # Mint-dependent PDAs and ATAs; constant PDAs come precomputed
+        if pdas is None:
+            pdas = self.templates.derive_addresses(mint)
+        
+        instructions = [self.templates.create_instruction(mint, pdas, name, symbol, uri, creator)]
+        
+        if dev_buy_amount > 0:
+            # Add instruction to create user ATA
+            instructions.append(self.templates.ata_instruction(mint, pdas))
             
-            # Account data starts with an 8-byte discriminator, followed by the structure
-            # Global structure: initialized (bool), authority (pubkey), feeRecipient (pubkey), ...
-            # bool = 1 byte, pubkey = 32 bytes
-            # feeRecipient starts at offset 8 (discriminator) + 1 (initialized) + 32 (authority) = 41
-            account_data = response.value.data
-            if len(account_data) < 73:  # 8 + 1 + 32 + 32
-                print("Invalid global account data.")
-                return None
+            # Construct buy instruction sized from the bonding curve
+            if buy_quote is None:
+                buy_quote = self.quote_dev_buy(dev_buy_amount)
+            instructions.append(self.templates.buy_instruction(
+                mint, pdas, fee_recipient, buy_quote.tokens_out, buy_quote.max_sol_cost
+            ))
+        
+        return instructions, pdas
+    
+    def build_transaction(self, instructions, mint_keypair, blockhash):
+        """
+        Build and sign the launch transaction.
+        
+        Args:
+            instructions (list): Instructions returned by build_instructions()
+            mint_keypair (Keypair): The mint keypair (co-signer)
+            blockhash (Hash): Recent blockhash
             
-            # Extract fee recipient address
-            fee_recipient_bytes = account_data[41:73]
-            fee_recipient = Pubkey(fee_recipient_bytes)
-            return fee_recipient
-        except Exception as e:
-            print(f"Error retrieving fee recipient: {str(e)}")
+        Returns:
+            Transaction or VersionedTransaction: Signed transaction ready to be serialized
+                (a v0 transaction when a lookup table is configured)
+        """
+        if self.lookup_table is not None:
+            return build_versioned_transaction(
+                instructions, self.public_key, [self.keypair, mint_keypair], blockhash, [self.lookup_table]
+            )
+        
+        # Construct transaction message
+        message = Message(instructions, self.public_key)
+        
+        # Construct transaction
+        return Transaction(
+            [self.keypair, mint_keypair], 
+            message, 
+            blockhash
+        )
+    
+    def priority_fee(self, fee_recipient=None):
+        """
+        Return the compute unit price to pay, sampling the accounts a launch write-locks.
+        
+        The first call samples recent fees over the network unless the
+        estimator was started or refreshed before; later calls use its cache.
+        
+        Args:
+            fee_recipient (Pubkey, optional): Fee recipient the launch write-locks
+            
+        Returns:
+            int: Micro-lamports per compute unit (0 without an estimator)
+        """
+        if self.priority_fees is None:
+            return 0
+        for account in self.templates.shared_writable_accounts(fee_recipient):
+            self.priority_fees.watch(account)
+        return self.priority_fees.price()
+    
+    def add_compute_budget(self, instructions, fee_recipient=None, price=None):
+        """
+        Prepend compute unit limit and price instructions to launch instructions.
+        
+        Args:
+            instructions (list): Instructions returned by build_instructions()
+            fee_recipient (Pubkey, optional): Fee recipient the launch write-locks; added to
+                the accounts the priority fee is sampled for
+            price (int, optional): Compute unit price already estimated with priority_fee()
+                (estimated here if None)
+            
+        Returns:
+            list: ComputeBudget instructions followed by the launch instructions
+        """
+        unit_limit = self.compute_profile.limit(launch_path(instructions))
+        unit_price = self.priority_fee(fee_recipient) if price is None else price
+        return compute_budget_instructions(unit_limit, unit_price) + instructions
+    
+    def profile_compute_units(self, force=False):
+        """
+        Simulate the create and create+buy paths once and record the compute units they use.
+        
+        Paths already in the profile are skipped unless force is set. Failed
+        simulations leave the default limits in place.
+        
+        Args:
+            force (bool): Simulate again even if the profile has the path
+            
+        Returns:
+            dict: Simulated units per launch path (None where simulation failed)
+        """
+        if self._profiled and not force:
+            return {path: self.compute_profile.units(path) for path in (CREATE, CREATE_BUY)}
+        self._profiled = True
+        global_state = self.get_global_state()
+        fee_recipient = global_state.fee_recipient if global_state else EVENT_AUTHORITY
+        for path, dev_buy_amount in ((CREATE, 0), (CREATE_BUY, 0.01)):
+            if path in self.compute_profile and not force:
+                continue
+            try:
+                mint_keypair = Keypair()
+                instructions, _ = self.build_instructions(
+                    mint_keypair, "Profile", "PRF", "https://example.com/profile.json", dev_buy_amount,
+                    self.public_key, fee_recipient, self.quote_dev_buy(dev_buy_amount, global_state)
+                )
+                # Simulate with the maximum limit so the measurement is never truncated
+                instructions = compute_budget_instructions(MAX_COMPUTE_UNIT_LIMIT) + instructions
+                tx = self.build_transaction(instructions, mint_keypair, self.get_recent_blockhash().blockhash)
+                tracing.count("rpc_calls", method="simulateTransaction")
+                if isinstance(tx, Transaction):
+                    # solana-py only simulates versioned transactions
+                    tx = VersionedTransaction.from_legacy(tx)
+                simulation = self.client.simulate_transaction(tx).value
+                if simulation.err is not None or not simulation.units_consumed:
+                    print(f"Compute profile simulation of {path} failed: {simulation.err}")
+                    continue
+                self.compute_profile.record(path, simulation.units_consumed)
+                print(f"Compute profile: {path} uses {simulation.units_consumed} CU")
+            except Exception as e:
+                print(f"Compute profile simulation of {path} failed: {str(e)}")
+        return {path: self.compute_profile.units(path) for path in (CREATE, CREATE_BUY)}
+    
+    def new_mint_keypair(self):
+        """
+        Get a keypair for a new mint, from the vanity key pool when one is configured.
+        
+        Returns:
+            Keypair: Mint keypair
+        """
+        if self.key_pool is not None:
+            keypair = self.key_pool.pop()
+            if keypair is not None:
+                return keypair
+            print("Key pool is empty, generating a random mint address.")
+        return Keypair()
+    
+    def release_mint_keypair(self, mint_keypair, sent):
+        """
+        Settle a mint keypair from new_mint_keypair() once its launch finished.
+        
+        Args:
+            mint_keypair (Keypair): The mint keypair
+            sent (bool): Whether the launch was sent (the key is then used up)
+        """
+        if self.key_pool is None:
+            return
+        if sent:
+            self.key_pool.mark_used(mint_keypair)
+        else:
+            self.key_pool.put_back(mint_keypair)
+    
+    def get_recent_blockhash(self):
+        """
+        Get a recent blockhash, from the shared provider when one is configured.
+        
+        Returns:
+            BlockhashInfo: Recent blockhash and its last valid block height
+        """
+        if self.blockhash_provider is not None:
+            return self.blockhash_provider.get()
+        tracing.count("rpc_calls", method="getLatestBlockhash")
+        blockhash_resp = self.client.get_latest_blockhash()
+        return BlockhashInfo(
+            blockhash_resp.value.blockhash,
+            blockhash_resp.value.last_valid_block_height,
+            time.monotonic(),
+        )
+    
+    def resend_transaction(self, instructions, mint_keypair):
+        """
+        Re-sign a launch with a fresh blockhash and send it again (used when the first one expired).
+        
+        Args:
+            instructions (list): Launch instructions of the original launch (without compute
+                budget instructions; the priority fee is re-estimated)
+            mint_keypair (Keypair): The mint keypair
+            
+        Returns:
+            tuple: (new transaction signature, last valid block height)
+        """
+        blockhash_info = self.get_recent_blockhash()
+        tx = self.build_transaction(self.add_compute_budget(instructions), mint_keypair, blockhash_info.blockhash)
+        opts = self.preflight(tx)
+        tracing.count("rpc_calls", method="sendTransaction")
+        tracing.count("retries", cause="blockhash_expired")
+        result = self.client.send_raw_transaction(bytes(tx), opts=opts)
+        print(f"Transaction re-sent: {result.value}")
+        return result.value, blockhash_info.last_valid_block_height
+    
+    def preflight(self, tx, fee_recipient=None):
+        """
+        Validate a signed launch offline before it is sent.
+        
+        Args:
+            tx (Transaction or VersionedTransaction): Signed launch transaction
+            fee_recipient (Pubkey, optional): Expected fee recipient of the buy
+            
+        Returns:
+            TxOpts or None: Send options skipping the RPC node's preflight simulation, or
+                None (simulated by the node) when local preflight is off
+            
+        Raises:
+            PreflightError: If the launch would be rejected on chain
+        """
+        if not self.local_preflight:
             return None
+        with tracing.span("preflight"):
+            lookup_tables = [self.lookup_table] if self.lookup_table is not None else []
+            # Signed here by build_transaction(), so signatures are only checked for presence
+            return validate_launch(tx, self.public_key, fee_recipient, lookup_tables, verify_signatures=False)
+    
+    def send_launch(self, tx, instructions, mint_keypair, blockhash_info, fee_recipient=None):
+        """
+        Send a signed launch and register it with the confirmation tracker.
+        
+        Args:
+            tx (Transaction or VersionedTransaction): Signed launch transaction
+            instructions (list): Launch instructions without compute budget (used to re-sign
+                if the blockhash expires before the launch lands)
+            mint_keypair (Keypair): The mint keypair
+            blockhash_info (BlockhashInfo): Blockhash the transaction was signed with
+            fee_recipient (Pubkey, optional): Expected fee recipient of the buy (checked by preflight())
+            
+        Returns:
+            tuple: (transaction signature, confirmation future or None without a tracker)
+        """
+        opts = self.preflight(tx, fee_recipient)
+        with tracing.span("send") as send_span:
+            # Use bytes() to serialize the transaction
+            serialized_tx = bytes(tx)
+            tracing.count("rpc_calls", method="sendTransaction")
+            result = self.client.send_raw_transaction(serialized_tx, opts=opts)
+            send_span.set(signature=str(result.value), bytes=len(serialized_tx))
+        
+        print(f"Transaction submitted: {result.value}")
+        confirmation = None
+        if self.confirmation_tracker is not None:
+            # Future resolving once the launch lands (re-sent if the blockhash expires)
+            confirmation = self.confirmation_tracker.track(
+                result.value,
+                blockhash_info.last_valid_block_height,
+                resend=lambda: self.resend_transaction(instructions, mint_keypair),
+            )
+        return result.value, confirmation
+    
+    def resolve_creator(self, creator):
+        """
+        Resolve the creator argument to a Pubkey.
+        
+        Args:
+            creator (str or Pubkey, optional): Creator's public key
+            
+        Returns:
+            Pubkey: Creator public key (defaults to the wallet owner)
+        """
+        if creator is None:
+            return self.public_key
+        if isinstance(creator, Pubkey):
+            return creator
+        return Pubkey.from_string(creator)
     
     def create_token_with_buy(self, name, symbol, uri, dev_buy_amount, creator=None):
         """
@@ -184,291 +543,164 @@ class PumpTokenCreator:
         max_retries = 3
         retry_count = 0
         
-        while retry_count < max_retries:
+        with tracing.span("launch", symbol=symbol, dev_buy_amount=dev_buy_amount) as launch_span:
+            # Create mint keypair once so retries do not burn pre-ground vanity keys
+            with tracing.span("mint_keypair"):
+                mint_keypair = self.new_mint_keypair()
+            print(f"New mint address created: {mint_keypair.pubkey()}")
+            launch_span.set(mint=str(mint_keypair.pubkey()))
+            
+            sent = False
             try:
-                # Default creator is the wallet owner
-                if creator is None:
-                    creator = self.public_key
-                else:
-                    creator = Pubkey.from_string(creator)
-                    
-                # Create mint keypair
-                mint_keypair = Keypair()
-                print(f"New mint address created: {mint_keypair.pubkey()}")
-                
-                # Get necessary PDAs
-                pdas = self.get_mint_pda(mint_keypair)
-                
-                # Find associated token account for bonding curve
-                associated_bonding_curve = self.get_associated_token_address(
-                    pdas["bonding_curve"],
-                    mint_keypair.pubkey()
-                )
-                
-                # Find associated token account for user
-                associated_user = self.get_associated_token_address(
-                    self.public_key,
-                    mint_keypair.pubkey()
-                )
-                
-                # Get fee recipient
-                fee_recipient = self.get_fee_recipient()
-                if not fee_recipient:
-                    fee_recipient = EVENT_AUTHORITY
-                    print(f"Using event authority as fee recipient: {fee_recipient}")
-                else:
-                    print(f"Fee recipient retrieved: {fee_recipient}")
-                
-                # Construct creation instruction
-                create_ix_data = bytes([24, 30, 200, 40, 5, 28, 7, 119])
-                name_bytes = name.encode('utf-8')
-                symbol_bytes = symbol.encode('utf-8')
-                uri_bytes = uri.encode('utf-8')
-                
-                create_ix_data += len(name_bytes).to_bytes(4, byteorder='little')
-                create_ix_data += name_bytes
-                create_ix_data += len(symbol_bytes).to_bytes(4, byteorder='little')
-                create_ix_data += symbol_bytes
-                create_ix_data += len(uri_bytes).to_bytes(4, byteorder='little')
-                create_ix_data += uri_bytes
-                create_ix_data += bytes(creator)
-                
-                create_accounts = [
-                    AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=pdas["mint_authority"], is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=pdas["bonding_curve"], is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=pdas["global"], is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=MPL_TOKEN_METADATA, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=pdas["metadata"], is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=self.public_key, is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=ASSOCIATED_TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
-                ]
-                
-                create_ix = Instruction(
-                    program_id=PUMP_PROGRAM_ID,
-                    accounts=create_accounts,
-                    data=create_ix_data
-                )
-                
-                # List of instructions
-                instructions = [create_ix]
-                
-                if dev_buy_amount > 0:
-                    # Add instruction to create user ATA
-                    ata_ix_data = bytes([])  # No data needed for create_associated_token_account
-                    ata_accounts = [
-                        AccountMeta(pubkey=self.public_key, is_signer=True, is_writable=True),  # Payer
-                        AccountMeta(pubkey=associated_user, is_signer=False, is_writable=True),  # ATA
-                        AccountMeta(pubkey=self.public_key, is_signer=False, is_writable=False),  # Owner
-                        AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=False, is_writable=False),  # Mint
-                        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
-                    ]
-                    
-                    ata_ix = Instruction(
-                        program_id=ASSOCIATED_TOKEN_PROGRAM,
-                        accounts=ata_accounts,
-                        data=ata_ix_data
-                    )
-                    
-                    instructions.append(ata_ix)
-                    
-                    # Construct buy instruction
-                    buy_ix_data = bytes([102, 6, 61, 18, 1, 218, 235, 234])
-                    buy_amount = 1_000_000  # Adjust for 1 token with 6 decimals (e.g.)
-                    max_sol_cost = int(dev_buy_amount * 1_000_000_000)  # Conversion to lamports
-                    
-                    buy_ix_data += buy_amount.to_bytes(8, byteorder='little')
-                    buy_ix_data += max_sol_cost.to_bytes(8, byteorder='little')
-                    
-                    buy_accounts = [
-                        AccountMeta(pubkey=pdas["global"], is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=fee_recipient, is_signer=False, is_writable=True),
-                        AccountMeta(pubkey=mint_keypair.pubkey(), is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=pdas["bonding_curve"], is_signer=False, is_writable=True),
-                        AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                        AccountMeta(pubkey=associated_user, is_signer=False, is_writable=True),
-                        AccountMeta(pubkey=self.public_key, is_signer=True, is_writable=True),
-                        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=RENT_SYSVAR, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                        AccountMeta(pubkey=PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
-                    ]
-                    
-                    buy_ix = Instruction(
-                        program_id=PUMP_PROGRAM_ID,
-                        accounts=buy_accounts,
-                        data=buy_ix_data
-                    )
-                    
-                    instructions.append(buy_ix)
-                
-                # Get new blockhash
-                blockhash_resp = self.client.get_latest_blockhash()
-                blockhash = blockhash_resp.value.blockhash
-                
-                # Construct transaction message
-                message = Message(instructions, self.public_key)
-                
-                # Construct transaction
-                tx = Transaction(
-                    [self.keypair, mint_keypair], 
-                    message, 
-                    blockhash
-                )
-                
-                # Serialize and send transaction
-                try:
-                    # Use bytes() to serialize the transaction
-                    serialized_tx = bytes(tx)
-                    result = self.client.send_raw_transaction(serialized_tx)
+                # Size the compute unit limit from a one-time simulation (no-op once profiled)
+                with tracing.span("profile_compute_units"):
+                    self.profile_compute_units()
+            
+                while retry_count < max_retries:
+                    try:
+                        with tracing.span("attempt", attempt=retry_count + 1):
+                            # Default creator is the wallet owner
+                            creator_key = self.resolve_creator(creator)
+                        
+                            # Get fee recipient and curve parameters
+                            with tracing.span("global_state"):
+                                global_state = self.get_global_state()
+                            fee_recipient = global_state.fee_recipient if global_state else None
+                            if not fee_recipient:
+                                fee_recipient = EVENT_AUTHORITY
+                                print(f"Using event authority as fee recipient: {fee_recipient}")
+                            else:
+                                print(f"Fee recipient retrieved: {fee_recipient}")
+                        
+                            with tracing.span("build_instructions"):
+                                buy_quote = self.quote_dev_buy(dev_buy_amount, global_state)
+                                instructions, pdas = self.build_instructions(
+                                    mint_keypair, name, symbol, uri, dev_buy_amount, creator_key, fee_recipient,
+                                    buy_quote
+                                )
+                                budgeted = self.add_compute_budget(instructions, fee_recipient)
+                        
+                            # Get new blockhash
+                            with tracing.span("blockhash"):
+                                blockhash_info = self.get_recent_blockhash()
+                        
+                            with tracing.span("sign"):
+                                tx = self.build_transaction(budgeted, mint_keypair, blockhash_info.blockhash)
+                        
+                            # Serialize and send transaction
+                            try:
+                                signature, confirmation = self.send_launch(
+                                    tx, instructions, mint_keypair, blockhash_info, fee_recipient
+                                )
+                                sent = True
+                                launch = {
+                                    "success": True,
+                                    "mint": str(mint_keypair.pubkey()),
+                                    "tx_signature": signature,
+                                    "bonding_curve": str(pdas["bonding_curve"]),
+                                    "dev_buy_amount": dev_buy_amount if dev_buy_amount > 0 else 0,
+                                    "dev_buy_tokens": buy_quote.tokens_out
+                                }
+                                if confirmation is not None:
+                                    launch["confirmation"] = confirmation
+                                launch_span.set(success=True, signature=str(signature), attempts=retry_count + 1)
+                                return launch
+                            except Exception as e:
+                                print(f"Error during transaction serialization: {str(e)}")
+                                launch_span.set(success=False, error=str(e))
+                                return {"success": False, "error": str(e)}
                     
-                    print(f"Transaction submitted: {result.value}")
-                    return {
-                        "success": True,
-                        "mint": str(mint_keypair.pubkey()),
-                        "tx_signature": result.value,
-                        "bonding_curve": str(pdas["bonding_curve"]),
-                        "dev_buy_amount": dev_buy_amount if dev_buy_amount > 0 else 0
-                    }
-                except Exception as e:
-                    print(f"Error during transaction serialization: {str(e)}")
-                    return {"success": False, "error": str(e)}
-                
-            except Exception as e:
-                error_str = str(e)
-                if "Blockhash not found" in error_str:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        print(f"Attempt {retry_count + 1} out of {max_retries}...")
-                        time.sleep(1)
-                        continue
-                print(f"Error creating token: {error_str}")
-                return {"success": False, "error": error_str}
-        
-        return {"success": False, "error": "Maximum number of attempts reached"}
+                    except Exception as e:
+                        error_str = str(e)
+                        if "Blockhash not found" in error_str:
+                            tracing.count("retries", cause="blockhash_not_found")
+                            if self.blockhash_provider is not None:
+                                self.blockhash_provider.invalidate()
+                            retry_count += 1
+                            if retry_count < max_retries:
+                                print(f"Attempt {retry_count + 1} out of {max_retries}...")
+                                time.sleep(backoff_delay(BLOCKHASH_NOT_FOUND, retry_count - 1))
+                                continue
+                        print(f"Error creating token: {error_str}")
+                        launch_span.set(success=False, error=error_str)
+                        return {"success": False, "error": error_str}
+            
+                launch_span.set(success=False, error="Maximum number of attempts reached")
+                return {"success": False, "error": "Maximum number of attempts reached"}
+            finally:
+                # A pre-ground vanity key goes back to the pool unless the launch was sent
+                self.release_mint_keypair(mint_keypair, sent)
+
 
+_default_storage = None
 
-def upload_to_ipfs(image_path):
+def get_storage():
+    """Return the shared Pinata storage client (pooled session, persistent CID index)"""
+    global _default_storage
+    if _default_storage is None:
+        _default_storage = PinataStorage(PINATA_API_KEY, PINATA_SECRET_KEY, index=CidIndex())
+    return _default_storage
+
+def upload_to_ipfs(image_path, storage=None):
     """Upload an image to IPFS via Pinata"""
     try:
-        url = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-        
-        with open(image_path, 'rb') as img_file:
-            files = {'file': (os.path.basename(image_path), img_file)}
-            headers = {
-                'pinata_api_key': PINATA_API_KEY,
-                'pinata_secret_api_key': PINATA_SECRET_KEY
-            }
-            
-            response = requests.post(url, files=files, headers=headers)
-            if response.status_code == 200:
-                ipfs_hash = response.json()['IpfsHash']
-                return f"https://gateway.pinata.cloud/ipfs/{ipfs_hash}"
-            else:
-                print(f"Error uploading to IPFS: {response.text}")
-                return None
+        return (storage or get_storage()).upload_file(image_path)
     except Exception as e:
         print(f"Error uploading to IPFS: {str(e)}")
         return None
 
-def upload_metadata_to_ipfs(metadata):
+def upload_image_to_ipfs(image_path, storage=None, **preprocess_options):
+    """
+    Validate, downsize and recompress an image, then upload it to IPFS via Pinata.
+    
+    Args:
+        image_path (str): Local image file
+        storage (StorageClient, optional): Upload backend (defaults to the shared Pinata client)
+        **preprocess_options: Options for images.preprocess_image() (target_format, max_dimension, quality)
+        
+    Returns:
+        tuple: (image URI, MIME type) or (None, None) on failure
+    """
+    try:
+        with tracing.span("preprocess_image"):
+            processed = preprocess_image_file(image_path, **preprocess_options)
+        print(f"Image processed: {processed.original_bytes:,} -> {len(processed.data):,} bytes "
+              f"({processed.width}x{processed.height} {processed.mime_type})")
+        with tracing.span("pinata_upload", bytes=len(processed.data)):
+            uri = (storage or get_storage()).upload_bytes(processed.data, processed.filename, processed.mime_type)
+        return uri, processed.mime_type
+    except ImageError as e:
+        print(f"Invalid image: {str(e)}")
+    except Exception as e:
+        print(f"Error uploading to IPFS: {str(e)}")
+    return None, None
+
+def upload_metadata_to_ipfs(metadata, storage=None):
     """Upload metadata to IPFS via Pinata"""
     try:
-        url = "https://api.pinata.cloud/pinning/pinJSONToIPFS"
-        
-        headers = {
-            'Content-Type': 'application/json',
-            'pinata_api_key': PINATA_API_KEY,
-            'pinata_secret_api_key': PINATA_SECRET_KEY
-        }
-        
-        response = requests.post(url, json=metadata, headers=headers)
-        if response.status_code == 200:
-            ipfs_hash = response.json()['IpfsHash']
-            return f"https://gateway.pinata.cloud/ipfs/{ipfs_hash}"
-        else:
-            print(f"Error uploading metadata to IPFS: {response.text}")
-            return None
+        return (storage or get_storage()).upload_json(metadata)
     except Exception as e:
         print(f"Error uploading metadata to IPFS: {str(e)}")
         return None
 
-def interactive_token_creation():
-    print("=== Pump Token Creator ===")
-    
-    # Check if using default key or ask for a new one
-    use_default_key = PRIVATE_KEY != "private_key"
-    private_key = PRIVATE_KEY
-    
-    if not use_default_key:
-        key_input = input("Enter your private key (leave empty to generate a new one): ")
-        if key_input.strip():
-            private_key = key_input
-    
-    # Create PumpTokenCreator instance
-    creator = PumpTokenCreator(private_key=private_key)
-    
-    # Collect token information
-    print("\nEnter information for your new token:")
-    name = input("Token name: ")
-    symbol = input("Token symbol: ")
-    description = input("Token description: ")
-    
-    # Image handling
-    print("\nImage handling:")
-    print("1. Use a local image (will be uploaded to IPFS)")
-    print("2. Use an image URL")
-    image_choice = input("Choose an option (1 or 2): ")
-    
-    image_uri = None
-    if image_choice == "1":
-        image_path = input("Image file name (ex: image.png): ")
-        if os.path.exists(image_path):
-            print("\nUploading image to IPFS...")
-            image_uri = upload_to_ipfs(image_path)
-            
-            if not image_uri:
-                print("Upload failed. Please use a URL instead.")
-                image_uri = input("Image URL: ")
-        else:
-            print(f"File {image_path} does not exist. Please use a URL instead.")
-            image_uri = input("Image URL: ")
-    else:
-        image_uri = input("Image URL: ")
-    
-    if not image_uri:
-        print("Error: No image provided.")
-        return
-    
-    # Ask for social links
-    print("\nSocial links (optional):")
-    telegram = input("Telegram link (leave empty if none): ")
-    website = input("Website (leave empty if none): ")
-    twitter = input("Twitter link (leave empty if none): ")
-    
-    # Ask for initial dev buy amount
-    dev_buy_amount = 0
-    try:
-        dev_buy_input = input("\nInitial dev buy amount in SOL (leave empty or 0 for none): ")
-        if dev_buy_input.strip():
-            dev_buy_amount = float(dev_buy_input)
-            if dev_buy_amount < 0:
-                print("Amount cannot be negative. Setting to 0.")
-                dev_buy_amount = 0
-    except ValueError:
-        print("Invalid amount. Setting to 0.")
-        dev_buy_amount = 0
+def build_metadata(name, symbol, description, image_uri, telegram="", website="", twitter="",
+                   image_type=None):
+    """
+    Build token metadata in Metaplex format.
     
-    # Create metadata in Metaplex format
+    Args:
+        name (str): Token name
+        symbol (str): Token symbol
+        description (str): Token description
+        image_uri (str): Image URI
+        telegram (str, optional): Telegram link
+        website (str, optional): Website
+        twitter (str, optional): Twitter link
+        image_type (str, optional): Image MIME type (guessed from the URI if None)
+        
+    Returns:
+        dict: Metadata ready to be uploaded
+    """
     metadata = {
         "name": name,
         "symbol": symbol,
@@ -479,7 +711,7 @@ def interactive_token_creation():
         "website": website if website else "",
         "attributes": [],
         "properties": {
-            "files": [{"uri": image_uri, "type": "image/png"}],
+            "files": [{"uri": image_uri, "type": image_type or guess_mime_type(image_uri)}],
             "category": "image"
         }
     }
@@ -495,52 +727,156 @@ def interactive_token_creation():
         if twitter:
             metadata["properties"]["links"]["twitter"] = twitter
     
-    # Upload metadata to IPFS (recommended solution)
-    print("\nUploading metadata to IPFS...")
-    metadata_uri = upload_metadata_to_ipfs(metadata)
-    
-    if not metadata_uri:
-        print("Failed to upload metadata. Using data URI as fallback.")
-        # Use a data URI as fallback solution
-        metadata_json = json.dumps(metadata)
-        metadata_uri = f"data:application/json;base64,{base64.b64encode(metadata_json.encode()).decode()}"
-    
-    creator_input = input("Creator address (leave empty to use your address): ")
-    creator_address = creator_input if creator_input.strip() else None
-    
-    # Confirmation
-    print("\nSummary:")
-    print(f"Name: {name}")
-    print(f"Symbol: {symbol}")
-    print(f"Description: {description}")
-    print(f"Image: {image_uri}")
-    print(f"Metadata URI: {metadata_uri}")
-    print(f"Telegram: {telegram if telegram else 'Not specified'}")
-    print(f"Website: {website if website else 'Not specified'}")
-    print(f"Twitter: {twitter if twitter else 'Not specified'}")
-    print(f"Creator: {creator_address if creator_address else creator.public_key}")
-    print(f"Initial dev buy: {dev_buy_amount if dev_buy_amount > 0 else 'None'} SOL")
-    
-    confirm = input("\nConfirm token creation? (y/n): ")
-    if confirm.lower() != 'y':
-        print("Creation cancelled")
-        return
-    
-    # Create token with optional initial buy
-    print("\nCreating token...")
-    result = creator.create_token_with_buy(name, symbol, metadata_uri, dev_buy_amount, creator_address)
-    
-    if result["success"]:
-        print("\n=== Token creation successful! ===")
-        print(f"Mint address: {result['mint']}")
-        print(f"Transaction signature: {result['tx_signature']}")
-        print(f"Bonding curve address: {result['bonding_curve']}")
-        if result.get("dev_buy_amount", 0) > 0:
-            print(f"Initial dev buy: {result['dev_buy_amount']} SOL")
-        print("\nToken is now available on the blockchain!")
-    else:
-        print("\n=== Token creation failed ===")
-        print(f"Error: {result['error']}")
+    return metadata
+
+def metadata_to_data_uri(metadata):
+    """Encode metadata as a base64 data URI (fallback when IPFS upload fails)"""
+    metadata_json = json.dumps(metadata)
+    return f"data:application/json;base64,{base64.b64encode(metadata_json.encode()).decode()}"
+
+def interactive_token_creation():
+    # Phase timings go to TRACE_FILE / METRICS_FILE when set
+    tracer = tracing.configure_from_env()
+    try:
+        _interactive_token_creation()
+    finally:
+        tracer.close()
+
+def _interactive_token_creation():
+    print("=== Pump Token Creator ===")
+    
+    # Check if using default key or ask for a new one
+    use_default_key = PRIVATE_KEY != "private_key"
+    private_key = PRIVATE_KEY
+    
+    if not use_default_key:
+        key_input = input("Enter your private key (leave empty to generate a new one): ")
+        if key_input.strip():
+            private_key = key_input
+    
+    # Create PumpTokenCreator instance
+    creator = PumpTokenCreator(private_key=private_key)
+    # Sample recent priority fees in the background while the form is filled in
+    creator.priority_fees = PriorityFeeEstimator(creator.rpc_url).start()
+    
+    try:
+        # Collect token information
+        print("\nEnter information for your new token:")
+        name = input("Token name: ")
+        symbol = input("Token symbol: ")
+        description = input("Token description: ")
+    
+        # Image handling
+        print("\nImage handling:")
+        print("1. Use a local image (will be uploaded to IPFS)")
+        print("2. Use an image URL")
+        image_choice = input("Choose an option (1 or 2): ")
+    
+        image_uri = None
+        image_type = None
+        if image_choice == "1":
+            image_path = input("Image file name (ex: image.png): ")
+            if os.path.exists(image_path):
+                print("\nUploading image to IPFS...")
+                with tracing.span("upload_image", path=image_path):
+                    image_uri, image_type = upload_image_to_ipfs(image_path)
+            
+                if not image_uri:
+                    print("Upload failed. Please use a URL instead.")
+                    image_uri = input("Image URL: ")
+            else:
+                print(f"File {image_path} does not exist. Please use a URL instead.")
+                image_uri = input("Image URL: ")
+        else:
+            image_uri = input("Image URL: ")
+    
+        if not image_uri:
+            print("Error: No image provided.")
+            return
+    
+        # Ask for social links
+        print("\nSocial links (optional):")
+        telegram = input("Telegram link (leave empty if none): ")
+        website = input("Website (leave empty if none): ")
+        twitter = input("Twitter link (leave empty if none): ")
+    
+        # Ask for initial dev buy amount
+        dev_buy_amount = 0
+        try:
+            dev_buy_input = input("\nInitial dev buy amount in SOL (leave empty or 0 for none): ")
+            if dev_buy_input.strip():
+                dev_buy_amount = float(dev_buy_input)
+                if dev_buy_amount < 0:
+                    print("Amount cannot be negative. Setting to 0.")
+                    dev_buy_amount = 0
+        except ValueError:
+            print("Invalid amount. Setting to 0.")
+            dev_buy_amount = 0
+    
+        # Create metadata in Metaplex format
+        metadata = build_metadata(name, symbol, description, image_uri, telegram, website, twitter, image_type)
+    
+        # Upload metadata to IPFS (recommended solution)
+        print("\nUploading metadata to IPFS...")
+        with tracing.span("upload_metadata"):
+            metadata_uri = upload_metadata_to_ipfs(metadata)
+    
+        if not metadata_uri:
+            print("Failed to upload metadata. Using data URI as fallback.")
+            # Use a data URI as fallback solution
+            metadata_uri = metadata_to_data_uri(metadata)
+    
+        creator_input = input("Creator address (leave empty to use your address): ")
+        creator_address = creator_input if creator_input.strip() else None
+    
+        # Confirmation
+        print("\nSummary:")
+        print(f"Name: {name}")
+        print(f"Symbol: {symbol}")
+        print(f"Description: {description}")
+        print(f"Image: {image_uri}")
+        print(f"Metadata URI: {metadata_uri}")
+        print(f"Telegram: {telegram if telegram else 'Not specified'}")
+        print(f"Website: {website if website else 'Not specified'}")
+        print(f"Twitter: {twitter if twitter else 'Not specified'}")
+        print(f"Creator: {creator_address if creator_address else creator.public_key}")
+        print(f"Initial dev buy: {dev_buy_amount if dev_buy_amount > 0 else 'None'} SOL")
+        print(f"Priority fee ({creator.priority_fees.policy}): {creator.priority_fees.price()} micro-lamports/CU")
+    
+        confirm = input("\nConfirm token creation? (y/n): ")
+        if confirm.lower() != 'y':
+            print("Creation cancelled")
+            return
+    
+        # Create token with optional initial buy
+        print("\nCreating token...")
+        creator.confirmation_tracker = ConfirmationTracker(creator.client).start()
+        result = creator.create_token_with_buy(name, symbol, metadata_uri, dev_buy_amount, creator_address)
+    
+        if result["success"]:
+            print("\n=== Token creation successful! ===")
+            print(f"Mint address: {result['mint']}")
+            print(f"Transaction signature: {result['tx_signature']}")
+            print(f"Bonding curve address: {result['bonding_curve']}")
+            print("Waiting for confirmation...")
+            try:
+                with tracing.span("confirmation", signature=str(result["tx_signature"])):
+                    confirmation = result["confirmation"].result(timeout=CONFIRMATION_TIMEOUT)
+                print(f"Transaction {confirmation['confirmation_status']} in slot {confirmation['slot']}"
+                      f" ({confirmation['signature']})")
+            except Exception as e:
+                print(f"Transaction not confirmed: {str(e) or 'timed out'}")
+            if result.get("dev_buy_amount", 0) > 0:
+                print(f"Initial dev buy: {result['dev_buy_amount']} SOL "
+                      f"({result['dev_buy_tokens'] / 10 ** TOKEN_DECIMALS:,.2f} tokens)")
+            print("\nToken is now available on the blockchain!")
+        else:
+            print("\n=== Token creation failed ===")
+            print(f"Error: {result['error']}")
+    finally:
+        if creator.confirmation_tracker is not None:
+            creator.confirmation_tracker.stop()
+        creator.priority_fees.stop()
 
 if __name__ == "__main__":
     interactive_token_creation()
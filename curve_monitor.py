@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from dotenv import load_dotenv
+from solana.rpc.types import DataSliceOpts
+from solders.pubkey import Pubkey
+
+from bonding_curve import (
+    BONDING_CURVE_DISCRIMINATOR,
+    BONDING_CURVE_LAYOUT,
+    DEFAULT_REAL_TOKEN_RESERVES,
+    LAMPORTS_PER_SOL,
+    TOKEN_DECIMALS,
+)
+from defaults import COMMITMENT_LEVELS
+import tracing
+
+# Load environment variables
+load_dotenv()
+
+# getMultipleAccounts accepts at most 100 accounts per call
+MAX_ACCOUNTS_PER_CALL = 100
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_FETCH_WORKERS = 4
+
+# One raw bonding curve as fetched (the layout's first 49 bytes; the rest of the account is skipped)
+_RAW_CURVE_DTYPE = np.dtype({
+    "names": ["discriminator", "virtual_token_reserves", "virtual_sol_reserves", "real_token_reserves",
+              "real_sol_reserves", "token_total_supply", "complete"],
+    "formats": ["V8", "<u8", "<u8", "<u8", "<u8", "<u8", "?"],
+    "offsets": [0, 8, 16, 24, 32, 40, 48],
+    "itemsize": BONDING_CURVE_LAYOUT.size,
+})
+
+# Tracked state per curve; `exists` is False until the account is found with the right discriminator
+CURVE_DTYPE = np.dtype([
+    ("virtual_token_reserves", "<u8"),
+    ("virtual_sol_reserves", "<u8"),
+    ("real_token_reserves", "<u8"),
+    ("real_sol_reserves", "<u8"),
+    ("token_total_supply", "<u8"),
+    ("complete", "?"),
+    ("exists", "?"),
+])
+_STATE_FIELDS = [name for name in CURVE_DTYPE.names if name != "exists"]
+
+
+def decode_curves(raw):
+    """
+    Decode many raw bonding curve accounts at once.
+
+    Args:
+        raw (list): Account data per curve (bytes of at least BONDING_CURVE_LAYOUT.size, or None
+            for a missing account)
+
+    Returns:
+        numpy.ndarray: CURVE_DTYPE rows in the same order (all zero with exists=False where the
+            account is missing or is not a bonding curve)
+    """
+    size = BONDING_CURVE_LAYOUT.size
+    empty = bytes(size)
+    buffer = b"".join(
+        bytes(data[:size]) if data is not None and len(data) >= size else empty for data in raw
+    )
+    decoded = np.frombuffer(buffer, dtype=_RAW_CURVE_DTYPE, count=len(raw))
+    rows = np.zeros(len(raw), dtype=CURVE_DTYPE)
+    for name in _STATE_FIELDS:
+        rows[name] = decoded[name]
+    rows["exists"] = decoded["discriminator"] == np.void(BONDING_CURVE_DISCRIMINATOR)
+    rows[~rows["exists"]] = np.zeros(1, dtype=CURVE_DTYPE)
+    return rows
+
+
+def completion(rows, initial_real_token_reserves=DEFAULT_REAL_TOKEN_RESERVES):
+    """
+    Bonding curve progress of decoded rows, from 0 (just launched) to 1 (complete).
+
+    Args:
+        rows (numpy.ndarray): CURVE_DTYPE rows
+        initial_real_token_reserves (int): Real token reserves of a fresh curve
+
+    Returns:
+        numpy.ndarray: Progress per row
+    """
+    sold = 1.0 - rows["real_token_reserves"].astype(np.float64) / initial_real_token_reserves
+    return np.where(rows["complete"], 1.0, np.clip(sold, 0.0, 1.0))
+
+
+class CurveMonitor:
+    """
+    Track the state of many bonding curves and report only the ones that changed.
+
+    Curves are fetched with getMultipleAccounts, 100 per call and a few calls
+    in flight, asking only for the 49 bytes of the curve layout. The replies
+    are decoded in one pass into a NumPy structured array and compared with
+    the previous one, so each poll emits just the changed rows. One process
+    can track thousands of curves at a few RPC calls per poll.
+    """
+    def __init__(self, client, addresses=None, on_change=None, poll_interval=DEFAULT_POLL_INTERVAL,
+                 commitment="confirmed", max_workers=DEFAULT_FETCH_WORKERS):
+        """
+        Initialize the monitor (call start() to poll in the background, or poll() directly).
+
+        Args:
+            client (Client): Synchronous RPC client (or RpcRouter)
+            addresses (list, optional): Bonding curve addresses (Pubkey or str) to track
+            on_change (callable, optional): Called with (addresses, rows) after each poll that
+                changed any curve; rows is a CURVE_DTYPE array aligned with addresses
+            poll_interval (float): Seconds between background polls
+            commitment (str): Commitment the accounts are read at
+            max_workers (int): getMultipleAccounts calls in flight per poll
+        """
+        self.client = client
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.commitment = commitment
+        self.max_workers = max_workers
+        self.addresses = []
+        self.state = np.zeros(0, dtype=CURVE_DTYPE)
+        self.polls = 0
+        self.rpc_calls = 0
+        self.changes = 0
+        self.last_poll_ms = None
+        self.last_error = None
+        self._index = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.add(addresses or [])
+
+    def add(self, addresses):
+        """
+        Start tracking bonding curves (already tracked ones are ignored).
+
+        Args:
+            addresses (list): Bonding curve addresses (Pubkey or str)
+        """
+        with self._lock:
+            new = []
+            for address in addresses:
+                pubkey = address if isinstance(address, Pubkey) else Pubkey.from_string(address)
+                if pubkey not in self._index:
+                    self._index[pubkey] = len(self.addresses) + len(new)
+                    new.append(pubkey)
+            self.addresses.extend(new)
+            self.state = np.concatenate([self.state, np.zeros(len(new), dtype=CURVE_DTYPE)])
+
+    def remove(self, addresses):
+        """Stop tracking bonding curves."""
+        with self._lock:
+            drop = {a if isinstance(a, Pubkey) else Pubkey.from_string(a) for a in addresses}
+            keep = [i for i, address in enumerate(self.addresses) if address not in drop]
+            self.addresses = [self.addresses[i] for i in keep]
+            self.state = self.state[keep]
+            self._index = {address: i for i, address in enumerate(self.addresses)}
+
+    def _fetch_chunk(self, chunk):
+        tracing.count("rpc_calls", method="getMultipleAccounts")
+        response = self.client.get_multiple_accounts(
+            chunk, self.commitment, data_slice=DataSliceOpts(offset=0, length=BONDING_CURVE_LAYOUT.size)
+        )
+        return [account.data if account is not None else None for account in response.value]
+
+    def fetch(self, addresses):
+        """
+        Fetch and decode bonding curves.
+
+        Args:
+            addresses (list): Bonding curve Pubkeys
+
+        Returns:
+            numpy.ndarray: CURVE_DTYPE rows aligned with addresses
+        """
+        chunks = [addresses[i:i + MAX_ACCOUNTS_PER_CALL] for i in range(0, len(addresses), MAX_ACCOUNTS_PER_CALL)]
+        if len(chunks) <= 1:
+            raw = [data for chunk in chunks for data in self._fetch_chunk(chunk)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                raw = [data for result in executor.map(self._fetch_chunk, chunks) for data in result]
+        self.rpc_calls += len(chunks)
+        return decode_curves(raw)
+
+    def poll(self):
+        """
+        Fetch every tracked curve once and update the state.
+
+        Returns:
+            tuple: (changed addresses, CURVE_DTYPE rows of the changed curves)
+        """
+        started = time.perf_counter()
+        with self._lock:
+            addresses = list(self.addresses)
+        with tracing.span("curve_poll", curves=len(addresses)):
+            rows = self.fetch(addresses)
+        with self._lock:
+            # Curves added or removed during the fetch are picked up by the next poll
+            if self.addresses != addresses:
+                return [], np.zeros(0, dtype=CURVE_DTYPE)
+            changed = np.flatnonzero(rows != self.state)
+            self.state = rows
+            self.polls += 1
+            self.changes += len(changed)
+            self.last_poll_ms = round((time.perf_counter() - started) * 1000, 3)
+        tracing.count("curve_changes", len(changed))
+        changed_addresses = [addresses[i] for i in changed]
+        changed_rows = rows[changed]
+        if len(changed) and self.on_change is not None:
+            self.on_change(changed_addresses, changed_rows)
+        return changed_addresses, changed_rows
+
+    def get(self, address):
+        """Return the last known row of one curve (None if it is not tracked)."""
+        pubkey = address if isinstance(address, Pubkey) else Pubkey.from_string(address)
+        with self._lock:
+            index = self._index.get(pubkey)
+            return None if index is None else self.state[index].copy()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start the background polling thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="curve-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background polling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 30)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        """
+        Return monitor statistics.
+
+        Returns:
+            dict: Tracked, existing and complete curves, polls, RPC calls, changed rows,
+                last poll duration and last error
+        """
+        with self._lock:
+            return {
+                "curves": len(self.addresses),
+                "existing": int(self.state["exists"].sum()),
+                "complete": int(self.state["complete"].sum()),
+                "polls": self.polls,
+                "rpc_calls": self.rpc_calls,
+                "changes": self.changes,
+                "last_poll_ms": self.last_poll_ms,
+                "last_error": self.last_error,
+            }
+
+
+def format_change(address, row):
+    """Format one changed curve as a single line."""
+    if not row["exists"]:
+        return f"{address}  not found"
+    sol = row["real_sol_reserves"] / LAMPORTS_PER_SOL
+    tokens = row["real_token_reserves"] / 10 ** TOKEN_DECIMALS
+    status = "complete" if row["complete"] else f"{completion(row[np.newaxis])[0]:.1%}"
+    return f"{address}  {sol:>12.4f} SOL  {tokens:>20,.0f} tokens left  {status}"
+
+
+def load_bonding_curves(path):
+    """
+    Read bonding curve addresses from a batch results file (JSONL) or a plain list (one per line).
+
+    Args:
+        path (str): File path
+
+    Returns:
+        list: Bonding curve address strings
+    """
+    addresses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                if record.get("bonding_curve"):
+                    addresses.append(record["bonding_curve"])
+            else:
+                addresses.append(line)
+    return addresses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch bonding curves and print the ones that change")
+    parser.add_argument("source", nargs="+",
+                        help="Batch results JSONL, a file with one address per line, or addresses")
+    parser.add_argument("--rpc-url", default=os.getenv("RPC_URL"),
+                        help="Solana RPC URL, or a comma-separated list to route over")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--commitment", default="confirmed", choices=COMMITMENT_LEVELS)
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    args = parser.parse_args(argv)
+
+    from solana.rpc.api import Client
+    from constants import MAINNET_RPC_URL
+    from rate_limit import RateLimitedClient, get_limiter
+    from rpc_router import RpcRouter, parse_rpc_urls
+
+    urls = parse_rpc_urls(args.rpc_url or MAINNET_RPC_URL)
+    client = RpcRouter(urls).start() if len(urls) > 1 else RateLimitedClient(Client(urls[0]), get_limiter(urls[0]))
+    addresses = []
+    for source in args.source:
+        addresses += load_bonding_curves(source) if os.path.exists(source) else [source]
+
+    def print_changes(changed, rows):
+        stamp = time.strftime("%H:%M:%S")
+        for address, row in zip(changed, rows):
+            print(f"{stamp}  {format_change(address, row)}")
+
+    monitor = CurveMonitor(client, addresses, on_change=print_changes, poll_interval=args.interval,
+                           commitment=args.commitment)
+    print(f"Watching {len(monitor.addresses)} bonding curves")
+    if args.once:
+        monitor.poll()
+        return 0
+    try:
+        while True:
+            try:
+                monitor.poll()
+            except Exception as e:
+                print(f"Poll failed: {str(e)}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        stats = monitor.stats()
+        print(f"\n{stats['polls']} polls, {stats['rpc_calls']} RPC calls, {stats['changes']} changes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+# Plain values shared by cli.py and the modules they configure. Kept free of
+# third-party imports, so the CLI can build its parser without loading
+# solana, solders, Pillow or requests. The owning modules import them from here.
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+# priority_fees.py: a percentile of recent fees, or always the cap
+FEE_POLICIES = ("p50", "p75", "p90", "cap")
+DEFAULT_FEE_POLICY = "p75"
+# Prices are in micro-lamports per compute unit
+DEFAULT_FEE_CAP = 1_000_000
+
+# confirmations.py
+COMMITMENT_LEVELS = ("processed", "confirmed", "finalized")
+
+# images.py: output format -> MIME type
+TARGET_FORMATS = {
+    "WEBP": "image/webp",
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+}
+DEFAULT_TARGET_FORMAT = "WEBP"
+
+# lookup_table.py
+DEFAULT_TABLE_PATH = ".lookup_table.json"
@@ -0,0 +1,530 @@
+import argparse
+import base64
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from solana.rpc.types import TxOpts
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.system_program import (
+    AdvanceNonceAccountParams,
+    WithdrawNonceAccountParams,
+    advance_nonce_account,
+    create_nonce_account,
+    withdraw_nonce_account,
+)
+from solders.transaction import Transaction
+
+from constants import EVENT_AUTHORITY
+from preflight import validate_launch
+import tracing
+
+# Load environment variables
+load_dotenv()
+
+# version, state, authority, durable nonce, lamports per signature
+NONCE_ACCOUNT_LAYOUT = struct.Struct("<II32s32sQ")
+NONCE_ACCOUNT_SIZE = NONCE_ACCOUNT_LAYOUT.size
+NONCE_STATE_INITIALIZED = 1
+
+DEFAULT_NONCE_PATH = ".nonce_accounts.json"
+DEFAULT_STORE_PATH = "presigned_launches.json"
+
+# Seconds before the fire time at which a job's nonce is checked
+DEFAULT_CHECK_AHEAD = 5.0
+# The last stretch before the fire time is spun rather than slept
+SPIN_WINDOW = 0.002
+
+JOB_PENDING = "pending"
+JOB_SENT = "sent"
+JOB_FAILED = "failed"
+JOB_STALE = "stale"
+
+
+def decode_nonce_account(data):
+    """
+    Decode raw nonce account data.
+
+    Args:
+        data (bytes): Account data
+
+    Returns:
+        dict: authority (Pubkey), nonce (Hash) and lamports_per_signature, or None if
+            the account is not an initialized nonce account
+    """
+    data = bytes(data)
+    if len(data) < NONCE_ACCOUNT_SIZE:
+        return None
+    _, state, authority, nonce, lamports_per_signature = NONCE_ACCOUNT_LAYOUT.unpack_from(data, 0)
+    if state != NONCE_STATE_INITIALIZED:
+        return None
+    return {
+        "authority": Pubkey(authority),
+        "nonce": Hash(nonce),
+        "lamports_per_signature": lamports_per_signature,
+    }
+
+
+def _write_json(path, obj):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class NonceManager:
+    """
+    Create, inspect and close durable nonce accounts owned by the payer.
+
+    Each pre-signed launch consumes the current value of one nonce account,
+    so there should be one account per pending launch. Account addresses are
+    kept in a JSON file; the payer is their nonce authority.
+    """
+    def __init__(self, client, payer, path=DEFAULT_NONCE_PATH):
+        """
+        Initialize the manager.
+
+        Args:
+            client (Client): Synchronous RPC client
+            payer (Keypair): Fee payer and nonce authority
+            path (str): JSON file listing the managed nonce accounts
+        """
+        self.client = client
+        self.payer = payer
+        self.path = path
+        self._lock = threading.Lock()
+        self._accounts = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._accounts = json.load(f)
+
+    def accounts(self):
+        """Return the managed nonce account addresses."""
+        return [Pubkey.from_string(a) for a in self._accounts]
+
+    def _save(self):
+        _write_json(self.path, self._accounts)
+
+    def _send(self, instructions, signers):
+        tracing.count("rpc_calls", method="getLatestBlockhash")
+        blockhash = self.client.get_latest_blockhash().value.blockhash
+        tx = Transaction(signers, Message(instructions, self.payer.pubkey()), blockhash)
+        tracing.count("rpc_calls", method="sendTransaction")
+        signature = self.client.send_raw_transaction(bytes(tx)).value
+        self.client.confirm_transaction(signature, "confirmed")
+        return signature
+
+    def create(self, count=1):
+        """
+        Create and initialize nonce accounts (one transaction each, waited on).
+
+        Args:
+            count (int): Number of accounts to create
+
+        Returns:
+            list: Addresses of the new nonce accounts
+        """
+        lamports = self.client.get_minimum_balance_for_rent_exemption(NONCE_ACCOUNT_SIZE).value
+        created = []
+        for _ in range(count):
+            nonce_keypair = Keypair()
+            instructions = list(create_nonce_account(
+                self.payer.pubkey(), nonce_keypair.pubkey(), self.payer.pubkey(), lamports
+            ))
+            signature = self._send(instructions, [self.payer, nonce_keypair])
+            print(f"Nonce account created: {nonce_keypair.pubkey()} ({signature})")
+            with self._lock:
+                self._accounts.append(str(nonce_keypair.pubkey()))
+                self._save()
+            created.append(nonce_keypair.pubkey())
+        return created
+
+    def get_nonces(self, accounts=None):
+        """
+        Fetch the current nonce of several accounts in one call.
+
+        Args:
+            accounts (list, optional): Nonce account addresses (defaults to all managed ones)
+
+        Returns:
+            dict: Address -> decoded nonce account (None if missing or uninitialized)
+        """
+        accounts = list(accounts) if accounts is not None else self.accounts()
+        if not accounts:
+            return {}
+        tracing.count("rpc_calls", method="getMultipleAccounts")
+        values = self.client.get_multiple_accounts(accounts).value
+        return {
+            account: decode_nonce_account(value.data) if value is not None else None
+            for account, value in zip(accounts, values)
+        }
+
+    def close(self, account):
+        """
+        Withdraw the whole balance of a nonce account back to the payer, closing it.
+
+        Args:
+            account (Pubkey): Nonce account address
+
+        Returns:
+            Signature: Withdrawal transaction signature
+        """
+        tracing.count("rpc_calls", method="getBalance")
+        lamports = self.client.get_balance(account).value
+        instruction = withdraw_nonce_account(WithdrawNonceAccountParams(
+            nonce_pubkey=account, authorized_pubkey=self.payer.pubkey(),
+            to_pubkey=self.payer.pubkey(), lamports=lamports,
+        ))
+        signature = self._send([instruction], [self.payer])
+        with self._lock:
+            if str(account) in self._accounts:
+                self._accounts.remove(str(account))
+                self._save()
+        return signature
+
+
+class PresignedStore:
+    """
+    Pre-signed launch transactions and their schedule, kept in a JSON file.
+
+    Each job holds the serialized signed transaction, the nonce account and
+    nonce value it was signed against, its fire time and its outcome.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): JSON file backing the store
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._jobs = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._jobs = json.load(f)
+
+    def jobs(self):
+        """Return a copy of every job."""
+        with self._lock:
+            return [dict(job) for job in self._jobs]
+
+    def pending(self):
+        """Return pending jobs ordered by fire time."""
+        return sorted((j for j in self.jobs() if j["status"] == JOB_PENDING), key=lambda j: j["fire_at"])
+
+    def busy_nonce_accounts(self):
+        """Return the nonce accounts referenced by pending jobs."""
+        return {job["nonce_account"] for job in self.jobs() if job["status"] == JOB_PENDING}
+
+    def add(self, job):
+        """Add a job and persist the store."""
+        with self._lock:
+            self._jobs.append(job)
+            _write_json(self.path, self._jobs)
+
+    def update(self, job_id, **fields):
+        """Update the fields of a job and persist the store."""
+        with self._lock:
+            for job in self._jobs:
+                if job["id"] == job_id:
+                    job.update(fields)
+            _write_json(self.path, self._jobs)
+
+
+def build_presigned_launch(creator, nonce_account, nonce, name, symbol, uri, dev_buy_amount,
+                           creator_address=None):
+    """
+    Build and sign a launch against a durable nonce instead of a recent blockhash.
+
+    The first instruction advances the nonce, which is what keeps the
+    transaction valid until it is sent. The dev buy is quoted on a fresh
+    curve and the priority fee is priced at signing time.
+
+    Args:
+        creator (PumpTokenCreator): Launcher holding the payer (also the nonce authority)
+        nonce_account (Pubkey): Nonce account to consume
+        nonce (Hash): Current nonce value of that account
+        name (str): Token name
+        symbol (str): Token symbol
+        uri (str): Metadata URI
+        dev_buy_amount (float): Amount of SOL to spend on initial buy
+        creator_address (str or Pubkey, optional): Creator's public key
+
+    Returns:
+        tuple: (serialized signed transaction, mint keypair, dev buy quote)
+
+    Raises:
+        PreflightError: If the signed launch would be rejected on chain
+    """
+    mint_keypair = creator.new_mint_keypair()
+    try:
+        creator.profile_compute_units()
+        global_state = creator.get_global_state()
+        fee_recipient = global_state.fee_recipient if global_state else EVENT_AUTHORITY
+        buy_quote = creator.quote_dev_buy(dev_buy_amount, global_state)
+        instructions, _ = creator.build_instructions(
+            mint_keypair, name, symbol, uri, dev_buy_amount, creator.resolve_creator(creator_address),
+            fee_recipient, buy_quote
+        )
+        advance = advance_nonce_account(AdvanceNonceAccountParams(
+            nonce_pubkey=nonce_account, authorized_pubkey=creator.public_key
+        ))
+        tx = creator.build_transaction(
+            [advance] + creator.add_compute_budget(instructions, fee_recipient), mint_keypair, nonce
+        )
+        # The scheduler sends without the node's preflight, so check the launch offline now
+        validate_launch(tx, creator.public_key, fee_recipient,
+                        [creator.lookup_table] if creator.lookup_table is not None else [])
+    except BaseException:
+        creator.release_mint_keypair(mint_keypair, False)
+        raise
+    return bytes(tx), mint_keypair, buy_quote
+
+
+def presign_launch(creator, nonce_manager, store, fire_at, name, symbol, uri, dev_buy_amount,
+                   creator_address=None):
+    """
+    Pre-sign a launch on a free nonce account and schedule it in the store.
+
+    Args:
+        creator (PumpTokenCreator): Launcher holding the payer
+        nonce_manager (NonceManager): Source of nonce accounts
+        store (PresignedStore): Store the job is added to
+        fire_at (float): Unix time at which the launch is sent
+        name (str): Token name
+        symbol (str): Token symbol
+        uri (str): Metadata URI
+        dev_buy_amount (float): Amount of SOL to spend on initial buy
+        creator_address (str or Pubkey, optional): Creator's public key
+
+    Returns:
+        dict: The stored job
+    """
+    busy = store.busy_nonce_accounts()
+    free = [a for a in nonce_manager.accounts() if str(a) not in busy]
+    nonces = nonce_manager.get_nonces(free)
+    account = next((a for a in free if nonces.get(a) is not None), None)
+    if account is None:
+        raise ValueError("No free initialized nonce account; create more with 'create-accounts'")
+    nonce = nonces[account]["nonce"]
+    tx_bytes, mint_keypair, buy_quote = build_presigned_launch(
+        creator, account, nonce, name, symbol, uri, dev_buy_amount, creator_address
+    )
+    job = {
+        "id": str(mint_keypair.pubkey()),
+        "name": name,
+        "symbol": symbol,
+        "mint": str(mint_keypair.pubkey()),
+        "dev_buy_amount": dev_buy_amount,
+        "dev_buy_tokens": buy_quote.tokens_out,
+        "nonce_account": str(account),
+        "nonce": str(nonce),
+        "fire_at": fire_at,
+        "tx": base64.b64encode(tx_bytes).decode("ascii"),
+        "status": JOB_PENDING,
+        "signature": None,
+        "error": None,
+    }
+    try:
+        store.add(job)
+    except BaseException:
+        creator.release_mint_keypair(mint_keypair, False)
+        raise
+    # The stored transaction now owns the mint key
+    creator.release_mint_keypair(mint_keypair, True)
+    return job
+
+
+def sleep_until(target):
+    """Sleep until a Unix time, spinning through the last couple of milliseconds."""
+    while True:
+        remaining = target - time.time()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_WINDOW:
+            time.sleep(remaining - SPIN_WINDOW)
+
+
+class LaunchScheduler:
+    """
+    Fire pre-signed launches at their scheduled time.
+
+    Everything that can be done ahead happens before the fire time: nonces
+    are checked `check_ahead` seconds early (jobs whose nonce has moved are
+    marked stale) and transactions are decoded once. At the fire time the
+    only work left is sending the raw bytes, without preflight. Jobs due at
+    the same moment are sent in parallel.
+    """
+    def __init__(self, client, store, nonce_manager=None, check_ahead=DEFAULT_CHECK_AHEAD, max_workers=8):
+        """
+        Initialize the scheduler.
+
+        Args:
+            client (Client): Synchronous RPC client (or RpcRouter)
+            store (PresignedStore): Jobs to fire
+            nonce_manager (NonceManager, optional): Used to check nonces before firing
+            check_ahead (float): Seconds before the fire time at which nonces are checked
+            max_workers (int): Maximum jobs sent in parallel
+        """
+        self.client = client
+        self.store = store
+        self.nonce_manager = nonce_manager
+        self.check_ahead = check_ahead
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._stop = threading.Event()
+
+    def _check_nonces(self, jobs):
+        if self.nonce_manager is None:
+            return jobs
+        nonces = self.nonce_manager.get_nonces([Pubkey.from_string(j["nonce_account"]) for j in jobs])
+        ready = []
+        for job in jobs:
+            current = nonces.get(Pubkey.from_string(job["nonce_account"]))
+            if current is None or str(current["nonce"]) != job["nonce"]:
+                self.store.update(job["id"], status=JOB_STALE, error="Nonce has moved since signing")
+                print(f"[{job['symbol']}] skipped: nonce has moved since signing")
+            else:
+                ready.append(job)
+        return ready
+
+    def _send(self, job, raw, fire_at):
+        try:
+            tracing.count("rpc_calls", method="sendTransaction")
+            result = self.client.send_raw_transaction(raw, opts=TxOpts(skip_preflight=True))
+            sent_at = time.time()
+            self.store.update(job["id"], status=JOB_SENT, signature=str(result.value), sent_at=sent_at,
+                              fire_delay_ms=round((sent_at - fire_at) * 1000, 3))
+            print(f"[{job['symbol']}] sent {result.value} ({(sent_at - fire_at) * 1000:.1f} ms after target)")
+        except Exception as e:
+            self.store.update(job["id"], status=JOB_FAILED, error=str(e))
+            print(f"[{job['symbol']}] failed: {str(e)}")
+
+    def fire_due(self, jobs):
+        """
+        Check, wait for and send a group of jobs sharing a fire time.
+
+        Args:
+            jobs (list): Pending jobs with the same fire_at
+        """
+        fire_at = jobs[0]["fire_at"]
+        sleep_until(fire_at - self.check_ahead)
+        jobs = self._check_nonces(jobs)
+        payloads = [(job, base64.b64decode(job["tx"])) for job in jobs]
+        sleep_until(fire_at)
+        futures = [self._executor.submit(self._send, job, raw, fire_at) for job, raw in payloads]
+        for future in futures:
+            future.result()
+
+    def run(self):
+        """
+        Fire every pending job in fire-time order, returning when none is left.
+
+        Returns:
+            list: All jobs with their final status
+        """
+        while not self._stop.is_set():
+            pending = self.store.pending()
+            if not pending:
+                break
+            fire_at = pending[0]["fire_at"]
+            self.fire_due([job for job in pending if job["fire_at"] == fire_at])
+        return self.store.jobs()
+
+    def stop(self):
+        """Stop after the group currently being fired."""
+        self._stop.set()
+
+    def close(self):
+        """Release the send pool."""
+        self._executor.shutdown(wait=True)
+
+
+def parse_fire_time(value):
+    """Parse a fire time: "+SECONDS" from now, a Unix timestamp, or an ISO 8601 date."""
+    if value.startswith("+"):
+        return time.time() + float(value[1:])
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-sign launches on durable nonces and fire them on schedule")
+    parser.add_argument("--rpc-url", default=os.getenv("RPC_URL"), help="Solana RPC URL")
+    parser.add_argument("--nonces", default=DEFAULT_NONCE_PATH, help="Nonce account list")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Pre-signed launch store")
+    subparsers = parser.add_subparsers(dest="action", metavar="action")
+    subparsers.required = True
+
+    create = subparsers.add_parser("create-accounts", help="Create nonce accounts")
+    create.add_argument("-n", "--count", type=int, default=1, help="Accounts to create")
+    subparsers.add_parser("accounts", help="List nonce accounts and their nonces")
+    close = subparsers.add_parser("close-accounts", help="Close unused nonce accounts and reclaim their rent")
+    close.add_argument("--all", action="store_true", help="Also close accounts of pending jobs")
+
+    presign = subparsers.add_parser("presign", help="Pre-sign a launch and schedule it")
+    presign.add_argument("--name", required=True, help="Token name")
+    presign.add_argument("--symbol", required=True, help="Token symbol")
+    presign.add_argument("--uri", required=True, help="Metadata URI (already uploaded)")
+    presign.add_argument("--dev-buy", type=float, default=0.0, help="Initial dev buy in SOL")
+    presign.add_argument("--creator", default=None, help="Creator address (defaults to the wallet)")
+    presign.add_argument("--at", required=True, help='Fire time: "+SECONDS", Unix time or ISO 8601')
+
+    subparsers.add_parser("run", help="Fire pending launches at their scheduled time")
+    subparsers.add_parser("list", help="List scheduled launches")
+    args = parser.parse_args(argv)
+
+    from create import PumpTokenCreator
+
+    store = PresignedStore(args.store)
+    if args.action == "list":
+        for job in store.jobs():
+            fire_at = datetime.fromtimestamp(job["fire_at"]).isoformat(timespec="milliseconds")
+            print(f"{job['symbol']:<10} {job['status']:<8} {fire_at}  {job['mint']}  {job.get('signature') or ''}")
+        return 0
+
+    creator = PumpTokenCreator(private_key=os.getenv("PRIVATE_KEY"), rpc_url=args.rpc_url)
+    nonce_manager = NonceManager(creator.client, creator.keypair, args.nonces)
+
+    if args.action == "create-accounts":
+        nonce_manager.create(args.count)
+    elif args.action == "accounts":
+        busy = store.busy_nonce_accounts()
+        for account, state in nonce_manager.get_nonces().items():
+            status = "in use" if str(account) in busy else "free"
+            print(f"{account}  {state['nonce'] if state else 'uninitialized'}  {status}")
+    elif args.action == "close-accounts":
+        busy = set() if args.all else store.busy_nonce_accounts()
+        for account in nonce_manager.accounts():
+            if str(account) not in busy:
+                print(f"Closed {account}: {nonce_manager.close(account)}")
+    elif args.action == "presign":
+        job = presign_launch(
+            creator, nonce_manager, store, parse_fire_time(args.at), args.name, args.symbol,
+            args.uri, args.dev_buy, args.creator,
+        )
+        print(f"Pre-signed {job['symbol']} ({job['mint']}) on nonce account {job['nonce_account']}, "
+              f"fires at {datetime.fromtimestamp(job['fire_at']).isoformat(timespec='milliseconds')}")
+    elif args.action == "run":
+        scheduler = LaunchScheduler(creator.client, store, nonce_manager)
+        try:
+            jobs = scheduler.run()
+        finally:
+            scheduler.close()
+        sent = sum(1 for job in jobs if job["status"] == JOB_SENT)
+        print(f"{sent}/{len(jobs)} launches sent")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from solders.pubkey import Pubkey
+
+import tracing
+from constants import PUMP_PROGRAM_ID
+
+# Anchor account discriminator: first 8 bytes of sha256("account:Global")
+GLOBAL_DISCRIMINATOR = hashlib.sha256(b"account:Global").digest()[:8]
+
+# discriminator, initialized, authority, fee_recipient, initial_virtual_token_reserves,
+# initial_virtual_sol_reserves, initial_real_token_reserves, token_total_supply, fee_basis_points
+_GLOBAL_LAYOUT = struct.Struct("<8s?32s32sQQQQQ")
+# Fields appended by later program upgrades:
+# withdraw_authority, enable_migrate, pool_migration_fee, creator_fee_basis_points
+_GLOBAL_EXTENSION_LAYOUT = struct.Struct("<32s?QQ")
+
+DEFAULT_TTL = 60.0
+
+
+def derive_global_address(program_id=PUMP_PROGRAM_ID):
+    """Derive the Pump `global` PDA."""
+    return Pubkey.find_program_address([b"global"], program_id)[0]
+
+
+def to_ws_url(rpc_url):
+    """Turn an HTTP(S) RPC URL into the matching websocket URL."""
+    if rpc_url.startswith("https://"):
+        return "wss://" + rpc_url[len("https://"):]
+    if rpc_url.startswith("http://"):
+        return "ws://" + rpc_url[len("http://"):]
+    return rpc_url
+
+
+@dataclass(frozen=True)
+class GlobalState:
+    """Decoded Pump `Global` account."""
+    initialized: bool
+    authority: Pubkey
+    fee_recipient: Pubkey
+    initial_virtual_token_reserves: int
+    initial_virtual_sol_reserves: int
+    initial_real_token_reserves: int
+    token_total_supply: int
+    fee_basis_points: int
+    withdraw_authority: Optional[Pubkey] = None
+    enable_migrate: Optional[bool] = None
+    pool_migration_fee: Optional[int] = None
+    creator_fee_basis_points: Optional[int] = None
+
+    @classmethod
+    def from_account_data(cls, data):
+        """
+        Decode raw `Global` account data.
+
+        Args:
+            data (bytes): Account data including the 8-byte discriminator
+
+        Returns:
+            GlobalState: Decoded state
+
+        Raises:
+            ValueError: If the data is too short or has the wrong discriminator
+        """
+        data = bytes(data)
+        if len(data) < _GLOBAL_LAYOUT.size:
+            raise ValueError(f"Global account data too short: {len(data)} bytes")
+        (discriminator, initialized, authority, fee_recipient, virtual_token, virtual_sol,
+         real_token, total_supply, fee_bps) = _GLOBAL_LAYOUT.unpack_from(data, 0)
+        if discriminator != GLOBAL_DISCRIMINATOR:
+            raise ValueError("Account is not a Pump Global account")
+
+        extension = {}
+        if len(data) >= _GLOBAL_LAYOUT.size + _GLOBAL_EXTENSION_LAYOUT.size:
+            withdraw_authority, enable_migrate, migration_fee, creator_fee_bps = \
+                _GLOBAL_EXTENSION_LAYOUT.unpack_from(data, _GLOBAL_LAYOUT.size)
+            extension = {
+                "withdraw_authority": Pubkey(withdraw_authority),
+                "enable_migrate": enable_migrate,
+                "pool_migration_fee": migration_fee,
+                "creator_fee_basis_points": creator_fee_bps,
+            }
+
+        return cls(
+            initialized=initialized,
+            authority=Pubkey(authority),
+            fee_recipient=Pubkey(fee_recipient),
+            initial_virtual_token_reserves=virtual_token,
+            initial_virtual_sol_reserves=virtual_sol,
+            initial_real_token_reserves=real_token,
+            token_total_supply=total_supply,
+            fee_basis_points=fee_bps,
+            **extension,
+        )
+
+
+class GlobalStateCache:
+    """
+    Cache the decoded Pump `Global` account.
+
+    The state is fetched once and served from memory until it is older than
+    `ttl`. Optionally, an account subscription keeps it up to date by push so
+    the hot path never needs an RPC call.
+    """
+    def __init__(self, client, ttl=DEFAULT_TTL, program_id=PUMP_PROGRAM_ID):
+        """
+        Initialize the cache.
+
+        Args:
+            client (Client): Synchronous RPC client used for fetches
+            ttl (float): Seconds a fetched state is served before refetching
+            program_id (Pubkey): Pump program ID
+        """
+        self.client = client
+        self.ttl = ttl
+        self.global_address = derive_global_address(program_id)
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.push_updates = 0
+        self.last_error = None
+        self._state = None
+        self._updated_at = None
+        self._lock = threading.Lock()
+        self._subscription_thread = None
+        self._subscription_stop = threading.Event()
+
+    def _store(self, state):
+        with self._lock:
+            self._state = state
+            self._updated_at = time.monotonic()
+
+    def age(self):
+        """Seconds since the cached state was last updated (None if empty)."""
+        updated_at = self._updated_at
+        return None if updated_at is None else time.monotonic() - updated_at
+
+    def _is_fresh(self):
+        if self._state is None:
+            return False
+        # A live subscription keeps the state current; TTL only guards against a dead socket
+        age = self.age()
+        return age is not None and age <= self.ttl
+
+    def refresh(self):
+        """
+        Fetch and decode the Global account from the RPC.
+
+        Returns:
+            GlobalState: Freshly decoded state
+        """
+        tracing.count("rpc_calls", method="getAccountInfo")
+        response = self.client.get_account_info(self.global_address)
+        with self._lock:
+            self.fetches += 1
+        if response.value is None:
+            raise ValueError("Unable to retrieve global state.")
+        state = GlobalState.from_account_data(response.value.data)
+        self._store(state)
+        self.last_error = None
+        return state
+
+    def get(self):
+        """
+        Return the cached Global state, refetching it if missing or stale.
+
+        Returns:
+            GlobalState: Decoded state
+        """
+        if self._is_fresh():
+            with self._lock:
+                self.hits += 1
+            return self._state
+        with self._lock:
+            self.misses += 1
+        try:
+            return self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            # Serve a stale state rather than failing the launch
+            if self._state is not None:
+                return self._state
+            raise
+
+    async def get_async(self):
+        """Async variant of get() that only leaves the event loop on a miss."""
+        if self._is_fresh():
+            with self._lock:
+                self.hits += 1
+            return self._state
+        return await asyncio.to_thread(self.get)
+
+    def invalidate(self):
+        """Drop the cached state so the next get() refetches it."""
+        with self._lock:
+            self._state = None
+            self._updated_at = None
+
+    def subscribe(self, ws_url):
+        """
+        Keep the cache up to date through an `accountSubscribe` websocket.
+
+        Runs in a daemon thread and reconnects on errors until unsubscribe().
+
+        Args:
+            ws_url (str): Websocket RPC URL (see to_ws_url())
+        """
+        if self._subscription_thread and self._subscription_thread.is_alive():
+            return
+        self._subscription_stop.clear()
+        self._subscription_thread = threading.Thread(
+            target=lambda: asyncio.run(self._subscription_loop(ws_url)),
+            name="global-state-subscription",
+            daemon=True,
+        )
+        self._subscription_thread.start()
+
+    def unsubscribe(self):
+        """Stop the account subscription thread."""
+        self._subscription_stop.set()
+        if self._subscription_thread:
+            self._subscription_thread.join(timeout=5)
+            self._subscription_thread = None
+
+    async def _subscription_loop(self, ws_url):
+        from solana.rpc.websocket_api import connect
+
+        while not self._subscription_stop.is_set():
+            try:
+                async with connect(ws_url) as websocket:
+                    await websocket.account_subscribe(self.global_address, encoding="base64")
+                    await websocket.recv()  # subscription confirmation
+                    while not self._subscription_stop.is_set():
+                        try:
+                            messages = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            continue
+                        for message in messages:
+                            self._store(GlobalState.from_account_data(message.result.value.data))
+                            with self._lock:
+                                self.push_updates += 1
+            except Exception as e:
+                self.last_error = str(e)
+                await asyncio.sleep(1)
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Hits, misses, RPC fetches, push updates, age of the cached state and last error
+        """
+        age = self.age()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "push_updates": self.push_updates,
+            "age_s": None if age is None else round(age, 3),
+            "subscribed": bool(self._subscription_thread and self._subscription_thread.is_alive()),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,147 @@
+import io
+import mimetypes
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+from defaults import DEFAULT_TARGET_FORMAT, TARGET_FORMATS
+
+EXTENSIONS = {"WEBP": ".webp", "PNG": ".png", "JPEG": ".jpg"}
+
+DEFAULT_MAX_DIMENSION = 1000
+DEFAULT_QUALITY = 85
+# Reject inputs larger than this before decoding anything
+MAX_INPUT_BYTES = 50 * 1024 * 1024
+MAX_PIXELS = 40_000_000
+
+ProcessedImage = namedtuple("ProcessedImage", [
+    "data", "mime_type", "filename", "width", "height", "original_bytes",
+])
+
+
+class ImageError(ValueError):
+    """Raised for images that cannot be used as token images."""
+
+
+def guess_mime_type(uri, default="image/png"):
+    """Guess the MIME type of an image URL or path from its extension."""
+    mime_type, _ = mimetypes.guess_type(uri.split("?", 1)[0])
+    return mime_type if mime_type and mime_type.startswith("image/") else default
+
+
+def preprocess_image(data, filename="image", target_format=DEFAULT_TARGET_FORMAT,
+                     max_dimension=DEFAULT_MAX_DIMENSION, quality=DEFAULT_QUALITY):
+    """
+    Validate, downsize, strip metadata from and recompress an image.
+
+    Args:
+        data (bytes): Encoded source image
+        filename (str): Source file name (used to name the output)
+        target_format (str): "WEBP", "PNG" or "JPEG"
+        max_dimension (int): Longest side of the output in pixels
+        quality (int): Encoder quality for lossy formats
+
+    Returns:
+        ProcessedImage: Encoded output and its real MIME type
+
+    Raises:
+        ImageError: If the input is not a valid image or too large
+    """
+    target_format = target_format.upper()
+    if target_format not in TARGET_FORMATS:
+        raise ImageError(f"Unsupported target format: {target_format}")
+    if len(data) > MAX_INPUT_BYTES:
+        raise ImageError(f"Image is larger than {MAX_INPUT_BYTES // (1024 * 1024)} MB")
+
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            probe.verify()
+        img = Image.open(io.BytesIO(data))
+        if img.width * img.height > MAX_PIXELS:
+            raise ImageError(f"Image has too many pixels ({img.width}x{img.height})")
+        img.seek(0)  # first frame of animated images
+        img.load()
+    except ImageError:
+        raise
+    except Exception as e:
+        raise ImageError(f"Invalid image: {e}")
+
+    # Palette images only have alpha with a transparency entry
+    has_alpha = "transparency" in img.info or img.mode in ("PA", "RGBa")
+    # Drop EXIF, ICC profiles, text chunks and anything else carried in info
+    img.info = {}
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA" if has_alpha else "RGB")
+    if target_format == "JPEG" and img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    out = io.BytesIO()
+    if target_format == "PNG":
+        img.save(out, "PNG", optimize=True)
+    elif target_format == "JPEG":
+        img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(out, "WEBP", quality=quality, method=4)
+
+    stem = os.path.splitext(os.path.basename(filename))[0] or "image"
+    return ProcessedImage(
+        out.getvalue(),
+        TARGET_FORMATS[target_format],
+        stem + EXTENSIONS[target_format],
+        img.width,
+        img.height,
+        len(data),
+    )
+
+
+def preprocess_image_file(path, **options):
+    """Read and preprocess an image file. See preprocess_image()."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return preprocess_image(data, os.path.basename(path), **options)
+
+
+class ImagePreprocessor:
+    """
+    Run image preprocessing in a process pool.
+
+    Decoding and re-encoding are CPU-bound, so batches of images are spread
+    over worker processes; the processed bytes are returned in memory and can
+    be handed straight to a StorageClient.
+    """
+    def __init__(self, workers=None, target_format=DEFAULT_TARGET_FORMAT,
+                 max_dimension=DEFAULT_MAX_DIMENSION, quality=DEFAULT_QUALITY):
+        """
+        Initialize the preprocessor.
+
+        Args:
+            workers (int, optional): Worker processes (defaults to all cores)
+            target_format (str): "WEBP", "PNG" or "JPEG"
+            max_dimension (int): Longest side of the output in pixels
+            quality (int): Encoder quality for lossy formats
+        """
+        if target_format.upper() not in TARGET_FORMATS:
+            raise ImageError(f"Unsupported target format: {target_format}")
+        self.options = {
+            "target_format": target_format.upper(),
+            "max_dimension": max_dimension,
+            "quality": quality,
+        }
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, path):
+        """Preprocess an image file in the pool. Returns a Future of ProcessedImage."""
+        return self._executor.submit(preprocess_image_file, path, **self.options)
+
+    def close(self):
+        """Shut the worker pool down."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from solders.keypair import Keypair
+
+from create import CONFIRMATION_TIMEOUT, PumpTokenCreator
+from mock_server import add_fault_arguments, servers_from_args
+from pipeline import launch_token
+from priority_fees import ComputeProfile
+from rate_limit import limiter_stats
+from storage import PinataStorage
+
+DEFAULT_LAUNCHES = 100
+DEFAULT_RATE = 5.0
+DEFAULT_CONCURRENCY = 16
+DEFAULT_DEV_BUY = 0.1
+# Errors listed in the report, most frequent first
+MAX_REPORTED_ERRORS = 5
+
+
+def latency_summary(samples_ms):
+    """
+    Summarize latencies.
+
+    Args:
+        samples_ms (list): Latencies in milliseconds
+
+    Returns:
+        dict: count, mean, p50, p90, p99 and max in milliseconds (None values if empty)
+    """
+    samples = sorted(samples_ms)
+    if not samples:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+
+    def at(q):
+        return round(samples[min(len(samples) - 1, int(len(samples) * q))], 1)
+
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 1),
+        "p50_ms": at(0.50),
+        "p90_ms": at(0.90),
+        "p99_ms": at(0.99),
+        "max_ms": round(samples[-1], 1),
+    }
+
+
+def sample_image(directory):
+    """Write a small PNG to upload with every launch and return its path."""
+    from PIL import Image
+
+    path = os.path.join(directory, "load_test.png")
+    image = Image.new("RGB", (256, 256))
+    image.putdata([(x, y, (x + y) % 256) for y in range(256) for x in range(256)])
+    image.save(path)
+    return path
+
+
+def run_load(creator, launches=DEFAULT_LAUNCHES, rate=DEFAULT_RATE, concurrency=DEFAULT_CONCURRENCY,
+             image=None, dev_buy_amount=DEFAULT_DEV_BUY, storage=None, confirm_timeout=None):
+    """
+    Replay launches at a fixed arrival rate and measure the whole pipeline.
+
+    Launch i is due at i / rate seconds. Latency is counted from that due
+    time, so launches queued behind busy workers count as slow instead of
+    quietly lowering the offered rate.
+
+    Args:
+        creator (PumpTokenCreator): Launcher pointed at the endpoints under test
+        launches (int): Number of launches
+        rate (float): Launches started per second
+        concurrency (int): Launches in flight at most
+        image (str, optional): Image uploaded with every launch (an image URL skips the upload)
+        dev_buy_amount (float): Dev buy of every launch in SOL
+        storage (StorageClient, optional): Upload backend
+        confirm_timeout (float, optional): Also wait for each launch to be confirmed (needs a
+            confirmation tracker on the creator)
+
+    Returns:
+        dict: Counts, wall time, throughput, latency summaries (end to end, service,
+            confirmation and per stage) and the most frequent errors
+    """
+    results = [None] * launches
+    started = time.perf_counter()
+    lock = threading.Lock()
+
+    def launch(i, due):
+        began = time.perf_counter()
+        result = launch_token(creator, f"Load Test {i}", f"LT{i % 10000}", image, dev_buy_amount,
+                              storage=storage, description="Load test launch")
+        finished = time.perf_counter()
+        confirmation = result.pop("confirmation", None)
+        confirmed = None
+        if confirmation is not None and result["success"]:
+            try:
+                confirmation.result(timeout=confirm_timeout or CONFIRMATION_TIMEOUT)
+                confirmed = time.perf_counter()
+            except Exception as e:
+                result.update({"success": False, "error": f"Not confirmed: {str(e) or 'timed out'}"})
+        with lock:
+            results[i] = (due, began, finished, confirmed, result)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="launch") as executor:
+        for i in range(launches):
+            due = started + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(launch, i, due)
+    wall = time.perf_counter() - started
+
+    latencies, service, confirmations = [], [], []
+    stages = defaultdict(list)
+    errors = Counter()
+    for due, began, finished, confirmed, result in results:
+        for stage in result["pipeline"]["stages"]:
+            stages[stage["name"]].append(stage["duration_ms"])
+        if not result["success"]:
+            errors[result["error"]] += 1
+            continue
+        latencies.append((finished - due) * 1000)
+        service.append((finished - began) * 1000)
+        if confirmed is not None:
+            confirmations.append((confirmed - due) * 1000)
+    succeeded = launches - sum(errors.values())
+    return {
+        "launches": launches,
+        "succeeded": succeeded,
+        "failed": launches - succeeded,
+        "offered_rate": rate,
+        "wall_s": round(wall, 3),
+        "throughput": round(succeeded / wall, 2) if wall else None,
+        "latency": latency_summary(latencies),
+        "service": latency_summary(service),
+        "confirmation": latency_summary(confirmations),
+        "stages": {name: latency_summary(samples) for name, samples in stages.items()},
+        "errors": errors.most_common(MAX_REPORTED_ERRORS),
+    }
+
+
+def format_load_report(report):
+    """
+    Render a load test report as text.
+
+    Args:
+        report (dict): Result of run_load()
+
+    Returns:
+        str: Summary, latency table and errors
+    """
+    lines = [
+        f"{report['launches']} launches offered at {report['offered_rate']}/s: {report['succeeded']} succeeded, "
+        f"{report['failed']} failed in {report['wall_s']:.1f} s ({report['throughput']} launches/s)",
+        "",
+        f"{'':<26}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    rows = [("launch (from due time)", report["latency"]), ("launch (from start)", report["service"])]
+    if report["confirmation"]["count"]:
+        rows.append(("confirmed (from due time)", report["confirmation"]))
+    rows += [(f"  {name}", summary) for name, summary in report["stages"].items()]
+    for name, summary in rows:
+        if not summary["count"]:
+            continue
+        lines.append(f"{name:<26}{summary['count']:>7}{summary['mean_ms']:>10.1f}{summary['p50_ms']:>10.1f}"
+                     f"{summary['p90_ms']:>10.1f}{summary['p99_ms']:>10.1f}{summary['max_ms']:>10.1f}")
+    if report["errors"]:
+        lines.append("")
+        lines.append("Errors:")
+        lines += [f"{count:>7}  {error}" for error, count in report["errors"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay launches against a local mock RPC node and Pinata API and report throughput"
+    )
+    parser.add_argument("-n", "--launches", type=int, default=DEFAULT_LAUNCHES, help="Number of launches")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Launches started per second")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Launches in flight at most")
+    parser.add_argument("--dev-buy", type=float, default=DEFAULT_DEV_BUY, help="Dev buy per launch in SOL")
+    parser.add_argument("--image", default=None, help="Image for every launch (a generated PNG by default)")
+    parser.add_argument("--rpc-url", default=None, help="Use this RPC endpoint instead of starting the mock")
+    parser.add_argument("--pinata-url", default=None, help="Use this Pinata API instead of starting the mock")
+    parser.add_argument("--shared-blockhash", action="store_true",
+                        help="Serve blockhashes from one background BlockhashProvider")
+    parser.add_argument("--confirm", action="store_true", help="Also wait for every launch to be confirmed")
+    parser.add_argument("--json", default=None, help="Write the report to this JSON file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the output of each launch")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    rpc, pinata = servers_from_args(args)
+    if args.rpc_url is None:
+        rpc.start()
+    if args.pinata_url is None:
+        pinata.start()
+    rpc_url = args.rpc_url or rpc.url
+    pinata_url = args.pinata_url or pinata.url
+    print(f"RPC {rpc_url}, Pinata {pinata_url}")
+    print(f"Replaying {args.launches} launches at {args.rate}/s, up to {args.concurrency} at a time")
+
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        if not args.verbose:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        creator = PumpTokenCreator(private_key=str(Keypair()), rpc_url=rpc_url,
+                                   compute_profile=ComputeProfile(path=None))
+        if args.shared_blockhash:
+            from blockhash_provider import BlockhashProvider
+            creator.blockhash_provider = BlockhashProvider(client=creator.client).start()
+        if args.confirm:
+            from confirmations import ConfirmationTracker
+            creator.confirmation_tracker = ConfirmationTracker(creator.client).start()
+        storage = PinataStorage("mock", "mock", api_url=pinata_url, max_workers=args.concurrency)
+        try:
+            report = run_load(
+                creator, args.launches, args.rate, args.concurrency,
+                image=args.image or sample_image(directory), dev_buy_amount=args.dev_buy, storage=storage,
+                confirm_timeout=CONFIRMATION_TIMEOUT if args.confirm else None,
+            )
+        finally:
+            storage.close()
+            if creator.blockhash_provider is not None:
+                creator.blockhash_provider.stop()
+            if creator.confirmation_tracker is not None:
+                creator.confirmation_tracker.stop()
+            rpc.stop()
+            pinata.stop()
+
+    report["limiters"] = limiter_stats()
+    if args.rpc_url is None:
+        report["rpc_server"] = rpc.stats()
+    if args.pinata_url is None:
+        report["pinata_server"] = pinata.stats()
+    print()
+    print(format_load_report(report))
+    for name in ("rpc_server", "pinata_server"):
+        if name in report:
+            print(f"{name}: {json.dumps(report[name])}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Report written to {args.json}")
+    return 0 if report["succeeded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
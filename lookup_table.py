@@ -0,0 +1,409 @@
+import argparse
+import json
+import os
+import struct
+import sys
+from dotenv import load_dotenv
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction, VersionedTransaction
+
+from constants import (
+    TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM,
+    SYSTEM_PROGRAM,
+    MPL_TOKEN_METADATA,
+    RENT_SYSVAR,
+    EVENT_AUTHORITY,
+    PUMP_PROGRAM_ID,
+)
+from defaults import DEFAULT_TABLE_PATH
+from templates import GLOBAL, MINT_AUTHORITY, LaunchTemplates
+import tracing
+
+# Load environment variables
+load_dotenv()
+
+ADDRESS_LOOKUP_TABLE_PROGRAM = Pubkey.from_string("AddressLookupTab1e1111111111111111111111111")
+
+# Maximum size of a serialized transaction (IPv6 MTU minus headers)
+PACKET_DATA_SIZE = 1232
+
+# Lookup table account header; addresses follow it
+LOOKUP_TABLE_META_SIZE = 56
+# type, deactivation slot, last extended slot, last extended start index, has authority, authority
+_LOOKUP_TABLE_META_LAYOUT = struct.Struct("<IQQB?32s")
+
+# ProgramInstruction enum tags of the address lookup table program
+_CREATE_LOOKUP_TABLE = 0
+_EXTEND_LOOKUP_TABLE = 2
+_DEACTIVATE_LOOKUP_TABLE = 3
+_CLOSE_LOOKUP_TABLE = 4
+
+# Addresses per extend instruction that keep the transaction under the packet size
+MAX_ADDRESSES_PER_EXTEND = 20
+
+# Accounts every launch references that do not depend on the mint
+STATIC_LAUNCH_ACCOUNTS = [
+    GLOBAL,
+    MINT_AUTHORITY,
+    EVENT_AUTHORITY,
+    MPL_TOKEN_METADATA,
+    SYSTEM_PROGRAM,
+    TOKEN_PROGRAM,
+    RENT_SYSVAR,
+    PUMP_PROGRAM_ID,
+    ASSOCIATED_TOKEN_PROGRAM,
+    COMPUTE_BUDGET_PROGRAM,
+]
+
+
+def launch_table_addresses(fee_recipient=None):
+    """
+    Addresses a launch lookup table should hold.
+
+    Args:
+        fee_recipient (Pubkey, optional): Fee recipient from the global state
+
+    Returns:
+        list: Static launch accounts (plus the fee recipient if given)
+    """
+    addresses = list(STATIC_LAUNCH_ACCOUNTS)
+    if fee_recipient is not None and fee_recipient not in addresses:
+        addresses.append(fee_recipient)
+    return addresses
+
+
+def derive_lookup_table_address(authority, recent_slot):
+    """Derive the address of the lookup table created by `authority` at `recent_slot`."""
+    return Pubkey.find_program_address(
+        [bytes(authority), recent_slot.to_bytes(8, "little")], ADDRESS_LOOKUP_TABLE_PROGRAM
+    )
+
+
+def create_lookup_table_instruction(authority, payer, recent_slot):
+    """
+    Build a CreateLookupTable instruction.
+
+    Args:
+        authority (Pubkey): Table authority
+        payer (Pubkey): Account paying the rent
+        recent_slot (int): Recent slot the table address is derived from
+
+    Returns:
+        tuple: (Instruction, table address)
+    """
+    table, bump = derive_lookup_table_address(authority, recent_slot)
+    data = struct.pack("<IQB", _CREATE_LOOKUP_TABLE, recent_slot, bump)
+    accounts = [
+        AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+        AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+    ]
+    return Instruction(ADDRESS_LOOKUP_TABLE_PROGRAM, data, accounts), table
+
+
+def extend_lookup_table_instruction(table, authority, payer, addresses):
+    """
+    Build an ExtendLookupTable instruction.
+
+    Args:
+        table (Pubkey): Lookup table address
+        authority (Pubkey): Table authority
+        payer (Pubkey): Account paying for the extra space
+        addresses (list): Addresses to append
+
+    Returns:
+        Instruction: The extend instruction
+    """
+    data = struct.pack("<IQ", _EXTEND_LOOKUP_TABLE, len(addresses)) + b"".join(bytes(a) for a in addresses)
+    accounts = [
+        AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+        AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+    ]
+    return Instruction(ADDRESS_LOOKUP_TABLE_PROGRAM, data, accounts)
+
+
+def deactivate_lookup_table_instruction(table, authority):
+    """Build a DeactivateLookupTable instruction (the first step of closing a table)."""
+    return Instruction(ADDRESS_LOOKUP_TABLE_PROGRAM, struct.pack("<I", _DEACTIVATE_LOOKUP_TABLE), [
+        AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+    ])
+
+
+def close_lookup_table_instruction(table, authority, recipient):
+    """Build a CloseLookupTable instruction (allowed once deactivation has cooled down)."""
+    return Instruction(ADDRESS_LOOKUP_TABLE_PROGRAM, struct.pack("<I", _CLOSE_LOOKUP_TABLE), [
+        AccountMeta(pubkey=table, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+        AccountMeta(pubkey=recipient, is_signer=False, is_writable=True),
+    ])
+
+
+def decode_lookup_table(data):
+    """
+    Decode raw lookup table account data.
+
+    Args:
+        data (bytes): Account data
+
+    Returns:
+        dict: authority (Pubkey or None), deactivation_slot, last_extended_slot and addresses
+    """
+    data = bytes(data)
+    if len(data) < LOOKUP_TABLE_META_SIZE:
+        raise ValueError(f"Lookup table data too short: {len(data)} bytes")
+    _, deactivation_slot, last_extended_slot, _, has_authority, authority = \
+        _LOOKUP_TABLE_META_LAYOUT.unpack_from(data, 0)
+    body = data[LOOKUP_TABLE_META_SIZE:]
+    return {
+        "authority": Pubkey(authority) if has_authority else None,
+        "deactivation_slot": deactivation_slot,
+        "last_extended_slot": last_extended_slot,
+        "addresses": [Pubkey(body[i:i + 32]) for i in range(0, len(body) - len(body) % 32, 32)],
+    }
+
+
+def build_versioned_transaction(instructions, payer, signers, blockhash, lookup_tables):
+    """
+    Compile instructions into a MessageV0 that loads accounts from lookup tables, and sign it.
+
+    Program IDs and signers always stay in the static account keys; every
+    other account found in a table is replaced by a one-byte index.
+
+    Args:
+        instructions (list): Instructions to include
+        payer (Pubkey): Fee payer
+        signers (list): Keypairs signing the transaction
+        blockhash (Hash): Recent blockhash (or durable nonce)
+        lookup_tables (list): AddressLookupTableAccount objects
+
+    Returns:
+        VersionedTransaction: Signed transaction
+    """
+    message = MessageV0.try_compile(payer, instructions, lookup_tables, blockhash)
+    return VersionedTransaction(message, signers)
+
+
+def measure_savings(instructions, payer, signers, lookup_table, blockhash=None):
+    """
+    Compare the serialized size of a legacy and a lookup-table transaction.
+
+    Args:
+        instructions (list): Launch instructions
+        payer (Pubkey): Fee payer
+        signers (list): Keypairs signing the transaction
+        lookup_table (AddressLookupTableAccount): Table to compile against
+        blockhash (Hash, optional): Blockhash to sign with (a placeholder if None)
+
+    Returns:
+        dict: Legacy and v0 sizes, bytes saved and packet headroom left by each
+    """
+    blockhash = blockhash or Hash.default()
+    legacy = len(bytes(Transaction(signers, Message(instructions, payer), blockhash)))
+    versioned = len(bytes(build_versioned_transaction(instructions, payer, signers, blockhash, [lookup_table])))
+    return {
+        "legacy_bytes": legacy,
+        "v0_bytes": versioned,
+        "saved_bytes": legacy - versioned,
+        "legacy_headroom": PACKET_DATA_SIZE - legacy,
+        "v0_headroom": PACKET_DATA_SIZE - versioned,
+    }
+
+
+class LookupTableManager:
+    """
+    Create, extend and load the launch address lookup table.
+
+    The table address is remembered in a JSON file so every run compiles
+    against the same table. Addresses added by an extension can only be
+    used from the next slot on.
+    """
+    def __init__(self, client, payer, path=DEFAULT_TABLE_PATH):
+        """
+        Initialize the manager.
+
+        Args:
+            client (Client): Synchronous RPC client
+            payer (Keypair): Fee payer and table authority
+            path (str): JSON file remembering the table address
+        """
+        self.client = client
+        self.payer = payer
+        self.path = path
+        self.address = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.address = Pubkey.from_string(json.load(f)["address"])
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"address": str(self.address)}, f)
+        os.replace(tmp_path, self.path)
+
+    def _send(self, instructions):
+        tracing.count("rpc_calls", method="getLatestBlockhash")
+        blockhash = self.client.get_latest_blockhash().value.blockhash
+        tx = Transaction([self.payer], Message(instructions, self.payer.pubkey()), blockhash)
+        tracing.count("rpc_calls", method="sendTransaction")
+        signature = self.client.send_raw_transaction(bytes(tx)).value
+        self.client.confirm_transaction(signature, "confirmed")
+        return signature
+
+    def _extend_instructions(self, addresses):
+        return [
+            extend_lookup_table_instruction(
+                self.address, self.payer.pubkey(), self.payer.pubkey(),
+                addresses[i:i + MAX_ADDRESSES_PER_EXTEND]
+            )
+            for i in range(0, len(addresses), MAX_ADDRESSES_PER_EXTEND)
+        ]
+
+    def create(self, addresses):
+        """
+        Create a new table holding `addresses` and remember it.
+
+        Args:
+            addresses (list): Addresses to store
+
+        Returns:
+            Pubkey: Table address
+        """
+        tracing.count("rpc_calls", method="getSlot")
+        recent_slot = self.client.get_slot("finalized").value
+        instruction, self.address = create_lookup_table_instruction(
+            self.payer.pubkey(), self.payer.pubkey(), recent_slot
+        )
+        extends = self._extend_instructions(addresses)
+        signature = self._send([instruction] + extends[:1])
+        for extend in extends[1:]:
+            self._send([extend])
+        self._save()
+        print(f"Lookup table created: {self.address} ({signature})")
+        return self.address
+
+    def fetch(self, address=None):
+        """
+        Load a lookup table from the chain.
+
+        Args:
+            address (Pubkey, optional): Table address (defaults to the remembered one)
+
+        Returns:
+            AddressLookupTableAccount: Table ready to compile messages against
+        """
+        address = address or self.address
+        if address is None:
+            raise ValueError("No lookup table; create one first")
+        tracing.count("rpc_calls", method="getAccountInfo")
+        account = self.client.get_account_info(address).value
+        if account is None:
+            raise ValueError(f"Lookup table {address} not found")
+        return AddressLookupTableAccount(key=address, addresses=decode_lookup_table(account.data)["addresses"])
+
+    def ensure(self, addresses):
+        """
+        Make sure the remembered table exists and holds every address, creating or extending it.
+
+        Args:
+            addresses (list): Addresses the table must hold
+
+        Returns:
+            AddressLookupTableAccount: Table as stored on chain after the update
+        """
+        if self.address is None:
+            self.create(addresses)
+            return AddressLookupTableAccount(key=self.address, addresses=list(addresses))
+        table = self.fetch()
+        missing = [a for a in addresses if a not in table.addresses]
+        if missing:
+            for extend in self._extend_instructions(missing):
+                self._send([extend])
+            print(f"Lookup table {self.address} extended with {len(missing)} address(es)")
+            table = AddressLookupTableAccount(key=self.address, addresses=list(table.addresses) + missing)
+        return table
+
+
+def attach_lookup_table(creator, path=DEFAULT_TABLE_PATH):
+    """
+    Point a launcher at the launch lookup table, creating or extending the table as needed.
+
+    Args:
+        creator (PumpTokenCreator): Launcher whose payer owns the table
+        path (str): JSON file remembering the table address
+
+    Returns:
+        AddressLookupTableAccount: Table the launcher now compiles v0 transactions against
+    """
+    manager = LookupTableManager(creator.client, creator.keypair, path)
+    creator.lookup_table = manager.ensure(launch_table_addresses(creator.get_fee_recipient()))
+    print(f"Using lookup table {creator.lookup_table.key} ({len(creator.lookup_table.addresses)} addresses)")
+    return creator.lookup_table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the launch address lookup table")
+    parser.add_argument("--rpc-url", default=os.getenv("RPC_URL"), help="Solana RPC URL")
+    parser.add_argument("--table-file", default=DEFAULT_TABLE_PATH, help="File remembering the table address")
+    subparsers = parser.add_subparsers(dest="action", metavar="action")
+    subparsers.required = True
+    subparsers.add_parser("ensure", help="Create the table, or extend it with missing launch accounts")
+    subparsers.add_parser("show", help="Print the table's addresses")
+    savings = subparsers.add_parser("savings", help="Report per-transaction byte savings (offline)")
+    savings.add_argument("--uri-length", type=int, default=67, help="Metadata URI length to size with")
+    args = parser.parse_args(argv)
+
+    if args.action == "savings":
+        # A sample launch built offline; sizes only depend on the accounts and field lengths
+        payer = Keypair()
+        templates = LaunchTemplates(payer.pubkey())
+        fee_recipient = Pubkey.new_unique()
+        table = AddressLookupTableAccount(key=Pubkey.new_unique(), addresses=launch_table_addresses(fee_recipient))
+        uri = "https://gateway.pinata.cloud/ipfs/" + "Q" * max(0, args.uri_length - 34)
+        print(f"{'launch':<28}{'legacy':>8}{'v0':>8}{'saved':>8}{'headroom':>16}")
+        for label, dev_buy, priced in (("create", False, False), ("create + buy", True, False),
+                                       ("create + buy + budget", True, True)):
+            mint_keypair = Keypair()
+            mint = mint_keypair.pubkey()
+            addresses = templates.derive_addresses(mint)
+            instructions = [templates.create_instruction(
+                mint, addresses, "Benchmark Token", "BENCH", uri, payer.pubkey()
+            )]
+            if dev_buy:
+                instructions.append(templates.ata_instruction(mint, addresses))
+                instructions.append(templates.buy_instruction(
+                    mint, addresses, fee_recipient, 1_000_000, 500_000_000
+                ))
+            if priced:
+                from priority_fees import compute_budget_instructions
+                instructions = compute_budget_instructions(250_000, 10_000) + instructions
+            sizes = measure_savings(instructions, payer.pubkey(), [payer, mint_keypair], table)
+            print(f"{label:<28}{sizes['legacy_bytes']:>8}{sizes['v0_bytes']:>8}{sizes['saved_bytes']:>8}"
+                  f"{sizes['legacy_headroom']:>8} -> {sizes['v0_headroom']}")
+        return 0
+
+    from create import PumpTokenCreator
+
+    creator = PumpTokenCreator(private_key=os.getenv("PRIVATE_KEY"), rpc_url=args.rpc_url)
+    if args.action == "ensure":
+        attach_lookup_table(creator, args.table_file)
+    elif args.action == "show":
+        table = LookupTableManager(creator.client, creator.keypair, args.table_file).fetch()
+        print(f"Lookup table {table.key}:")
+        for address in table.addresses:
+            print(f"  {address}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,575 @@
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import base58
+from solders.hash import Hash
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from bench import STUB_UNITS_CONSUMED, stub_global_account_data
+from bonding_curve import (
+    BONDING_CURVE_DISCRIMINATOR,
+    BONDING_CURVE_LAYOUT,
+    BuyQuote,
+    apply_buy,
+    initial_curve,
+    sol_cost_for_tokens,
+)
+from constants import BUY_DISCRIMINATOR, CREATE_DISCRIMINATOR, PUMP_PROGRAM_ID
+from defaults import COMMITMENT_LEVELS
+from global_state import derive_global_address
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_RPC_PORT = 8899
+DEFAULT_PINATA_PORT = 8900
+
+# Seconds after sendTransaction until a signature reports "confirmed", then "finalized"
+DEFAULT_CONFIRM_DELAY = 0.8
+FINALIZATION_LAG = 12.8
+SLOT_SECONDS = 0.4
+# A blockhash expires this many blocks after it was handed out (as on mainnet)
+BLOCKHASH_VALIDITY = 150
+BLOCKHASH_ROTATE_SECONDS = 2.0
+# Seconds the client is asked to wait on an injected 429
+DEFAULT_RETRY_AFTER = 1
+# Seconds between status checks of a subscribed signature
+NOTIFY_INTERVAL = 0.02
+
+STARTING_SLOT = 300_000_000
+STARTING_BLOCK_HEIGHT = 280_000_000
+MOCK_BALANCE = 100_000_000_000
+
+
+class _MockServer(ABC):
+    """
+    Threaded local HTTP server with injected latency and failures.
+
+    Every request first waits `latency` seconds, plus or minus up to `jitter`.
+    Then it is rejected with 429 (and Retry-After) with probability
+    `throttle_rate` or when it exceeds `rate_limit` requests per second, and
+    with 503 with probability `error_rate`. Otherwise the subclass's handle()
+    answers it.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, rate_limit=None, retry_after=DEFAULT_RETRY_AFTER, seed=None):
+        """
+        Initialize the server (call start() to serve from a background thread).
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free one)
+            latency (float): Mean response latency in seconds
+            jitter (float): Maximum random deviation from the latency in seconds
+            error_rate (float): Fraction of requests answered with 503
+            throttle_rate (float): Fraction of requests answered with 429
+            rate_limit (float, optional): Requests per second above which requests get 429
+            retry_after (int): Retry-After seconds sent with 429s
+            seed (int, optional): Seed of the latency and failure draws
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.injected = Counter()
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """Base URL the server answers on."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooled clients reuse their connections
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, payload, headers = server._dispatch(self.path, self.headers, body)
+                data = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _over_rate_limit(self):
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def _dispatch(self, path, headers, body):
+        with self._lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            draw = self.random.random()
+        time.sleep(delay)
+        if draw < self.throttle_rate or self._over_rate_limit():
+            self._record_injected("throttled")
+            return 429, {"error": "Too Many Requests"}, {"Retry-After": str(self.retry_after)}
+        if draw < self.throttle_rate + self.error_rate:
+            self._record_injected("unavailable")
+            return 503, {"error": "Service Unavailable"}, {}
+        return self.handle(path, headers, body)
+
+    def _record_injected(self, kind):
+        with self._lock:
+            self.injected[kind] += 1
+
+    def _record_request(self, name):
+        with self._lock:
+            self.requests[name] += 1
+
+    @abstractmethod
+    def handle(self, path, headers, body):
+        """
+        Answer one request that passed the failure injection.
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable payload, extra headers)
+        """
+
+    def start(self):
+        """Serve from a daemon thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        """
+        Return request statistics.
+
+        Returns:
+            dict: Requests answered per method or path and injected failures per kind
+        """
+        with self._lock:
+            return {"requests": dict(self.requests), "injected": dict(self.injected)}
+
+
+class _RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class MockRpcServer(_MockServer):
+    """
+    Local stand-in for a Solana JSON-RPC node.
+
+    Implements the methods the launcher calls: the Pump Global account,
+    blockhashes and block heights that advance with wall-clock time, sends,
+    signature statuses that move from processed to confirmed to finalized,
+    simulations and prioritization fees. A sent launch creates its bonding
+    curve account with the dev buy applied, so curves can be read back (e.g.
+    by curve_monitor.py). Sends can additionally fail with "Blockhash not found".
+    With websocket=True, signatureSubscribe is also served on ws_url and
+    notifies once the signature reaches the requested commitment.
+    """
+    def __init__(self, fee_recipient=None, confirm_delay=DEFAULT_CONFIRM_DELAY, blockhash_error_rate=0.0,
+                 units_consumed=STUB_UNITS_CONSUMED, websocket=False, ws_port=0, **options):
+        """
+        Initialize the server.
+
+        Args:
+            fee_recipient (Pubkey, optional): Fee recipient stored in the Global account
+            confirm_delay (float): Seconds until a sent transaction is confirmed
+            blockhash_error_rate (float): Fraction of sends rejected with "Blockhash not found"
+            units_consumed (int): Compute units reported by simulations
+            websocket (bool): Also serve signature subscriptions over a websocket
+            ws_port (int): Websocket port (0 picks a free one)
+            **options: _MockServer options (host, port, latency, jitter, error_rate,
+                throttle_rate, rate_limit, retry_after, seed)
+        """
+        super().__init__(**options)
+        self.fee_recipient = fee_recipient or Pubkey.new_unique()
+        self.confirm_delay = confirm_delay
+        self.blockhash_error_rate = blockhash_error_rate
+        self.units_consumed = units_consumed
+        self.accounts = {str(derive_global_address()): stub_global_account_data(self.fee_recipient)}
+        self.signatures = {}
+        self.started = time.monotonic()
+        self.ws_server = None
+        self._ws_thread = None
+        self._subscriptions = itertools.count(1)
+        if websocket:
+            from websockets.sync.server import serve
+
+            self.ws_server = serve(self._serve_websocket, self.httpd.server_address[0], ws_port)
+
+    @property
+    def ws_url(self):
+        """Websocket URL of the signature subscriptions (None without websocket=True)."""
+        if self.ws_server is None:
+            return None
+        host, port = self.ws_server.socket.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def start(self):
+        super().start()
+        if self.ws_server is not None and not (self._ws_thread and self._ws_thread.is_alive()):
+            self._ws_thread = threading.Thread(target=self.ws_server.serve_forever, name="MockRpcWebsocket",
+                                               daemon=True)
+            self._ws_thread.start()
+        return self
+
+    def stop(self):
+        if self.ws_server is not None:
+            # Also ends the notification loops, which check the serving thread
+            self.ws_server.shutdown()
+            if self._ws_thread:
+                self._ws_thread.join()
+                self._ws_thread = None
+        super().stop()
+
+    def _serve_websocket(self, connection):
+        from websockets.exceptions import ConnectionClosed
+
+        try:
+            for message in connection:
+                request = json.loads(message)
+                method = request.get("method")
+                self._record_request(method)
+                if method != "signatureSubscribe":
+                    connection.send(json.dumps({"jsonrpc": "2.0", "id": request.get("id"),
+                                                "error": {"code": -32601, "message": "Method not found"}}))
+                    continue
+                params = request.get("params") or []
+                config = params[1] if params[1:] else {}
+                subscription = next(self._subscriptions)
+                connection.send(json.dumps({"jsonrpc": "2.0", "result": subscription, "id": request.get("id")}))
+                threading.Thread(
+                    target=self._notify_signature,
+                    args=(connection, subscription, params[0], config.get("commitment") or "finalized"),
+                    daemon=True,
+                ).start()
+        except ConnectionClosed:
+            pass
+
+    def _notify_signature(self, connection, subscription, signature, commitment):
+        from websockets.exceptions import ConnectionClosed
+
+        target = COMMITMENT_LEVELS.index(commitment)
+        while self._ws_thread is not None:
+            status = self._status(signature)
+            if status is not None and COMMITMENT_LEVELS.index(status["confirmationStatus"]) >= target:
+                try:
+                    connection.send(json.dumps({"jsonrpc": "2.0", "method": "signatureNotification", "params": {
+                        "result": {"context": {"slot": status["slot"]}, "value": {"err": None}},
+                        "subscription": subscription,
+                    }}))
+                except ConnectionClosed:
+                    pass
+                return
+            time.sleep(NOTIFY_INTERVAL)
+
+    def _elapsed_slots(self):
+        return int((time.monotonic() - self.started) / SLOT_SECONDS)
+
+    def _context(self):
+        return {"slot": STARTING_SLOT + self._elapsed_slots()}
+
+    def _account(self, address, data_slice=None):
+        data = self.accounts.get(address)
+        if data is None:
+            return None
+        if data_slice:
+            data = data[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+        return {
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "executable": False,
+            "lamports": 1_461_600,
+            "owner": str(PUMP_PROGRAM_ID),
+            "rentEpoch": 0,
+            "space": len(data),
+        }
+
+    def _blockhash(self):
+        # A new blockhash every couple of seconds, like a node's latest one
+        epoch = int((time.monotonic() - self.started) / BLOCKHASH_ROTATE_SECONDS)
+        return str(Hash(hashlib.sha256(b"mock-blockhash-%d" % epoch).digest()))
+
+    def _block_height(self):
+        return STARTING_BLOCK_HEIGHT + self._elapsed_slots()
+
+    def _send(self, params):
+        raw = base64.b64decode(params[0]) if params[1:] and params[1].get("encoding") == "base64" \
+            else base58.b58decode(params[0])
+        with self._lock:
+            expired = self.random.random() < self.blockhash_error_rate
+        if expired:
+            self._record_injected("blockhash_not_found")
+            raise _RpcError(-32002, "Transaction simulation failed: Blockhash not found", {
+                "err": "BlockhashNotFound", "logs": [], "accounts": None,
+                "unitsConsumed": 0, "returnData": None, "innerInstructions": None,
+            })
+        # The first signature follows the one-byte signature count
+        signature = base58.b58encode(raw[1:65]).decode()
+        curves = self._execute(raw)
+        with self._lock:
+            self.signatures[signature] = (time.monotonic(), STARTING_SLOT + self._elapsed_slots())
+            self.accounts.update(curves)
+        return signature
+
+    def _execute(self, raw):
+        """Return the bonding curve accounts written by the Pump create/buy instructions of a transaction."""
+        try:
+            message = VersionedTransaction.from_bytes(raw).message
+        except Exception:
+            return {}
+        # Lookup table entries are not resolved; the per-launch accounts are always static keys
+        keys = [str(key) for key in message.account_keys]
+        curves = {}
+        for ix in message.instructions:
+            data = bytes(ix.data)
+            if keys[ix.program_id_index] != str(PUMP_PROGRAM_ID) or len(ix.accounts) < 4 \
+                    or max(ix.accounts[:4]) >= len(keys):
+                continue
+            # create: mint, mint authority, bonding curve, ...
+            if data[:8] == CREATE_DISCRIMINATOR:
+                curves[keys[ix.accounts[2]]] = initial_curve()
+            # buy: global, fee recipient, mint, bonding curve, ...
+            elif data[:8] == BUY_DISCRIMINATOR and keys[ix.accounts[3]] in curves:
+                address = keys[ix.accounts[3]]
+                curve = curves[address]
+                amount = int.from_bytes(data[8:16], "little")
+                cost = sol_cost_for_tokens(amount, curve)
+                net = sol_cost_for_tokens(amount, curve, fee_basis_points=0)
+                curves[address] = apply_buy(curve, BuyQuote(cost, cost - net, amount, cost))
+        return {address: BONDING_CURVE_LAYOUT.pack(BONDING_CURVE_DISCRIMINATOR, *curve)
+                for address, curve in curves.items()}
+
+    def _status(self, signature):
+        with self._lock:
+            entry = self.signatures.get(signature)
+        if entry is None:
+            return None
+        sent, slot = entry
+        age = time.monotonic() - sent
+        if age < self.confirm_delay:
+            status = "processed"
+        elif age < self.confirm_delay + FINALIZATION_LAG:
+            status = "confirmed"
+        else:
+            status = "finalized"
+        return {"slot": slot, "confirmations": None if status == "finalized" else 1,
+                "err": None, "status": {"Ok": None}, "confirmationStatus": status}
+
+    def call(self, method, params):
+        """
+        Answer one JSON-RPC method.
+
+        Args:
+            method (str): Method name
+            params (list): Positional parameters
+
+        Returns:
+            object: The result field of the response
+
+        Raises:
+            _RpcError: For unknown methods and injected send failures
+        """
+        config = params[-1] if params and isinstance(params[-1], dict) else {}
+        if method == "getAccountInfo":
+            return {"context": self._context(), "value": self._account(params[0], config.get("dataSlice"))}
+        if method == "getMultipleAccounts":
+            return {"context": self._context(),
+                    "value": [self._account(address, config.get("dataSlice")) for address in params[0]]}
+        if method == "getLatestBlockhash":
+            return {"context": self._context(), "value": {
+                "blockhash": self._blockhash(), "lastValidBlockHeight": self._block_height() + BLOCKHASH_VALIDITY,
+            }}
+        if method == "getBlockHeight":
+            return self._block_height()
+        if method == "getSlot":
+            return self._context()["slot"]
+        if method == "sendTransaction":
+            return self._send(params)
+        if method == "getSignatureStatuses":
+            return {"context": self._context(), "value": [self._status(s) for s in params[0]]}
+        if method == "simulateTransaction":
+            return {"context": self._context(), "value": {
+                "err": None, "logs": [], "accounts": None, "unitsConsumed": self.units_consumed,
+                "returnData": None, "innerInstructions": None,
+            }}
+        if method == "getRecentPrioritizationFees":
+            slot = self._context()["slot"]
+            with self._lock:
+                fees = [self.random.choice((0, 0, 1_000, 10_000, 100_000)) for _ in range(150)]
+            return [{"slot": slot - i, "prioritizationFee": fee} for i, fee in enumerate(fees)]
+        if method == "getMinimumBalanceForRentExemption":
+            return (128 + params[0]) * 6_960
+        if method == "getBalance":
+            return {"context": self._context(), "value": MOCK_BALANCE}
+        if method == "getHealth":
+            return "ok"
+        raise _RpcError(-32601, "Method not found")
+
+    def _answer(self, request):
+        method = request.get("method")
+        self._record_request(method)
+        try:
+            return {"jsonrpc": "2.0", "result": self.call(method, request.get("params") or []),
+                    "id": request.get("id")}
+        except _RpcError as e:
+            error = {"code": e.code, "message": e.message}
+            if e.data is not None:
+                error["data"] = e.data
+            return {"jsonrpc": "2.0", "error": error, "id": request.get("id")}
+
+    def handle(self, path, headers, body):
+        request = json.loads(body)
+        if isinstance(request, list):
+            return 200, [self._answer(r) for r in request], {}
+        return 200, self._answer(request), {}
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["transactions"] = len(self.signatures)
+        return stats
+
+
+class MockPinataServer(_MockServer):
+    """
+    Local stand-in for the Pinata pinning API.
+
+    pinFileToIPFS and pinJSONToIPFS answer with a CID derived from the
+    request body; nothing is stored. Point PinataStorage(api_url=...) or
+    PINATA_API_URL at url.
+    """
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.pinned_bytes = 0
+        self._pins = itertools.count()
+
+    def handle(self, path, headers, body):
+        if path not in ("/pinning/pinFileToIPFS", "/pinning/pinJSONToIPFS"):
+            return 404, {"error": f"Unknown endpoint {path}"}, {}
+        self._record_request(path.rsplit("/", 1)[1])
+        with self._lock:
+            self.pinned_bytes += len(body)
+        cid = "Qm" + base58.b58encode(hashlib.sha256(body).digest()).decode()[:44]
+        return 200, {"IpfsHash": cid, "PinSize": len(body), "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ")}, {}
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["pinned_bytes"] = self.pinned_bytes
+        return stats
+
+
+def add_fault_arguments(parser):
+    """Add the latency and failure injection options shared by both servers."""
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Maximum deviation from the mean latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before 429s")
+    parser.add_argument("--retry-after", type=int, default=DEFAULT_RETRY_AFTER, help="Retry-After sent with 429s")
+    parser.add_argument("--blockhash-error-rate", type=float, default=0.0,
+                        help="Fraction of sends rejected with 'Blockhash not found'")
+    parser.add_argument("--confirm-delay", type=float, default=DEFAULT_CONFIRM_DELAY,
+                        help="Seconds until a sent transaction is confirmed")
+    parser.add_argument("--upload-latency-ms", type=float, default=None,
+                        help="Mean Pinata latency (defaults to --latency-ms)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the latency and failure draws")
+
+
+def servers_from_args(args, host=DEFAULT_HOST, rpc_port=0, pinata_port=0, websocket=False):
+    """
+    Create (but do not start) the mock RPC and Pinata servers from parsed options.
+
+    With websocket=True, the RPC server also serves signature subscriptions.
+
+    Returns:
+        tuple: (MockRpcServer, MockPinataServer)
+    """
+    shared = {
+        "host": host, "jitter": args.jitter_ms / 1000, "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate, "rate_limit": args.rate_limit,
+        "retry_after": args.retry_after, "seed": args.seed,
+    }
+    upload_latency = args.latency_ms if args.upload_latency_ms is None else args.upload_latency_ms
+    rpc = MockRpcServer(port=rpc_port, latency=args.latency_ms / 1000, confirm_delay=args.confirm_delay,
+                        blockhash_error_rate=args.blockhash_error_rate, websocket=websocket, **shared)
+    pinata = MockPinataServer(port=pinata_port, latency=upload_latency / 1000, **shared)
+    return rpc, pinata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock Solana RPC node and Pinata API locally")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind")
+    parser.add_argument("--rpc-port", type=int, default=DEFAULT_RPC_PORT, help="JSON-RPC port")
+    parser.add_argument("--pinata-port", type=int, default=DEFAULT_PINATA_PORT, help="Pinata API port")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    rpc, pinata = servers_from_args(args, args.host, args.rpc_port, args.pinata_port, websocket=True)
+    with rpc, pinata:
+        print(f"Mock RPC:    {rpc.url}  (RPC_URL={rpc.url})")
+        print(f"Mock WS:     {rpc.ws_url}  (WS_URL={rpc.ws_url})")
+        print(f"Mock Pinata: {pinata.url}  (PINATA_API_URL={pinata.url})")
+        print(f"Fee recipient: {rpc.fee_recipient}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\nRPC: {json.dumps(rpc.stats())}")
+            print(f"Pinata: {json.dumps(pinata.stats())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
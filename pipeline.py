@@ -0,0 +1,316 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import EVENT_AUTHORITY
+from rate_limit import BLOCKHASH_NOT_FOUND, backoff_delay
+from create import (
+    build_metadata,
+    metadata_to_data_uri,
+    upload_image_to_ipfs,
+    upload_metadata_to_ipfs,
+)
+import tracing
+
+# A blockhash older than this when the transaction is signed is fetched again
+# (it stays valid for about 60 s, and the uploads may have taken a while)
+MAX_BLOCKHASH_AGE = 30.0
+DEFAULT_MAX_RETRIES = 3
+
+# Width of the timeline bars in format_report()
+TIMELINE_WIDTH = 40
+
+
+class StageGraph:
+    """
+    Run named stages on a thread pool as soon as the stages they depend on finish.
+
+    Each stage function receives the results of its dependencies as keyword
+    arguments and its return value is handed on to the stages that depend on
+    it. Independent stages, typically network round-trips, therefore run
+    concurrently, and the total time is that of the longest dependency chain
+    rather than the sum of the stages. A failed stage fails every stage that
+    depends on it; stages that do not are left to finish.
+    """
+    def __init__(self):
+        self.stages = {}
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, fn, deps=()):
+        """
+        Add a stage (its dependencies must already be added).
+
+        Args:
+            name (str): Stage name, also the keyword its result is passed under
+            fn (callable): Called with the dependency results as keyword arguments
+            deps (tuple): Names of the stages this one waits for
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stage(s): {', '.join(missing)}")
+        self.stages[name] = (fn, tuple(deps))
+
+    def run(self):
+        """
+        Run every stage.
+
+        Stages are submitted in the order they were added, each to its own
+        worker, and block on their dependencies' futures. Tracing spans opened
+        by the stages nest under the caller's current span.
+
+        Returns:
+            dict: Stage name -> Future
+        """
+        started = time.perf_counter()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=len(self.stages) or 1, thread_name_prefix="stage") as executor:
+            for name, (fn, deps) in self.stages.items():
+                context = contextvars.copy_context()
+                futures[name] = executor.submit(
+                    context.run, self._run_stage, name, fn, [(d, futures[d]) for d in deps], started
+                )
+        return futures
+
+    def _run_stage(self, name, fn, deps, started):
+        kwargs = {dep: future.result() for dep, future in deps}
+        stage_started = time.perf_counter()
+        error = None
+        try:
+            with tracing.span(name):
+                return fn(**kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self.timings[name] = {
+                    "start_ms": round((stage_started - started) * 1000, 3),
+                    "end_ms": round((ended - started) * 1000, 3),
+                    "error": error,
+                }
+
+    def report(self):
+        """
+        Summarize the last run.
+
+        Returns:
+            dict: wall_ms, serial_ms (sum of stage durations), overlap (serial / wall),
+                critical_path (stage names), critical_path_ms and per-stage timings
+        """
+        stages = []
+        chain = {}
+        for name, (_, deps) in self.stages.items():
+            timing = self.timings.get(name)
+            if timing is None:
+                continue
+            duration = timing["end_ms"] - timing["start_ms"]
+            stages.append(dict(timing, name=name, duration_ms=round(duration, 3)))
+            # Longest chain of stage durations ending at this stage
+            before = max((chain[d] for d in deps if d in chain), key=lambda c: c[0], default=(0.0, []))
+            chain[name] = (before[0] + duration, before[1] + [name])
+        wall = max((s["end_ms"] for s in stages), default=0.0)
+        serial = sum(s["duration_ms"] for s in stages)
+        critical_ms, critical_path = max(chain.values(), key=lambda c: c[0], default=(0.0, []))
+        return {
+            "wall_ms": round(wall, 3),
+            "serial_ms": round(serial, 3),
+            "overlap": round(serial / wall, 2) if wall else 1.0,
+            "critical_path": critical_path,
+            "critical_path_ms": round(critical_ms, 3),
+            "stages": stages,
+        }
+
+
+def format_report(report, width=TIMELINE_WIDTH):
+    """
+    Render a run report as a text timeline.
+
+    Args:
+        report (dict): Result of StageGraph.report()
+        width (int): Width of the timeline bars in characters
+
+    Returns:
+        str: One line per stage with its start, duration and bar, then the totals
+    """
+    wall = report["wall_ms"] or 1.0
+    lines = [f"{'stage':<24}{'start ms':>10}{'took ms':>10}  timeline"]
+    for stage in sorted(report["stages"], key=lambda s: s["start_ms"]):
+        begin = int(stage["start_ms"] / wall * width)
+        end = max(begin + 1, int(round(stage["end_ms"] / wall * width)))
+        bar = " " * begin + ("x" if stage["error"] else "#") * (end - begin)
+        marker = " *" if stage["name"] in report["critical_path"] else ""
+        lines.append(f"{stage['name']:<24}{stage['start_ms']:>10.1f}{stage['duration_ms']:>10.1f}  |{bar:<{width}}|{marker}")
+    lines.append(f"wall {report['wall_ms']:.1f} ms, stages sum to {report['serial_ms']:.1f} ms "
+                 f"(overlap {report['overlap']}x)")
+    lines.append(f"critical path (*) {report['critical_path_ms']:.1f} ms: {' -> '.join(report['critical_path'])}")
+    return "\n".join(lines)
+
+
+def build_launch_graph(creator, name, symbol, image, dev_buy_amount, description="", telegram="",
+                       website="", twitter="", creator_address=None, storage=None, image_format="WEBP",
+                       max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Build the stage graph of a single launch.
+
+    The uploads (image, then metadata) form one chain; the global state with
+    the compute profile and the priority fee, the mint keypair and its PDAs,
+    and the blockhash are fetched alongside it. Only building, signing and sending
+    wait for everything.
+
+    Args:
+        creator (PumpTokenCreator): Launcher holding the payer and RPC client
+        name (str): Token name
+        symbol (str): Token symbol
+        image (str): Local image file (uploaded to IPFS) or image URL
+        dev_buy_amount (float): Amount of SOL to spend on initial buy
+        description (str): Token description
+        telegram (str): Telegram link
+        website (str): Website
+        twitter (str): Twitter link
+        creator_address (str, optional): Creator address (defaults to the wallet)
+        storage (StorageClient, optional): Upload backend (defaults to the shared Pinata client)
+        image_format (str): Format a local image is recompressed to
+        max_retries (int): Attempts to send on "Blockhash not found"
+
+    Returns:
+        StageGraph: Graph whose "submit" stage returns the launch result dict
+    """
+    graph = StageGraph()
+
+    def upload_image():
+        if not os.path.exists(image):
+            return image, None
+        image_uri, image_type = upload_image_to_ipfs(image, storage, target_format=image_format)
+        if not image_uri:
+            raise RuntimeError(f"Could not upload {image}")
+        return image_uri, image_type
+
+    def upload_metadata(upload_image):
+        image_uri, image_type = upload_image
+        metadata = build_metadata(name, symbol, description, image_uri, telegram, website, twitter, image_type)
+        return upload_metadata_to_ipfs(metadata, storage) or metadata_to_data_uri(metadata)
+
+    def mint_keypair():
+        keypair = creator.new_mint_keypair()
+        print(f"New mint address created: {keypair.pubkey()}")
+        return keypair, creator.templates.derive_addresses(keypair.pubkey())
+
+    def global_state():
+        state = creator.get_global_state()
+        fee_recipient = state.fee_recipient if state else None
+        if not fee_recipient:
+            fee_recipient = EVENT_AUTHORITY
+            print(f"Using event authority as fee recipient: {fee_recipient}")
+        return fee_recipient, creator.quote_dev_buy(dev_buy_amount, state)
+
+    def profile_compute_units(global_state):
+        # Reuses the global state cached by the previous stage
+        return creator.profile_compute_units()
+
+    def priority_fee(global_state):
+        # Samples the payer and fee recipient the launch write-locks (cached after the first call)
+        return creator.priority_fee(global_state[0])
+
+    def blockhash():
+        return creator.get_recent_blockhash()
+
+    def build_instructions(upload_metadata, mint_keypair, global_state, profile_compute_units, priority_fee):
+        keypair, pdas = mint_keypair
+        fee_recipient, buy_quote = global_state
+        instructions, pdas = creator.build_instructions(
+            keypair, name, symbol, upload_metadata, dev_buy_amount, creator.resolve_creator(creator_address),
+            fee_recipient, buy_quote, pdas
+        )
+        return instructions, creator.add_compute_budget(instructions, fee_recipient, priority_fee)
+
+    def sign(build_instructions, mint_keypair, blockhash):
+        _, budgeted = build_instructions
+        if time.monotonic() - blockhash.fetched_at > MAX_BLOCKHASH_AGE:
+            blockhash = creator.get_recent_blockhash()
+        return creator.build_transaction(budgeted, mint_keypair[0], blockhash.blockhash), blockhash
+
+    def submit(sign, build_instructions, mint_keypair, global_state, upload_metadata):
+        tx, blockhash_info = sign
+        instructions, budgeted = build_instructions
+        keypair, pdas = mint_keypair
+        for attempt in range(1, max_retries + 1):
+            try:
+                signature, confirmation = creator.send_launch(
+                    tx, instructions, keypair, blockhash_info, global_state[0]
+                )
+                break
+            except Exception as e:
+                if "Blockhash not found" not in str(e) or attempt == max_retries:
+                    raise
+                tracing.count("retries", cause="blockhash_not_found")
+                if creator.blockhash_provider is not None:
+                    creator.blockhash_provider.invalidate()
+                print(f"Attempt {attempt + 1} out of {max_retries}...")
+                time.sleep(backoff_delay(BLOCKHASH_NOT_FOUND, attempt - 1))
+                blockhash_info = creator.get_recent_blockhash()
+                tx = creator.build_transaction(budgeted, keypair, blockhash_info.blockhash)
+        launch = {
+            "success": True,
+            "mint": str(keypair.pubkey()),
+            "tx_signature": signature,
+            "bonding_curve": str(pdas["bonding_curve"]),
+            "dev_buy_amount": dev_buy_amount if dev_buy_amount > 0 else 0,
+            "dev_buy_tokens": global_state[1].tokens_out,
+            "metadata_uri": upload_metadata,
+        }
+        if confirmation is not None:
+            launch["confirmation"] = confirmation
+        return launch
+
+    graph.add("upload_image", upload_image)
+    graph.add("upload_metadata", upload_metadata, ("upload_image",))
+    graph.add("mint_keypair", mint_keypair)
+    graph.add("global_state", global_state)
+    graph.add("profile_compute_units", profile_compute_units, ("global_state",))
+    graph.add("priority_fee", priority_fee, ("global_state",))
+    graph.add("blockhash", blockhash)
+    graph.add("build_instructions", build_instructions,
+              ("upload_metadata", "mint_keypair", "global_state", "profile_compute_units", "priority_fee"))
+    graph.add("sign", sign, ("build_instructions", "mint_keypair", "blockhash"))
+    graph.add("submit", submit, ("sign", "build_instructions", "mint_keypair", "global_state", "upload_metadata"))
+    return graph
+
+
+def launch_token(creator, name, symbol, image, dev_buy_amount, **options):
+    """
+    Upload, build, sign and send a launch with its independent stages run concurrently.
+
+    Args:
+        creator (PumpTokenCreator): Launcher holding the payer and RPC client
+        name (str): Token name
+        symbol (str): Token symbol
+        image (str): Local image file (uploaded to IPFS) or image URL
+        dev_buy_amount (float): Amount of SOL to spend on initial buy
+        **options: Other build_launch_graph() arguments (description, social links,
+            creator_address, storage, image_format, max_retries)
+
+    Returns:
+        dict: Launch result (success, mint, tx_signature, ... or error) with the run
+            report under "pipeline"
+    """
+    with tracing.span("launch", symbol=symbol, dev_buy_amount=dev_buy_amount) as launch_span:
+        graph = build_launch_graph(creator, name, symbol, image, dev_buy_amount, **options)
+        futures = graph.run()
+        try:
+            result = futures["submit"].result()
+            launch_span.set(success=True, mint=result["mint"], signature=str(result["tx_signature"]))
+        except Exception as e:
+            print(f"Error creating token: {str(e)}")
+            launch_span.set(success=False, error=str(e))
+            result = {"success": False, "error": str(e)}
+    if futures["mint_keypair"].exception() is None:
+        # A pre-ground vanity key goes back to the pool unless the launch was sent
+        creator.release_mint_keypair(futures["mint_keypair"].result()[0], result["success"])
+    result["pipeline"] = graph.report()
+    return result
@@ -0,0 +1,354 @@
+import struct
+from solana.rpc.types import TxOpts
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.sysvar import RECENT_BLOCKHASHES
+
+from constants import (
+    PUMP_PROGRAM_ID,
+    TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM,
+    SYSTEM_PROGRAM,
+    MPL_TOKEN_METADATA,
+    RENT_SYSVAR,
+    EVENT_AUTHORITY,
+    CREATE_DISCRIMINATOR,
+    BUY_DISCRIMINATOR,
+)
+from lookup_table import PACKET_DATA_SIZE
+from priority_fees import MAX_COMPUTE_UNIT_LIMIT
+from templates import GLOBAL, MINT_AUTHORITY, LaunchTemplates
+
+# Metaplex metadata string limits, in bytes
+MAX_NAME_LENGTH = 32
+MAX_SYMBOL_LENGTH = 10
+MAX_URI_LENGTH = 200
+
+# Send options once a launch passed local preflight
+SKIP_PREFLIGHT = TxOpts(skip_preflight=True)
+
+_U32 = struct.Struct("<I")
+_BUY_ARGS = struct.Struct("<QQ")
+
+# ComputeBudget and System instruction tags
+_SET_COMPUTE_UNIT_LIMIT = 2
+_SET_COMPUTE_UNIT_PRICE = 3
+_ADVANCE_NONCE_ACCOUNT = 4
+
+# Expected accounts of each launch instruction: (role, is_signer, is_writable)
+CREATE_ACCOUNTS = (
+    ("mint", True, True),
+    ("mint_authority", False, False),
+    ("bonding_curve", False, True),
+    ("associated_bonding_curve", False, True),
+    ("global", False, False),
+    ("mpl_token_metadata", False, False),
+    ("metadata", False, True),
+    ("payer", True, True),
+    ("system_program", False, False),
+    ("token_program", False, False),
+    ("associated_token_program", False, False),
+    ("rent", False, False),
+    ("event_authority", False, False),
+    ("program", False, False),
+)
+ATA_ACCOUNTS = (
+    ("payer", True, True),
+    ("associated_user", False, True),
+    ("payer", False, False),
+    ("mint", False, False),
+    ("system_program", False, False),
+    ("token_program", False, False),
+    ("rent", False, False),
+)
+BUY_ACCOUNTS = (
+    ("global", False, False),
+    ("fee_recipient", False, True),
+    ("mint", False, False),
+    ("bonding_curve", False, True),
+    ("associated_bonding_curve", False, True),
+    ("associated_user", False, True),
+    ("payer", True, True),
+    ("system_program", False, False),
+    ("token_program", False, False),
+    ("rent", False, False),
+    ("event_authority", False, False),
+    ("program", False, False),
+)
+ADVANCE_NONCE_ACCOUNTS = (
+    ("nonce_account", False, True),
+    ("recent_blockhashes", False, False),
+    ("payer", True, False),
+)
+
+_STATIC_ROLES = {
+    "mint_authority": MINT_AUTHORITY,
+    "global": GLOBAL,
+    "mpl_token_metadata": MPL_TOKEN_METADATA,
+    "system_program": SYSTEM_PROGRAM,
+    "token_program": TOKEN_PROGRAM,
+    "associated_token_program": ASSOCIATED_TOKEN_PROGRAM,
+    "rent": RENT_SYSVAR,
+    "event_authority": EVENT_AUTHORITY,
+    "program": PUMP_PROGRAM_ID,
+    "recent_blockhashes": RECENT_BLOCKHASHES,
+}
+
+
+class PreflightError(ValueError):
+    """Raised for launch transactions that would be rejected on chain."""
+    def __init__(self, problems):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+def metadata_problems(name, symbol, uri):
+    """
+    Check token strings against the Metaplex metadata limits.
+
+    Args:
+        name (str): Token name
+        symbol (str): Token symbol
+        uri (str): Metadata URI
+
+    Returns:
+        list: Problems found (empty if the strings fit)
+    """
+    problems = []
+    for label, value, limit in (("name", name, MAX_NAME_LENGTH), ("symbol", symbol, MAX_SYMBOL_LENGTH),
+                                ("uri", uri, MAX_URI_LENGTH)):
+        size = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+        if size > limit:
+            problems.append(f"{label} is {size} bytes (max {limit})")
+    if not name:
+        problems.append("name is empty")
+    if not symbol:
+        problems.append("symbol is empty")
+    return problems
+
+
+def resolve_accounts(message, lookup_tables=()):
+    """
+    List the accounts a compiled message loads, with their signer and writable flags.
+
+    Static keys take their flags from the message header; keys loaded from
+    lookup tables are never signers and are writable when loaded through
+    writable indexes (all writable lookups come before all readonly ones).
+
+    Args:
+        message (Message or MessageV0): Compiled message
+        lookup_tables (list): AddressLookupTableAccount objects the message was compiled against
+
+    Returns:
+        list: (Pubkey, is_signer, is_writable) per account index
+    """
+    header = message.header
+    keys = list(message.account_keys)
+    signed = header.num_required_signatures
+    writable_signed = signed - header.num_readonly_signed_accounts
+    writable_unsigned = len(keys) - header.num_readonly_unsigned_accounts
+    accounts = [
+        (key, i < signed, i < writable_signed or signed <= i < writable_unsigned)
+        for i, key in enumerate(keys)
+    ]
+    lookups = list(getattr(message, "address_table_lookups", None) or [])
+    if lookups:
+        tables = {table.key: table.addresses for table in lookup_tables}
+        for writable in (True, False):
+            for lookup in lookups:
+                addresses = tables.get(lookup.account_key)
+                if addresses is None:
+                    raise PreflightError([f"lookup table {lookup.account_key} is not loaded"])
+                for index in (lookup.writable_indexes if writable else lookup.readonly_indexes):
+                    if index >= len(addresses):
+                        raise PreflightError([f"lookup table {lookup.account_key} has no index {index}"])
+                    accounts.append((addresses[index], False, writable))
+    return accounts
+
+
+def _create_data_problems(data):
+    if data[:8] != CREATE_DISCRIMINATOR:
+        return ["create: wrong instruction discriminator"]
+    fields = []
+    offset = 8
+    for _ in range(3):
+        if offset + 4 > len(data):
+            return ["create: instruction data truncated"]
+        (length,) = _U32.unpack_from(data, offset)
+        offset += 4
+        if offset + length > len(data):
+            return ["create: instruction data truncated"]
+        try:
+            fields.append(data[offset:offset + length].decode("utf-8"))
+        except UnicodeDecodeError:
+            return ["create: string is not valid UTF-8"]
+        offset += length
+    if len(data) != offset + 32:
+        return [f"create: expected a 32-byte creator after the strings, got {len(data) - offset} bytes"]
+    return [f"create: {problem}" for problem in metadata_problems(*fields)]
+
+
+def _buy_data_problems(data):
+    if data[:8] != BUY_DISCRIMINATOR:
+        return ["buy: wrong instruction discriminator"]
+    if len(data) != 8 + _BUY_ARGS.size:
+        return [f"buy: instruction data is {len(data)} bytes (expected {8 + _BUY_ARGS.size})"]
+    amount, max_sol_cost = _BUY_ARGS.unpack_from(data, 8)
+    problems = []
+    if amount == 0:
+        problems.append("buy: token amount is 0")
+    if max_sol_cost == 0:
+        problems.append("buy: max SOL cost is 0")
+    return problems
+
+
+def _compute_budget_problems(data):
+    if data[:1] == bytes([_SET_COMPUTE_UNIT_LIMIT]) and len(data) == 5:
+        (limit,) = _U32.unpack_from(data, 1)
+        if not 0 < limit <= MAX_COMPUTE_UNIT_LIMIT:
+            return [f"compute unit limit {limit} outside 1..{MAX_COMPUTE_UNIT_LIMIT}"]
+        return []
+    if data[:1] == bytes([_SET_COMPUTE_UNIT_PRICE]) and len(data) == 9:
+        return []
+    return ["unexpected ComputeBudget instruction"]
+
+
+def launch_problems(tx, payer, fee_recipient=None, lookup_tables=(), verify_signatures=True):
+    """
+    Check a signed launch transaction offline.
+
+    Covers the packet size limit, the fee payer and signature set, the
+    instruction sequence (optional AdvanceNonceAccount, ComputeBudget, then
+    create and optionally ATA + buy), every account of the Pump and ATA
+    instructions against the expected layout (address, signer and writable
+    flags), the instruction data encoding and the metadata string limits.
+
+    Args:
+        tx (Transaction or VersionedTransaction): Signed launch transaction
+        payer (Pubkey): Wallet expected to pay for and sign the launch
+        fee_recipient (Pubkey, optional): Expected fee recipient of the buy (only checked
+            for being set when None)
+        lookup_tables (list): AddressLookupTableAccount objects a v0 message was compiled against
+        verify_signatures (bool): Verify every signature (about 100 us each); otherwise only
+            check that none is missing, which is enough for transactions signed locally
+            by solders, as it refuses keypairs that do not match the message's signers
+
+    Returns:
+        list: Problems found (empty if the launch can be sent without a remote preflight)
+    """
+    problems = []
+    size = len(bytes(tx))
+    if size > PACKET_DATA_SIZE:
+        problems.append(f"transaction is {size} bytes (max {PACKET_DATA_SIZE})")
+
+    message = tx.message
+    try:
+        accounts = resolve_accounts(message, lookup_tables)
+    except PreflightError as e:
+        return problems + e.problems
+    if not accounts or accounts[0][0] != payer:
+        problems.append(f"fee payer is not {payer}")
+    signers = [key for key, is_signer, _ in accounts if is_signer]
+    if len(tx.signatures) != len(signers):
+        problems.append(f"{len(tx.signatures)} signature(s) for {len(signers)} required signer(s)")
+    elif verify_signatures:
+        invalid = [str(key) for key, ok in zip(signers, tx.verify_with_results()) if not ok]
+        if invalid:
+            problems.append(f"signature(s) do not verify: {', '.join(invalid)}")
+    else:
+        invalid = [str(key) for key, signature in zip(signers, tx.signatures) if signature == Signature.default()]
+        if invalid:
+            problems.append(f"missing signature(s): {', '.join(invalid)}")
+
+    # Expected flags are the union over every instruction that references an account
+    expected_flags = {}
+    sequence = []
+    mint = None
+    layouts = []
+    for position, compiled in enumerate(message.instructions):
+        program_id = accounts[compiled.program_id_index][0]
+        keys = [accounts[i][0] for i in compiled.accounts]
+        data = bytes(compiled.data)
+        if program_id == COMPUTE_BUDGET_PROGRAM:
+            sequence.append("budget")
+            problems += _compute_budget_problems(data)
+        elif program_id == SYSTEM_PROGRAM and data[:4] == _U32.pack(_ADVANCE_NONCE_ACCOUNT):
+            if position != 0:
+                problems.append("AdvanceNonceAccount must be the first instruction")
+            sequence.append("nonce")
+            layouts.append(("advance_nonce", ADVANCE_NONCE_ACCOUNTS, keys))
+        elif program_id == PUMP_PROGRAM_ID and data[:8] == CREATE_DISCRIMINATOR:
+            sequence.append("create")
+            problems += _create_data_problems(data)
+            layouts.append(("create", CREATE_ACCOUNTS, keys))
+            if keys and mint is None:
+                mint = keys[0]
+        elif program_id == PUMP_PROGRAM_ID and data[:8] == BUY_DISCRIMINATOR:
+            sequence.append("buy")
+            problems += _buy_data_problems(data)
+            layouts.append(("buy", BUY_ACCOUNTS, keys))
+        elif program_id == ASSOCIATED_TOKEN_PROGRAM:
+            sequence.append("ata")
+            if data not in (b"", b"\x01"):
+                problems.append("ata: unexpected instruction data")
+            layouts.append(("ata", ATA_ACCOUNTS, keys))
+        else:
+            problems.append(f"unexpected instruction {position} for program {program_id}")
+
+    launch = [step for step in sequence if step not in ("nonce", "budget")]
+    if launch not in (["create"], ["create", "ata", "buy"]):
+        problems.append(f"unexpected instruction sequence: {', '.join(sequence)}")
+    if sequence.count("budget") > 2:
+        problems.append("more than two ComputeBudget instructions")
+    if mint is None:
+        return problems
+
+    roles = dict(_STATIC_ROLES, payer=payer, mint=mint, **LaunchTemplates(payer).derive_addresses(mint))
+    for label, layout, keys in layouts:
+        if len(keys) != len(layout):
+            problems.append(f"{label}: {len(keys)} accounts (expected {len(layout)})")
+            continue
+        for key, (role, is_signer, is_writable) in zip(keys, layout):
+            if role == "fee_recipient":
+                if key == Pubkey.default() or key == SYSTEM_PROGRAM:
+                    problems.append(f"{label}: fee recipient is not set")
+                elif fee_recipient is not None and key != fee_recipient:
+                    problems.append(f"{label}: fee recipient is {key} (expected {fee_recipient})")
+            elif role != "nonce_account" and key != roles[role]:
+                problems.append(f"{label}: {role} is {key} (expected {roles[role]})")
+            signer, writable = expected_flags.get(key, (False, False))
+            expected_flags[key] = (signer or is_signer, writable or is_writable)
+
+    for key, is_signer, is_writable in accounts:
+        expected = expected_flags.get(key)
+        if expected is None:
+            continue
+        if is_signer != expected[0]:
+            problems.append(f"{key} is {'' if is_signer else 'not '}a signer")
+        if is_writable != expected[1]:
+            problems.append(f"{key} is {'' if is_writable else 'not '}writable")
+    return problems
+
+
+def validate_launch(tx, payer, fee_recipient=None, lookup_tables=(), verify_signatures=True):
+    """
+    Check a signed launch offline and raise if it would be rejected.
+
+    Args:
+        tx (Transaction or VersionedTransaction): Signed launch transaction
+        payer (Pubkey): Wallet expected to pay for and sign the launch
+        fee_recipient (Pubkey, optional): Expected fee recipient of the buy
+        lookup_tables (list): AddressLookupTableAccount objects a v0 message was compiled against
+        verify_signatures (bool): Verify every signature (see launch_problems())
+
+    Returns:
+        TxOpts: Send options that skip the remote preflight simulation
+
+    Raises:
+        PreflightError: With every problem found
+    """
+    problems = launch_problems(tx, payer, fee_recipient, lookup_tables, verify_signatures)
+    if problems:
+        raise PreflightError(problems)
+    return SKIP_PREFLIGHT
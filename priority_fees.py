@@ -0,0 +1,298 @@
+import json
+import math
+import os
+import threading
+import time
+import requests
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+
+from defaults import DEFAULT_FEE_CAP, DEFAULT_FEE_POLICY, FEE_POLICIES
+from rate_limit import get_limiter
+import tracing
+
+# Hard per-transaction compute limit
+MAX_COMPUTE_UNIT_LIMIT = 1_400_000
+
+# Launch paths the compute profile distinguishes
+CREATE = "create"
+CREATE_BUY = "create_buy"
+
+# Used until a simulation profile exists (or when simulation fails)
+DEFAULT_COMPUTE_UNITS = {
+    CREATE: 150_000,
+    CREATE_BUY: 250_000,
+}
+# Headroom added on top of the simulated units
+DEFAULT_CU_MARGIN = 0.15
+DEFAULT_PROFILE_PATH = ".cu_profile.json"
+
+# Fee policies (p50/p75/p90 of recent fees, or always the cap) and the default
+# cap in micro-lamports per compute unit live in defaults.py
+DEFAULT_FEE_FLOOR = 0
+# getRecentPrioritizationFees covers the last 150 slots
+DEFAULT_WINDOW_SLOTS = 150
+DEFAULT_REFRESH_INTERVAL = 5.0
+DEFAULT_TIMEOUT = 10
+
+
+def compute_budget_instructions(unit_limit, unit_price=0):
+    """
+    Build the ComputeBudget instructions that go in front of a transaction.
+
+    Args:
+        unit_limit (int): Compute unit limit
+        unit_price (int): Priority fee in micro-lamports per compute unit (omitted if 0)
+
+    Returns:
+        list: SetComputeUnitLimit and, if priced, SetComputeUnitPrice instructions
+    """
+    instructions = [set_compute_unit_limit(min(int(unit_limit), MAX_COMPUTE_UNIT_LIMIT))]
+    if unit_price > 0:
+        instructions.append(set_compute_unit_price(int(unit_price)))
+    return instructions
+
+
+def launch_path(instructions):
+    """Return the profile path of launch instructions (create alone, or create + ATA + buy)."""
+    return CREATE_BUY if len(instructions) > 1 else CREATE
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (0 for an empty list)."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class ComputeProfile:
+    """
+    Compute units consumed by each launch path, measured once by simulation.
+
+    The profile is persisted to a JSON file so later runs size their compute
+    unit limit without simulating again.
+    """
+    def __init__(self, path=DEFAULT_PROFILE_PATH, margin=DEFAULT_CU_MARGIN):
+        """
+        Initialize the profile.
+
+        Args:
+            path (str, optional): JSON file backing the profile (None keeps it in memory only)
+            margin (float): Fraction of headroom added to the simulated units
+        """
+        self.path = path
+        self.margin = margin
+        self._units = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._units = json.load(f)
+
+    def __contains__(self, path):
+        return path in self._units
+
+    def units(self, path):
+        """Return the simulated units of a launch path, or None."""
+        return self._units.get(path)
+
+    def record(self, path, units):
+        """Record the simulated units of a launch path and persist the profile."""
+        self._units[path] = int(units)
+        if self.path:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._units, f)
+            os.replace(tmp_path, self.path)
+
+    def limit(self, path):
+        """
+        Return the compute unit limit to request for a launch path.
+
+        Args:
+            path (str): CREATE or CREATE_BUY
+
+        Returns:
+            int: Simulated units plus margin, or the default when not profiled
+        """
+        units = self._units.get(path)
+        if units is None:
+            return DEFAULT_COMPUTE_UNITS[path]
+        return min(math.ceil(units * (1 + self.margin)), MAX_COMPUTE_UNIT_LIMIT)
+
+
+class PriorityFeeEstimator:
+    """
+    Estimate the priority fee from recent prioritization fees.
+
+    getRecentPrioritizationFees is sampled for the accounts a launch write-locks
+    (the Pump fee recipient once watched). Samples are merged by slot into a
+    rolling window and the percentiles are recomputed once per refresh, so
+    price() never waits on the network. A background thread keeps the window
+    current, the same way BlockhashProvider does for blockhashes.
+    """
+    def __init__(self, rpc_url, accounts=None, policy=DEFAULT_FEE_POLICY, cap=DEFAULT_FEE_CAP,
+                 floor=DEFAULT_FEE_FLOOR, window_slots=DEFAULT_WINDOW_SLOTS,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL, timeout=DEFAULT_TIMEOUT):
+        """
+        Initialize the estimator (call start() to begin background sampling).
+
+        Args:
+            rpc_url (str): RPC URL to sample
+            accounts (list, optional): Writable accounts (Pubkey or str) to sample fees for
+            policy (str): "p50", "p75", "p90" or "cap"
+            cap (int): Maximum price in micro-lamports per compute unit
+            floor (int): Minimum price in micro-lamports per compute unit
+            window_slots (int): Number of most recent slots kept in the window
+            refresh_interval (float): Seconds between background samples
+            timeout (float): Per-request timeout in seconds
+        """
+        if policy not in FEE_POLICIES:
+            raise ValueError(f"policy must be one of {FEE_POLICIES}")
+        self.rpc_url = rpc_url
+        self.accounts = [str(a) for a in accounts or []]
+        self.policy = policy
+        self.cap = cap
+        self.floor = floor
+        self.window_slots = window_slots
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.fetch_count = 0
+        self.last_error = None
+        self.session = requests.Session()
+        self.limiter = get_limiter(rpc_url)
+        self._samples = {}
+        self._percentiles = {"p50": 0, "p75": 0, "p90": 0}
+        self._updated_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, account):
+        """Add a writable account to the sampled set (no-op if already sampled)."""
+        account = str(account)
+        with self._lock:
+            if account in self.accounts:
+                return
+            self.accounts.append(account)
+
+    def sample(self):
+        """
+        Call getRecentPrioritizationFees once.
+
+        solana-py has no wrapper for this method, so the JSON-RPC request is
+        made directly.
+
+        Returns:
+            list: (slot, micro-lamports per compute unit) pairs
+        """
+        with self._lock:
+            accounts = list(self.accounts)
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getRecentPrioritizationFees",
+            "params": [accounts] if accounts else [],
+        }
+        tracing.count("rpc_calls", method="getRecentPrioritizationFees")
+        body = self.limiter.call(self._post, payload)
+        if "error" in body:
+            raise RuntimeError(body["error"].get("message", str(body["error"])))
+        self.fetch_count += 1
+        return [(item["slot"], item["prioritizationFee"]) for item in body["result"]]
+
+    def _post(self, payload):
+        response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def refresh(self):
+        """Sample recent fees, merge them into the window and recompute percentiles."""
+        samples = self.sample()
+        with self._lock:
+            self._samples.update(samples)
+            if self._samples:
+                newest = max(self._samples)
+                for slot in [s for s in self._samples if s <= newest - self.window_slots]:
+                    del self._samples[slot]
+            fees = sorted(self._samples.values())
+            self._percentiles = {
+                "p50": percentile(fees, 50),
+                "p75": percentile(fees, 75),
+                "p90": percentile(fees, 90),
+            }
+            self._updated_at = time.monotonic()
+        return dict(self._percentiles)
+
+    def percentiles(self):
+        """Return the cached p50/p75/p90 fees, sampling first if nothing was sampled yet."""
+        if self._updated_at is None:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+        return dict(self._percentiles)
+
+    def price(self, policy=None):
+        """
+        Return the priority fee to pay under a policy.
+
+        Args:
+            policy (str, optional): Overrides the estimator's policy
+
+        Returns:
+            int: Micro-lamports per compute unit, clamped to [floor, cap]
+        """
+        policy = policy or self.policy
+        if policy not in FEE_POLICIES:
+            raise ValueError(f"policy must be one of {FEE_POLICIES}")
+        if policy == "cap":
+            return self.cap
+        return min(max(self.percentiles()[policy], self.floor), self.cap)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Start the background sampling thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="priority-fees", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background sampling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + self.timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        """
+        Return estimator statistics.
+
+        Returns:
+            dict: Policy, current price, percentiles, window size, fetches, age and last error
+        """
+        age = None if self._updated_at is None else round(time.monotonic() - self._updated_at, 3)
+        return {
+            "policy": self.policy,
+            "price": self.price(),
+            "percentiles": dict(self._percentiles),
+            "slots": len(self._samples),
+            "fetches": self.fetch_count,
+            "age_s": age,
+            "last_error": self.last_error,
+        }
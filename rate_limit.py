@@ -0,0 +1,447 @@
+import asyncio
+import email.utils
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import tracing
+
+# Error classes; only the first four are retried
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+UNAVAILABLE = "unavailable"
+BLOCKHASH_NOT_FOUND = "blockhash_not_found"
+FATAL = "fatal"
+RETRYABLE = (THROTTLED, TIMEOUT, UNAVAILABLE, BLOCKHASH_NOT_FOUND)
+
+# (base, cap) in seconds of the exponential backoff of each error class; the
+# delay is drawn uniformly from [0, min(cap, base * 2 ** attempt)] ("full jitter")
+BACKOFF_SECONDS = {
+    THROTTLED: (0.5, 10.0),
+    TIMEOUT: (0.25, 5.0),
+    UNAVAILABLE: (0.2, 5.0),
+    # About one slot, so the next attempt sees a newer bank
+    BLOCKHASH_NOT_FOUND: (0.4, 2.0),
+}
+DEFAULT_MAX_RETRIES = 4
+
+# Starting points of the AIMD controller; it probes upwards from here
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_RATE = 500.0
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_CONCURRENCY = 64
+# Multiplicative decrease on throttling (and on timeouts, for concurrency)
+DECREASE_FACTOR = 0.5
+# At most one decrease per this many seconds, so one burst of 429s halves once
+DECREASE_COOLDOWN = 1.0
+# Longest pause a Retry-After header can impose
+MAX_RETRY_AFTER = 60.0
+
+# Pinata's pinning API allows about 180 requests a minute
+PINATA_RATE = 3.0
+PINATA_BURST = 5
+
+# Matched against error messages when no status code is attached (whole words, so
+# digits inside signatures or addresses do not match)
+_THROTTLE_PATTERN = re.compile(r"\b429\b|too many requests|rate[ -]?limit")
+_TIMEOUT_PATTERN = re.compile(r"timed out|timeout")
+_UNAVAILABLE_PATTERN = re.compile(r"\b50[234]\b|connection (refused|reset|aborted)|"
+                                  r"name or service not known|temporarily unavailable")
+
+
+def _exception_chain(exc):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def _status_and_headers(exc):
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    headers = getattr(exc, "headers", None)
+    if response is not None:
+        status = status or getattr(response, "status_code", None)
+        headers = headers or getattr(response, "headers", None)
+    return status, headers
+
+
+def classify_error(exc):
+    """
+    Classify an exception from an RPC or Pinata call.
+
+    The exception and its causes are inspected, so wrappers such as
+    SolanaRpcException (around an httpx error) or StorageError (with a status
+    code) classify like the underlying error.
+
+    Args:
+        exc (Exception): The error
+
+    Returns:
+        str: THROTTLED, TIMEOUT, UNAVAILABLE, BLOCKHASH_NOT_FOUND or FATAL
+    """
+    for error in _exception_chain(exc):
+        status, _ = _status_and_headers(error)
+        if status == 429:
+            return THROTTLED
+        if status in (502, 503, 504):
+            return UNAVAILABLE
+        name = type(error).__name__
+        if "Timeout" in name:
+            return TIMEOUT
+        if name in ("ConnectError", "ConnectionError", "RemoteProtocolError", "ReadError"):
+            return UNAVAILABLE
+    text = " ".join(str(error) for error in _exception_chain(exc)).lower()
+    if "blockhash not found" in text:
+        return BLOCKHASH_NOT_FOUND
+    if _THROTTLE_PATTERN.search(text):
+        return THROTTLED
+    if _TIMEOUT_PATTERN.search(text):
+        return TIMEOUT
+    if _UNAVAILABLE_PATTERN.search(text):
+        return UNAVAILABLE
+    return FATAL
+
+
+def retry_after(exc):
+    """
+    Return the Retry-After delay carried by an error, in seconds.
+
+    Args:
+        exc (Exception): The error (its causes are inspected too)
+
+    Returns:
+        float or None: Seconds to wait (capped at MAX_RETRY_AFTER), or None without the header
+    """
+    for error in _exception_chain(exc):
+        value = getattr(error, "retry_after", None)
+        if value is None:
+            _, headers = _status_and_headers(error)
+            value = headers.get("Retry-After") if headers is not None else None
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            # HTTP-date form
+            try:
+                seconds = email.utils.parsedate_to_datetime(str(value)).timestamp() - time.time()
+            except (TypeError, ValueError):
+                continue
+        return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+    return None
+
+
+def backoff_delay(kind, attempt, retry_after_s=None):
+    """
+    Return the delay before retry number `attempt` (0-based) after an error of class `kind`.
+
+    Args:
+        kind (str): Error class from classify_error()
+        attempt (int): Number of retries already made
+        retry_after_s (float, optional): Server-requested delay, used as a lower bound
+
+    Returns:
+        float: Seconds to sleep
+    """
+    base, cap = BACKOFF_SECONDS.get(kind, BACKOFF_SECONDS[UNAVAILABLE])
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after_s is not None:
+        delay = max(delay, retry_after_s)
+    return delay
+
+
+def endpoint_key(url):
+    """Return the limiter key of a URL (its scheme and host, so paths share a limiter)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+
+
+class AdaptiveLimiter:
+    """
+    Token-bucket rate limit plus an AIMD concurrency window for one endpoint.
+
+    A request needs a token (refilled at `rate` per second, up to `burst`)
+    and a free slot in the concurrency window. Successful responses raise both
+    additively, by about one request per second per second and one slot per
+    window's worth of responses. A 429 halves both (once per cooldown, so a
+    burst of 429s counts once) and honors Retry-After by pausing the
+    endpoint. A timeout halves only the window. The controller therefore
+    settles just under the rate where the endpoint starts throttling.
+    """
+    def __init__(self, name, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_rate=DEFAULT_MAX_RATE,
+                 min_rate=DEFAULT_MIN_RATE, concurrency=DEFAULT_CONCURRENCY,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, max_retries=DEFAULT_MAX_RETRIES):
+        """
+        Initialize the limiter.
+
+        Args:
+            name (str): Endpoint name used in stats and counters
+            rate (float): Initial requests per second
+            burst (int): Token bucket capacity
+            max_rate (float): Upper bound of the adaptive rate
+            min_rate (float): Lower bound of the adaptive rate
+            concurrency (int): Initial concurrency window
+            max_concurrency (int): Upper bound of the concurrency window
+            max_retries (int): Retries of retryable errors in call()
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.burst = burst
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.limit = float(concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.retries = 0
+        self.wait_s = 0.0
+        self.paused_until = 0.0
+        self.last_retry_after = None
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._cond = threading.Condition()
+
+    def _try_acquire(self):
+        # Returns 0 once a token and a slot are taken, else the seconds to wait before trying again
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= max(1, int(self.limit)):
+            return 0.05
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self.in_flight += 1
+        self.requests += 1
+        return 0
+
+    def acquire(self):
+        """Block until a request may be sent (call release() when it completes)."""
+        started = time.monotonic()
+        with self._cond:
+            wait = self._try_acquire()
+            while wait:
+                self._cond.wait(wait)
+                wait = self._try_acquire()
+            self.wait_s += time.monotonic() - started
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent."""
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+                if not wait:
+                    self.wait_s += time.monotonic() - started
+                    return
+            await asyncio.sleep(wait)
+
+    def release(self, kind=None, retry_after_s=None):
+        """
+        Return a slot and feed the request's outcome to the controller.
+
+        Args:
+            kind (str, optional): Error class of a failed request (None on success)
+            retry_after_s (float, optional): Retry-After of a throttled request
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if kind is None or kind in (FATAL, BLOCKHASH_NOT_FOUND):
+                # The endpoint answered: additive increase
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+            elif kind == THROTTLED:
+                self.throttled += 1
+                if retry_after_s:
+                    self.last_retry_after = retry_after_s
+                    self.paused_until = max(self.paused_until, now + retry_after_s)
+                if now - self._decreased_at >= DECREASE_COOLDOWN:
+                    self._decreased_at = now
+                    self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+                    self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+                    self._tokens = min(self._tokens, 1.0)
+            elif kind == TIMEOUT:
+                self.timeouts += 1
+                if now - self._decreased_at >= DECREASE_COOLDOWN:
+                    self._decreased_at = now
+                    self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+            else:
+                self.errors += 1
+            self._cond.notify_all()
+        if kind == THROTTLED:
+            tracing.count("throttled", endpoint=self.name)
+        elif kind == TIMEOUT:
+            tracing.count("timeouts", endpoint=self.name)
+
+    def _abandon(self):
+        # The request was cancelled or interrupted, which says nothing about the endpoint
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def paused(self):
+        """Return whether the endpoint is waiting out a Retry-After."""
+        return time.monotonic() < self.paused_until
+
+    def _outcome(self, exc):
+        kind = classify_error(exc)
+        seconds = retry_after(exc) if kind == THROTTLED else None
+        self.release(kind, seconds)
+        return kind, seconds
+
+    def _should_retry(self, kind, attempt, retries):
+        if kind not in RETRYABLE or kind == BLOCKHASH_NOT_FOUND or attempt >= retries:
+            return False
+        with self._cond:
+            self.retries += 1
+        tracing.count("retries", cause=kind)
+        return True
+
+    def call(self, fn, *args, retries=None, **kwargs):
+        """
+        Call `fn` within the limit, retrying throttling, timeouts and unavailability.
+
+        Args:
+            fn (callable): The request
+            retries (int, optional): Overrides the limiter's max_retries
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            The result of fn
+        """
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancellation, KeyboardInterrupt, solders panics: return the slot and stop
+                    self._abandon()
+                    raise
+                kind, seconds = self._outcome(e)
+                if not self._should_retry(kind, attempt, retries):
+                    raise
+                time.sleep(backoff_delay(kind, attempt, seconds))
+                attempt += 1
+                continue
+            self.release()
+            return result
+
+    async def call_async(self, fn, *args, retries=None, **kwargs):
+        """Await coroutine function `fn` within the limit. See call()."""
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancellation, KeyboardInterrupt, solders panics: return the slot and stop
+                    self._abandon()
+                    raise
+                kind, seconds = self._outcome(e)
+                if not self._should_retry(kind, attempt, retries):
+                    raise
+                await asyncio.sleep(backoff_delay(kind, attempt, seconds))
+                attempt += 1
+                continue
+            self.release()
+            return result
+
+    def stats(self):
+        """
+        Return throttle statistics.
+
+        Returns:
+            dict: Current rate and window, requests in flight, request, throttle, timeout,
+                error and retry counts, total seconds spent waiting and the last Retry-After
+        """
+        with self._cond:
+            return {
+                "endpoint": self.name,
+                "rate": round(self.rate, 2),
+                "concurrency": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "retries": self.retries,
+                "wait_s": round(self.wait_s, 3),
+                "paused_s": round(max(0.0, self.paused_until - time.monotonic()), 3),
+                "last_retry_after": self.last_retry_after,
+            }
+
+
+class RateLimitedClient:
+    """
+    Wrap a solana.rpc.api.Client so every call goes through an AdaptiveLimiter.
+
+    Exposes the same methods as the wrapped client.
+    """
+    def __init__(self, client, limiter):
+        """
+        Initialize the wrapper.
+
+        Args:
+            client (Client): Client to wrap
+            limiter (AdaptiveLimiter): Limiter of the client's endpoint
+        """
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        return lambda *args, **kwargs: self.limiter.call(attr, *args, **kwargs)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url, **options):
+    """
+    Return the process-wide limiter of an endpoint, creating it on first use.
+
+    Every client of the same host shares one limiter, so concurrent launches,
+    background refreshers and uploads stay within one budget per endpoint.
+
+    Args:
+        url (str): Endpoint URL
+        **options: AdaptiveLimiter options used when the limiter is created
+
+    Returns:
+        AdaptiveLimiter: The endpoint's limiter
+    """
+    key = endpoint_key(url)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveLimiter(key, **options)
+        return limiter
+
+
+def limiter_stats():
+    """Return the stats of every process-wide limiter."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from solana.rpc.api import Client
+
+from rate_limit import RETRYABLE, backoff_delay, classify_error, get_limiter, retry_after
+import tracing
+
+DEFAULT_BROADCAST_K = 2
+DEFAULT_PROBE_INTERVAL = 5.0
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_RETRIES = 2
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Smoothing factor of the latency / error-rate moving averages
+EWMA_ALPHA = 0.2
+# How much a 100% error rate multiplies an endpoint's score
+ERROR_PENALTY = 10.0
+
+
+def parse_rpc_urls(value):
+    """Split a comma-separated list of RPC URLs."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def _make_client(url, timeout):
+    client = Client(url, timeout=timeout)
+    # solana-py's synchronous HTTPProvider stores the timeout but never passes it to httpx
+    provider = client._provider
+    build = provider._build_common_request_kwargs
+    provider._build_common_request_kwargs = lambda: {**build(), "timeout": timeout}
+    return client
+
+
+class EndpointHealth:
+    """Observed latency and error rate of one RPC endpoint, and its rate limiter."""
+    def __init__(self, url, client):
+        self.url = url
+        self.client = client
+        self.limiter = get_limiter(url)
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def record(self, latency_s, ok, error=None):
+        """
+        Record the outcome of one request.
+
+        Args:
+            latency_s (float): Request latency in seconds
+            ok (bool): Whether the request succeeded
+            error (str, optional): Error message of a failed request
+        """
+        latency_ms = latency_s * 1000
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+                if self.latency_ms is None:
+                    self.latency_ms = latency_ms
+                else:
+                    self.latency_ms += EWMA_ALPHA * (latency_ms - self.latency_ms)
+            else:
+                self.errors += 1
+                self.last_error = error
+            self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def score(self):
+        """Lower is better. Endpoints without samples score 0 so they get tried."""
+        if self.latency_ms is None:
+            return 0.0 if self.errors == 0 else float("inf")
+        return self.latency_ms * (1.0 + ERROR_PENALTY * self.error_rate)
+
+    def histogram(self):
+        """Return the latency histogram as {upper bound in ms: count}."""
+        labels = [str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return dict(zip(labels, self.buckets))
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "score": round(self.score(), 2),
+            "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 2),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "histogram": self.histogram(),
+            "limiter": self.limiter.stats(),
+        }
+
+
+class RpcRouter:
+    """
+    Route RPC calls over several endpoints by observed health.
+
+    Reads go to the best-scoring endpoint (falling back to the next one on
+    error). send_raw_transaction is broadcast to the top K endpoints in
+    parallel and the first successful response wins. A background probe keeps
+    the scores current even when traffic is low. Every request passes through
+    its endpoint's AdaptiveLimiter; endpoints waiting out a Retry-After are
+    skipped while another one is available.
+
+    The router exposes the same methods as solana.rpc.api.Client, so it can be
+    used wherever a Client is expected.
+    """
+    def __init__(self, urls, broadcast_k=DEFAULT_BROADCAST_K, probe_interval=DEFAULT_PROBE_INTERVAL,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        """
+        Initialize the router.
+
+        Args:
+            urls (list): RPC endpoint URLs
+            broadcast_k (int): Number of endpoints transactions are sent to
+            probe_interval (float): Seconds between background health probes
+            timeout (float): Per-request timeout in seconds
+            max_retries (int): Rounds over the endpoints when every one fails with a
+                retryable error (throttled, timed out, unavailable)
+        """
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [EndpointHealth(url, _make_client(url, timeout)) for url in urls]
+        self.broadcast_k = max(1, min(broadcast_k, len(self.endpoints)))
+        self.probe_interval = probe_interval
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(self.endpoints) * 2),
+                                            thread_name_prefix="rpc-router")
+        self._stop = threading.Event()
+        self._probe_thread = None
+
+    @property
+    def rpc_url(self):
+        """URL of the currently best endpoint."""
+        return self.best().url
+
+    def ranked(self):
+        """Return endpoints sorted from best to worst score."""
+        return sorted(self.endpoints, key=lambda e: e.score())
+
+    def best(self):
+        """Return the best-scoring endpoint."""
+        return min(self.endpoints, key=lambda e: e.score())
+
+    def _call(self, endpoint, method, *args, retries=0, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = endpoint.limiter.call(getattr(endpoint.client, method), *args, retries=retries, **kwargs)
+        except BaseException as e:  # includes parser panics raised by solders
+            endpoint.record(time.perf_counter() - started, False, str(e))
+            raise
+        endpoint.record(time.perf_counter() - started, True)
+        return result
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a Client method on the best endpoint, failing over in score order.
+
+        When every endpoint fails with a retryable error, the round is
+        repeated after a jittered backoff (at least the longest Retry-After).
+
+        Args:
+            method (str): solana.rpc.api.Client method name
+
+        Returns:
+            The method's response
+        """
+        for attempt in range(self.max_retries + 1):
+            last_error = None
+            ranked = self.ranked()
+            # Endpoints waiting out a Retry-After go last
+            ranked = [e for e in ranked if not e.limiter.paused()] + [e for e in ranked if e.limiter.paused()]
+            for endpoint in ranked:
+                try:
+                    return self._call(endpoint, method, *args, **kwargs)
+                except Exception as e:
+                    # Transaction-level errors come back identically from every node
+                    if "Blockhash not found" in str(e):
+                        raise
+                    last_error = e
+            kind = classify_error(last_error)
+            if kind not in RETRYABLE or attempt == self.max_retries:
+                break
+            tracing.count("retries", cause=kind)
+            time.sleep(backoff_delay(kind, attempt, retry_after(last_error)))
+        raise last_error
+
+    def __getattr__(self, name):
+        if name.startswith("_") or not callable(getattr(Client, name, None)):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def send_raw_transaction(self, txn, opts=None):
+        """
+        Broadcast a serialized transaction to the top K endpoints in parallel.
+
+        Args:
+            txn (bytes): Serialized signed transaction
+            opts (TxOpts, optional): Send options
+
+        Returns:
+            SendTransactionResp: First successful response
+        """
+        targets = self.ranked()[:self.broadcast_k]
+        futures = [
+            self._executor.submit(self._call, endpoint, "send_raw_transaction", txn, opts,
+                                  retries=self.max_retries)
+            for endpoint in targets
+        ]
+        last_error = None
+        for future in as_completed(futures):
+            try:
+                return future.result()
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def probe(self):
+        """Probe every endpoint once with getSlot to refresh its score."""
+        futures = [self._executor.submit(self._call, e, "get_slot") for e in self.endpoints]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.probe_interval)
+
+    def start(self):
+        """Start background health probing."""
+        if self._probe_thread and self._probe_thread.is_alive():
+            return self
+        self._stop.clear()
+        self._probe_thread = threading.Thread(target=self._probe_loop, name="rpc-probe", daemon=True)
+        self._probe_thread.start()
+        return self
+
+    def stop(self):
+        """Stop background health probing."""
+        self._stop.set()
+        if self._probe_thread:
+            self._probe_thread.join(timeout=self.probe_interval + 5)
+            self._probe_thread = None
+
+    def close(self):
+        """Stop probing and release the worker pool."""
+        self.stop()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """
+        Return per-endpoint health.
+
+        Returns:
+            list: One dict per endpoint (score, latency, error rate, histogram), best first
+        """
+        return [endpoint.stats() for endpoint in self.ranked()]
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limit import PINATA_BURST, PINATA_RATE, get_limiter
+import tracing
+
+PINATA_API_URL = "https://api.pinata.cloud"
+PINATA_GATEWAY_URL = "https://gateway.pinata.cloud"
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_INDEX_PATH = ".ipfs_index.json"
+DEFAULT_TIMEOUT = 60
+
+# Leading bytes of the image formats accepted as token images
+_MAGIC_NUMBERS = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+# Bytes needed to tell the formats apart (RIFF....WEBP is the longest)
+SNIFF_BYTES = 16
+
+
+class StorageError(Exception):
+    """Raised when an upload fails."""
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def content_hash(data):
+    """sha256 hex digest used as the content-addressing key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sniff_content_type(data):
+    """
+    Detect the MIME type of file content from its magic number.
+
+    Args:
+        data (bytes): File content (the first SNIFF_BYTES are enough)
+
+    Returns:
+        str: MIME type, or None if the format is not recognized
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, content_type in _MAGIC_NUMBERS:
+        if data.startswith(magic):
+            return content_type
+    return None
+
+
+def file_content_type(path):
+    """Return the MIME type of a file from its content, else from its extension (None if unknown)."""
+    with open(path, "rb") as f:
+        content_type = sniff_content_type(f.read(SNIFF_BYTES))
+    return content_type or mimetypes.guess_type(path)[0]
+
+
+def canonical_json(obj):
+    """Serialize JSON deterministically so identical metadata hashes identically."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class CidIndex:
+    """
+    Persistent map from content hash to IPFS CID.
+
+    Lets repeated images and metadata resolve to their existing CID without
+    touching the network.
+    """
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        """
+        Initialize the index.
+
+        Args:
+            path (str, optional): JSON file backing the index (None keeps it in memory only)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def get(self, digest):
+        """Return the CID stored for a content hash, or None."""
+        return self._entries.get(digest)
+
+    def put(self, digest, cid):
+        """Record the CID of a content hash and persist the index."""
+        with self._lock:
+            self._entries[digest] = cid
+            if self.path:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class StorageClient(ABC):
+    """
+    Interface for content storage backends.
+
+    Subclasses implement _pin_bytes() and _pin_json() (a backend missing
+    either cannot be instantiated); this base class adds
+    content addressing (through a CidIndex) and concurrent uploads through a
+    bounded worker pool.
+    """
+    def __init__(self, index=None, max_workers=DEFAULT_MAX_WORKERS, gateway_url=PINATA_GATEWAY_URL):
+        """
+        Initialize the client.
+
+        Args:
+            index (CidIndex, optional): Content hash to CID index (in-memory if None)
+            max_workers (int): Maximum concurrent uploads
+            gateway_url (str): Gateway used to build returned URIs
+        """
+        self.index = index if index is not None else CidIndex(path=None)
+        self.gateway_url = gateway_url.rstrip("/")
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+        self.uploads = 0
+        self.index_hits = 0
+        # Requests that joined an identical upload already in progress
+        self.in_flight_hits = 0
+        self.bytes_uploaded = 0
+        self._stats_lock = threading.Lock()
+        # Uploads in progress, so concurrent requests for the same content share one upload
+        self._in_flight = {}
+
+    @abstractmethod
+    def _pin_bytes(self, data, filename, content_type):
+        """Upload raw bytes and return their CID."""
+
+    @abstractmethod
+    def _pin_json(self, payload):
+        """Upload a serialized JSON document and return its CID."""
+
+    def uri_for(self, cid):
+        """Return the gateway URI of a CID."""
+        return f"{self.gateway_url}/ipfs/{cid}"
+
+    def _resolve(self, digest, size, upload):
+        with self._stats_lock:
+            cid = self.index.get(digest)
+            pending = self._in_flight.get(digest)
+            is_owner = cid is None and pending is None
+            if is_owner:
+                pending = self._in_flight[digest] = Future()
+            elif cid is not None:
+                self.index_hits += 1
+            else:
+                self.in_flight_hits += 1
+        if cid is not None:
+            tracing.count("upload_index_hits")
+            return self.uri_for(cid)
+        if not is_owner:
+            tracing.count("upload_in_flight_hits")
+            return self.uri_for(pending.result())
+
+        try:
+            cid = upload()
+            self.index.put(digest, cid)
+        except Exception as e:
+            with self._stats_lock:
+                del self._in_flight[digest]
+            pending.set_exception(e)
+            raise
+        with self._stats_lock:
+            del self._in_flight[digest]
+            self.uploads += 1
+            self.bytes_uploaded += size
+        tracing.count("uploads")
+        tracing.count("bytes_uploaded", size)
+        pending.set_result(cid)
+        return self.uri_for(cid)
+
+    def upload_bytes(self, data, filename, content_type=None):
+        """
+        Upload raw bytes (skipped if identical content was uploaded before).
+
+        Args:
+            data (bytes): File content
+            filename (str): File name sent to the backend
+            content_type (str, optional): MIME type
+
+        Returns:
+            str: Gateway URI of the content
+        """
+        return self._resolve(
+            content_hash(data), len(data), lambda: self._pin_bytes(data, filename, content_type)
+        )
+
+    def upload_file(self, path, content_type=None):
+        """
+        Upload a local file. See upload_bytes().
+
+        The MIME type is sniffed from the content when not given; use
+        file_content_type() to record the same type (e.g. in token metadata).
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if content_type is None:
+            content_type = sniff_content_type(data) or mimetypes.guess_type(path)[0]
+        return self.upload_bytes(data, os.path.basename(path), content_type)
+
+    def upload_json(self, obj):
+        """
+        Upload a JSON document (skipped if identical content was uploaded before).
+
+        Args:
+            obj (dict): JSON-serializable document
+
+        Returns:
+            str: Gateway URI of the document
+        """
+        payload = canonical_json(obj)
+        return self._resolve(content_hash(payload), len(payload), lambda: self._pin_json(payload))
+
+    def submit_bytes(self, data, filename, content_type=None):
+        """Upload bytes in the worker pool. Returns a Future of the URI."""
+        return self._executor.submit(self.upload_bytes, data, filename, content_type)
+
+    def submit_file(self, path, content_type=None):
+        """Upload a file in the worker pool. Returns a Future of the URI."""
+        return self._executor.submit(self.upload_file, path, content_type)
+
+    def submit_json(self, obj):
+        """Upload a JSON document in the worker pool. Returns a Future of the URI."""
+        return self._executor.submit(self.upload_json, obj)
+
+    def stats(self):
+        """
+        Return upload statistics.
+
+        Returns:
+            dict: Network uploads, index hits, requests that joined an upload in progress,
+                bytes uploaded and indexed entries
+        """
+        return {
+            "uploads": self.uploads,
+            "index_hits": self.index_hits,
+            "in_flight_hits": self.in_flight_hits,
+            "bytes_uploaded": self.bytes_uploaded,
+            "indexed": len(self.index),
+        }
+
+    def close(self):
+        """Wait for pending uploads and release the worker pool."""
+        self._executor.shutdown(wait=True)
+
+
+class PinataStorage(StorageClient):
+    """
+    Pinata pinning API client with a pooled HTTP session.
+
+    `api_url` can point at a local stand-in server for tests and benchmarks.
+    Requests share the API host's AdaptiveLimiter, so 429s and timeouts are
+    retried with backoff and slow the upload rate instead of failing launches.
+    """
+    def __init__(self, api_key=None, secret_key=None, api_url=None, gateway_url=PINATA_GATEWAY_URL,
+                 index=None, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+        """
+        Initialize the client.
+
+        Args:
+            api_key (str, optional): Pinata API key (defaults to PINATA_API_KEY)
+            secret_key (str, optional): Pinata secret key (defaults to PINATA_SECRET_KEY)
+            api_url (str, optional): API base URL (defaults to PINATA_API_URL env or Pinata)
+            gateway_url (str): Gateway used to build returned URIs
+            index (CidIndex, optional): Content hash to CID index
+            max_workers (int): Maximum concurrent uploads (also sizes the connection pool)
+            timeout (float): Per-request timeout in seconds
+        """
+        super().__init__(index=index, max_workers=max_workers, gateway_url=gateway_url)
+        self.api_url = (api_url or os.getenv("PINATA_API_URL") or PINATA_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "pinata_api_key": api_key or os.getenv("PINATA_API_KEY") or "",
+            "pinata_secret_api_key": secret_key or os.getenv("PINATA_SECRET_KEY") or "",
+        })
+        self.limiter = get_limiter(self.api_url, rate=PINATA_RATE, burst=PINATA_BURST,
+                                   concurrency=max_workers, max_concurrency=max_workers)
+
+    def _post_once(self, path, **kwargs):
+        try:
+            response = self.session.post(f"{self.api_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise StorageError(str(e)) from e
+        if response.status_code != 200:
+            raise StorageError(response.text, response.status_code, response.headers.get("Retry-After"))
+        return response.json()["IpfsHash"]
+
+    def _post(self, path, **kwargs):
+        return self.limiter.call(self._post_once, path, **kwargs)
+
+    def _pin_bytes(self, data, filename, content_type):
+        file_field = (filename, data, content_type) if content_type else (filename, data)
+        return self._post("/pinning/pinFileToIPFS", files={"file": file_field})
+
+    def _pin_json(self, payload):
+        return self._post(
+            "/pinning/pinJSONToIPFS", data=payload, headers={"Content-Type": "application/json"}
+        )
+
+    def close(self):
+        super().close()
+        self.session.close()
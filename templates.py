@@ -0,0 +1,222 @@
+import struct
+import threading
+from solders.instruction import Instruction, AccountMeta
+from solders.pubkey import Pubkey
+
+from constants import (
+    PUMP_PROGRAM_ID,
+    TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM,
+    SYSTEM_PROGRAM,
+    MPL_TOKEN_METADATA,
+    RENT_SYSVAR,
+    EVENT_AUTHORITY,
+    CREATE_DISCRIMINATOR,
+    BUY_DISCRIMINATOR,
+)
+
+# PDAs that do not depend on the mint, derived once at import time
+GLOBAL = Pubkey.find_program_address([b"global"], PUMP_PROGRAM_ID)[0]
+MINT_AUTHORITY = Pubkey.find_program_address([b"mint-authority"], PUMP_PROGRAM_ID)[0]
+
+# Initial size of the create instruction data buffer:
+# discriminator + name (32) + symbol (10) + uri (200) with u32 length prefixes + creator
+CREATE_DATA_CAPACITY = 8 + 4 + 32 + 4 + 10 + 4 + 200 + 32
+
+_U32 = struct.Struct("<I")
+_BUY_ARGS = struct.Struct("<QQ")
+
+
+def _readonly(pubkey):
+    return AccountMeta(pubkey=pubkey, is_signer=False, is_writable=False)
+
+
+# Static account metas shared by every launch
+META_MINT_AUTHORITY = _readonly(MINT_AUTHORITY)
+META_GLOBAL = _readonly(GLOBAL)
+META_MPL_TOKEN_METADATA = _readonly(MPL_TOKEN_METADATA)
+META_SYSTEM_PROGRAM = _readonly(SYSTEM_PROGRAM)
+META_TOKEN_PROGRAM = _readonly(TOKEN_PROGRAM)
+META_ASSOCIATED_TOKEN_PROGRAM = _readonly(ASSOCIATED_TOKEN_PROGRAM)
+META_RENT_SYSVAR = _readonly(RENT_SYSVAR)
+META_EVENT_AUTHORITY = _readonly(EVENT_AUTHORITY)
+META_PUMP_PROGRAM = _readonly(PUMP_PROGRAM_ID)
+
+
+class LaunchTemplates:
+    """
+    Precompiled create / ATA / buy instruction templates for one payer.
+
+    Everything that does not depend on the mint (constant PDAs, program and
+    payer account metas) is computed once. Per launch only the mint-derived
+    accounts and the instruction arguments are filled in; instruction data is
+    laid out with struct.pack_into into per-thread preallocated buffers.
+    """
+    def __init__(self, payer):
+        """
+        Initialize the templates.
+
+        Args:
+            payer (Pubkey): Wallet paying for (and signing) the launches
+        """
+        self.payer = payer
+        self.meta_payer_signer = AccountMeta(pubkey=payer, is_signer=True, is_writable=True)
+        self.meta_payer_owner = _readonly(payer)
+        self._payer_bytes = bytes(payer)
+        self._local = threading.local()
+
+    def _buffers(self):
+        local = self._local
+        if not hasattr(local, "create"):
+            local.create = bytearray(CREATE_DATA_CAPACITY)
+            local.create[:8] = CREATE_DISCRIMINATOR
+            local.buy = bytearray(8 + _BUY_ARGS.size)
+            local.buy[:8] = BUY_DISCRIMINATOR
+        return local
+
+    def derive_addresses(self, mint):
+        """
+        Derive every mint-dependent address of a launch.
+
+        Args:
+            mint (Pubkey): Mint address
+
+        Returns:
+            dict: global, mint_authority, bonding_curve, metadata,
+                associated_bonding_curve and associated_user addresses
+        """
+        mint_bytes = bytes(mint)
+        bonding_curve = Pubkey.find_program_address([b"bonding-curve", mint_bytes], PUMP_PROGRAM_ID)[0]
+        metadata = Pubkey.find_program_address(
+            [b"metadata", bytes(MPL_TOKEN_METADATA), mint_bytes], MPL_TOKEN_METADATA
+        )[0]
+        token_program_bytes = bytes(TOKEN_PROGRAM)
+        associated_bonding_curve = Pubkey.find_program_address(
+            [bytes(bonding_curve), token_program_bytes, mint_bytes], ASSOCIATED_TOKEN_PROGRAM
+        )[0]
+        associated_user = Pubkey.find_program_address(
+            [self._payer_bytes, token_program_bytes, mint_bytes], ASSOCIATED_TOKEN_PROGRAM
+        )[0]
+        return {
+            "global": GLOBAL,
+            "mint_authority": MINT_AUTHORITY,
+            "bonding_curve": bonding_curve,
+            "metadata": metadata,
+            "associated_bonding_curve": associated_bonding_curve,
+            "associated_user": associated_user,
+        }
+
+    def shared_writable_accounts(self, fee_recipient=None):
+        """
+        Return the accounts every launch write-locks, whatever its mint.
+
+        The other writable accounts (mint, bonding curve, metadata and the
+        ATAs) are derived from a fresh mint and have no fee history; the
+        global account and the programs are only read-locked.
+
+        Args:
+            fee_recipient (Pubkey, optional): Fee recipient of the buy
+
+        Returns:
+            list: The payer and, when given, the fee recipient
+        """
+        return [self.payer] + ([fee_recipient] if fee_recipient is not None else [])
+
+    def create_data(self, name, symbol, uri, creator):
+        """
+        Encode the create instruction data.
+
+        Args:
+            name (str): Token name
+            symbol (str): Token symbol
+            uri (str): Metadata URI
+            creator (Pubkey): Creator's public key
+
+        Returns:
+            bytes: Instruction data
+        """
+        name_bytes = name.encode('utf-8')
+        symbol_bytes = symbol.encode('utf-8')
+        uri_bytes = uri.encode('utf-8')
+        size = 8 + 12 + len(name_bytes) + len(symbol_bytes) + len(uri_bytes) + 32
+
+        local = self._buffers()
+        buf = local.create
+        if size > len(buf):
+            buf = local.create = bytearray(size)
+            buf[:8] = CREATE_DISCRIMINATOR
+
+        offset = 8
+        for field in (name_bytes, symbol_bytes, uri_bytes):
+            _U32.pack_into(buf, offset, len(field))
+            offset += 4
+            buf[offset:offset + len(field)] = field
+            offset += len(field)
+        buf[offset:offset + 32] = bytes(creator)
+        return bytes(buf[:size])
+
+    def buy_data(self, amount, max_sol_cost):
+        """
+        Encode the buy instruction data.
+
+        Args:
+            amount (int): Token amount to buy (raw units)
+            max_sol_cost (int): Maximum lamports to spend
+
+        Returns:
+            bytes: Instruction data
+        """
+        buf = self._buffers().buy
+        _BUY_ARGS.pack_into(buf, 8, amount, max_sol_cost)
+        return bytes(buf)
+
+    def create_instruction(self, mint, addresses, name, symbol, uri, creator):
+        """Build the Pump create instruction from precomputed addresses."""
+        accounts = [
+            AccountMeta(pubkey=mint, is_signer=True, is_writable=True),
+            META_MINT_AUTHORITY,
+            AccountMeta(pubkey=addresses["bonding_curve"], is_signer=False, is_writable=True),
+            AccountMeta(pubkey=addresses["associated_bonding_curve"], is_signer=False, is_writable=True),
+            META_GLOBAL,
+            META_MPL_TOKEN_METADATA,
+            AccountMeta(pubkey=addresses["metadata"], is_signer=False, is_writable=True),
+            self.meta_payer_signer,
+            META_SYSTEM_PROGRAM,
+            META_TOKEN_PROGRAM,
+            META_ASSOCIATED_TOKEN_PROGRAM,
+            META_RENT_SYSVAR,
+            META_EVENT_AUTHORITY,
+            META_PUMP_PROGRAM,
+        ]
+        return Instruction(PUMP_PROGRAM_ID, self.create_data(name, symbol, uri, creator), accounts)
+
+    def ata_instruction(self, mint, addresses):
+        """Build the create-associated-token-account instruction for the payer."""
+        accounts = [
+            self.meta_payer_signer,  # Payer
+            AccountMeta(pubkey=addresses["associated_user"], is_signer=False, is_writable=True),  # ATA
+            self.meta_payer_owner,  # Owner
+            _readonly(mint),  # Mint
+            META_SYSTEM_PROGRAM,
+            META_TOKEN_PROGRAM,
+            META_RENT_SYSVAR,
+        ]
+        return Instruction(ASSOCIATED_TOKEN_PROGRAM, b"", accounts)
+
+    def buy_instruction(self, mint, addresses, fee_recipient, amount, max_sol_cost):
+        """Build the Pump buy instruction from precomputed addresses."""
+        accounts = [
+            META_GLOBAL,
+            AccountMeta(pubkey=fee_recipient, is_signer=False, is_writable=True),
+            _readonly(mint),
+            AccountMeta(pubkey=addresses["bonding_curve"], is_signer=False, is_writable=True),
+            AccountMeta(pubkey=addresses["associated_bonding_curve"], is_signer=False, is_writable=True),
+            AccountMeta(pubkey=addresses["associated_user"], is_signer=False, is_writable=True),
+            self.meta_payer_signer,
+            META_SYSTEM_PROGRAM,
+            META_TOKEN_PROGRAM,
+            META_RENT_SYSVAR,
+            META_EVENT_AUTHORITY,
+            META_PUMP_PROGRAM,
+        ]
+        return Instruction(PUMP_PROGRAM_ID, self.buy_data(amount, max_sol_cost), accounts)
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solders.keypair import Keypair  # noqa: E402
+
+from create import PumpTokenCreator  # noqa: E402
+from mock_server import MockPinataServer, MockRpcServer  # noqa: E402
+from priority_fees import ComputeProfile  # noqa: E402
+from storage import PinataStorage  # noqa: E402
+
+
+@pytest.fixture
+def rpc():
+    """A mock RPC node on free ports (HTTP and websocket) that confirms transactions quickly."""
+    server = MockRpcServer(port=0, confirm_delay=0.05, seed=1, websocket=True).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def pinata():
+    """A mock Pinata API on a free port."""
+    server = MockPinataServer(port=0, seed=1).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def storage(pinata):
+    """PinataStorage pointed at the mock Pinata API."""
+    client = PinataStorage("mock", "mock", api_url=pinata.url)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def make_creator(rpc):
+    """Build PumpTokenCreators against the mock RPC node, without touching .cu_profile.json."""
+    def make(**options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return PumpTokenCreator(private_key=str(Keypair()), rpc_url=rpc.url,
+                                    compute_profile=ComputeProfile(path=None), **options)
+    return make
+
+
+@pytest.fixture
+def image(tmp_path):
+    """A small PNG on disk."""
+    from PIL import Image
+
+    path = tmp_path / "token.png"
+    img = Image.new("RGB", (64, 64))
+    img.putdata([(x * 4, y * 4, (x + y) % 256) for y in range(64) for x in range(64)])
+    img.save(path)
+    return str(path)
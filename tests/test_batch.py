@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from solders.keypair import Keypair
+
+from batch import BatchLauncher
+from priority_fees import ComputeProfile
+
+
+def test_failed_warm_up_stops_background_services(rpc, storage, monkeypatch):
+    launcher = BatchLauncher(private_key=str(Keypair()), rpc_url=rpc.url, storage=storage,
+                             confirm_commitment="confirmed")
+    launcher.creator.compute_profile = ComputeProfile(path=None)
+
+    def fail():
+        raise RuntimeError("simulation failed")
+
+    monkeypatch.setattr(launcher.creator, "profile_compute_units", fail)
+
+    with pytest.raises(RuntimeError, match="simulation failed"):
+        asyncio.run(launcher.run([{"name": "Token", "symbol": "TK", "image": "https://example.com/a.png",
+                                   "dev_buy": 0}]))
+
+    assert launcher.blockhash_provider._thread is None
+    assert launcher.confirmation_tracker._thread is None
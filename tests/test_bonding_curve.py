@@ -0,0 +1,15 @@
+import numpy as np
+
+from bonding_curve import initial_curve, quote_buy, quote_buy_batch
+
+
+def test_batch_quotes_match_scalar_quotes():
+    sol_in = [10_000_000, 500_000_000, 2_000_000_000, 50_000_000_000]
+
+    batch = quote_buy_batch(np.array(sol_in, dtype=float))
+
+    for i, lamports in enumerate(sol_in):
+        quote = quote_buy(lamports, initial_curve())
+        assert batch["tokens_out"][i] == quote.tokens_out
+        assert batch["fee"][i] == quote.fee
+        assert batch["sol_cost"][i] == quote.sol_in
@@ -0,0 +1,9 @@
+import pytest
+
+from bench import check_builds
+
+
+@pytest.mark.parametrize("dev_buy_amount", [0.5, 0])
+def test_template_builds_match_reference_builder(dev_buy_amount):
+    # Raises AssertionError naming the first build that differs
+    check_builds(launches=12, dev_buy_amount=dev_buy_amount)
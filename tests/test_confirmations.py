@@ -0,0 +1,61 @@
+import asyncio
+
+from solders.keypair import Keypair
+
+from batch import BatchLauncher
+from confirmations import ConfirmationTracker
+from pipeline import launch_token
+from priority_fees import ComputeProfile
+
+
+def test_subscription_resolves_without_polling(rpc, storage, make_creator, image):
+    creator = make_creator(ws_url=rpc.ws_url)
+    # Polls once at start, then not again within the test
+    tracker = ConfirmationTracker(creator.client, poll_interval=60, ws_url=creator.ws_url).start()
+    creator.confirmation_tracker = tracker
+    try:
+        result = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage)
+        landed = result["confirmation"].result(timeout=10)
+    finally:
+        tracker.stop()
+
+    assert landed["signature"] == str(result["tx_signature"])
+    assert landed["confirmation_status"] == "confirmed"
+    requests = rpc.stats()["requests"]
+    assert requests["signatureSubscribe"] == 1
+    assert "getSignatureStatuses" not in requests
+
+
+def test_batch_launcher_subscribes_to_signatures(tmp_path, rpc, storage, image):
+    launcher = BatchLauncher(private_key=str(Keypair()), rpc_url=rpc.url, ws_url=rpc.ws_url, storage=storage,
+                             confirm_commitment="confirmed", subscribe_signatures=True)
+    launcher.creator.compute_profile = ComputeProfile(path=None)
+    entries = [{"name": f"Token {i}", "symbol": f"TK{i}", "image": image, "dev_buy": 0, "description": ""}
+               for i in range(3)]
+
+    results = asyncio.run(launcher.run(entries, str(tmp_path / "results.jsonl")))
+
+    assert [r["confirmation_status"] for r in results] == ["confirmed"] * 3
+    assert launcher.confirmation_tracker.ws_url == rpc.ws_url
+    assert rpc.stats()["requests"]["signatureSubscribe"] == 3
+
+
+def test_unreachable_websocket_falls_back_to_polling(rpc, storage, make_creator, image):
+    creator = make_creator(ws_url="ws://127.0.0.1:1")
+    tracker = ConfirmationTracker(creator.client, poll_interval=0.05, ws_url=creator.ws_url).start()
+    creator.confirmation_tracker = tracker
+    try:
+        result = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage)
+        landed = result["confirmation"].result(timeout=10)
+    finally:
+        tracker.stop()
+
+    assert landed["confirmation_status"] in ("confirmed", "finalized")
+    assert rpc.stats()["requests"]["getSignatureStatuses"] >= 1
+    assert "signatureSubscribe" not in rpc.stats()["requests"]
+
+
+def test_ws_url_defaults_to_the_rpc_url(rpc, make_creator):
+    creator = make_creator()
+
+    assert creator.ws_url == "ws://" + rpc.url[len("http://"):]
@@ -0,0 +1,76 @@
+import asyncio
+import io
+import json
+
+from PIL import Image
+from solders.keypair import Keypair
+
+from batch import BatchLauncher
+from images import preprocess_image
+from storage import StorageClient, file_content_type, sniff_content_type
+
+
+class RecordingStorage(StorageClient):
+    """Records what would have been pinned."""
+    def __init__(self):
+        super().__init__()
+        self.files = []
+        self.documents = []
+
+    def _pin_bytes(self, data, filename, content_type):
+        self.files.append((filename, content_type))
+        return f"file{len(self.files)}"
+
+    def _pin_json(self, payload):
+        self.documents.append(json.loads(payload))
+        return f"json{len(self.documents)}"
+
+
+def encoded(fmt, mode="RGB"):
+    out = io.BytesIO()
+    Image.new(mode, (8, 8)).save(out, fmt)
+    return out.getvalue()
+
+
+def test_content_type_is_sniffed_from_the_bytes():
+    assert sniff_content_type(encoded("PNG")) == "image/png"
+    assert sniff_content_type(encoded("JPEG")) == "image/jpeg"
+    assert sniff_content_type(encoded("GIF", "P")) == "image/gif"
+    assert sniff_content_type(encoded("WEBP")) == "image/webp"
+    assert sniff_content_type(b"not an image") is None
+
+
+def test_misnamed_file_keeps_its_real_type(tmp_path):
+    path = tmp_path / "logo.png"
+    path.write_bytes(encoded("JPEG"))
+
+    assert file_content_type(str(path)) == "image/jpeg"
+
+
+def test_unprocessed_batch_image_records_its_real_type(tmp_path):
+    path = tmp_path / "logo"
+    path.write_bytes(encoded("JPEG"))
+    storage = RecordingStorage()
+    launcher = BatchLauncher(private_key=str(Keypair()), rpc_url="http://127.0.0.1:1", storage=storage)
+    entry = {"name": "Token", "symbol": "TKN", "image": str(path)}
+
+    async def resolve():
+        image_uri, image_type = await launcher._resolve_image(entry)
+        await launcher._resolve_metadata_uri(entry, image_uri, image_type)
+
+    asyncio.run(resolve())
+    storage.close()
+
+    assert storage.files == [("logo", "image/jpeg")]
+    metadata, = storage.documents
+    assert metadata["properties"]["files"][0]["type"] == "image/jpeg"
+
+
+def test_palette_image_without_transparency_has_no_alpha():
+    img = Image.new("P", (16, 16))
+    img.putpalette([i % 256 for i in range(768)])
+    for transparency, mode in ((None, "RGB"), (0, "RGBA")):
+        out = io.BytesIO()
+        img.save(out, "PNG", **({} if transparency is None else {"transparency": transparency}))
+        processed = preprocess_image(out.getvalue(), target_format="PNG")
+        assert Image.open(io.BytesIO(processed.data)).mode == mode
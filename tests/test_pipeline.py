@@ -0,0 +1,71 @@
+from bonding_curve import BONDING_CURVE_DISCRIMINATOR, initial_curve
+from curve_monitor import decode_curves
+from pipeline import launch_token
+
+
+def test_launch_token_sends_one_transaction(rpc, pinata, storage, make_creator, image):
+    creator = make_creator()
+
+    result = launch_token(creator, "Test Token", "TEST", image, 0.5, storage=storage, description="test")
+
+    assert result["success"], result.get("error")
+    assert list(rpc.signatures) == [str(result["tx_signature"])]
+    assert rpc.stats()["requests"]["sendTransaction"] == 1
+    # The image and the metadata were each pinned once
+    assert pinata.stats()["requests"] == {"pinFileToIPFS": 1, "pinJSONToIPFS": 1}
+    assert result["metadata_uri"].startswith(storage.gateway_url)
+    stages = {stage["name"] for stage in result["pipeline"]["stages"]}
+    assert {"upload_image", "upload_metadata", "global_state", "build_instructions", "submit"} <= stages
+
+
+def test_launch_token_creates_bonding_curve_with_dev_buy(rpc, storage, make_creator, image):
+    creator = make_creator()
+
+    result = launch_token(creator, "Test Token", "TEST", image, 0.5, storage=storage)
+
+    data = rpc.accounts[result["bonding_curve"]]
+    assert data[:8] == BONDING_CURVE_DISCRIMINATOR
+    curve = decode_curves([data])[0]
+    start = initial_curve()
+    assert curve["exists"]
+    assert result["dev_buy_tokens"] > 0
+    assert curve["real_token_reserves"] == start.real_token_reserves - result["dev_buy_tokens"]
+    assert curve["virtual_token_reserves"] == start.virtual_token_reserves - result["dev_buy_tokens"]
+    assert 0 < curve["real_sol_reserves"] < 0.5 * 1_000_000_000
+    assert not curve["complete"]
+
+
+def test_launch_token_confirms_through_tracker(rpc, storage, make_creator, image):
+    from confirmations import ConfirmationTracker
+
+    creator = make_creator()
+    creator.confirmation_tracker = ConfirmationTracker(creator.client, poll_interval=0.05).start()
+    try:
+        result = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage)
+        landed = result["confirmation"].result(timeout=10)
+    finally:
+        creator.confirmation_tracker.stop()
+
+    assert landed["confirmation_status"] in ("confirmed", "finalized")
+    assert landed["signature"] == str(result["tx_signature"])
+
+
+def test_image_url_is_not_uploaded(pinata, storage, make_creator):
+    creator = make_creator()
+
+    result = launch_token(creator, "Test Token", "TEST", "https://example.com/token.png", 0, storage=storage)
+
+    assert result["success"], result.get("error")
+    assert pinata.stats()["requests"] == {"pinJSONToIPFS": 1}
+
+
+def test_relaunching_the_same_image_reuses_its_cid(pinata, storage, make_creator, image):
+    creator = make_creator()
+
+    first = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage)
+    second = launch_token(creator, "Other Token", "OTHER", image, 0, storage=storage)
+
+    assert first["success"] and second["success"]
+    assert pinata.stats()["requests"]["pinFileToIPFS"] == 1
+    assert pinata.stats()["requests"]["pinJSONToIPFS"] == 2
+    assert storage.stats()["index_hits"] == 1
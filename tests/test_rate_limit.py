@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limit import AdaptiveLimiter, RateLimitedClient
+
+
+def make_limiter(**options):
+    options.setdefault("rate", 1000)
+    options.setdefault("burst", 1000)
+    return AdaptiveLimiter("test", **options)
+
+
+def test_success_returns_the_slot():
+    limiter = make_limiter()
+
+    assert limiter.call(lambda: 42) == 42
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["requests"] == 1
+    assert stats["errors"] == 0
+
+
+def test_fatal_error_returns_the_slot_without_retrying():
+    limiter = make_limiter()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("invalid params")
+
+    with pytest.raises(ValueError):
+        limiter.call(fail)
+
+    assert len(calls) == 1
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_unavailable_error_is_retried():
+    limiter = make_limiter()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("503 Service Unavailable")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+
+    stats = limiter.stats()
+    assert len(calls) == 3
+    assert stats["retries"] == 2
+    assert stats["errors"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_retries_give_up_after_max_retries():
+    limiter = make_limiter(max_retries=1)
+
+    def unavailable():
+        raise ConnectionError("502 Bad Gateway")
+
+    with pytest.raises(ConnectionError):
+        limiter.call(unavailable)
+
+    assert limiter.stats()["requests"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_throttling_halves_the_window_and_honors_retry_after():
+    limiter = make_limiter(concurrency=8)
+
+    limiter.acquire()
+    limiter.release("throttled", retry_after_s=0.2)
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["throttled"] == 1
+    assert stats["concurrency"] == 4
+    assert limiter.paused()
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+    limiter.release()
+
+
+def test_interrupt_returns_the_slot_without_counting_an_error():
+    limiter = make_limiter()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(interrupted)
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["errors"] == 0
+    assert stats["retries"] == 0
+
+
+def test_cancelled_async_call_returns_the_slot():
+    limiter = make_limiter(concurrency=1)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(limiter.call_async(slow))
+        await started.wait()
+        assert limiter.stats()["in_flight"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The only slot is free again
+        return await asyncio.wait_for(limiter.call_async(asyncio.sleep, 0, result="next"), timeout=1)
+
+    assert asyncio.run(scenario()) == "next"
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["errors"] == 0
+
+
+def test_concurrency_window_bounds_requests_in_flight():
+    limiter = make_limiter(concurrency=2, max_concurrency=2)
+    lock = threading.Lock()
+    current = peak = 0
+
+    def request():
+        nonlocal current, peak
+        with lock:
+            current += 1
+            peak = max(peak, current)
+        time.sleep(0.02)
+        with lock:
+            current -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(request,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert limiter.stats()["requests"] == 8
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_rate_limited_client_routes_calls_through_the_limiter():
+    class Client:
+        endpoint = "http://localhost"
+
+        def get_slot(self):
+            return 7
+
+    limiter = make_limiter()
+    client = RateLimitedClient(Client(), limiter)
+
+    assert client.get_slot() == 7
+    assert client.endpoint == "http://localhost"
+    assert limiter.stats()["requests"] == 1
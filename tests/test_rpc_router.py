@@ -0,0 +1,118 @@
+import time
+
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.system_program import TransferParams, transfer
+from solders.transaction import Transaction
+
+from mock_server import MockRpcServer
+from rpc_router import RpcRouter
+
+
+@pytest.fixture
+def servers():
+    """Three mock RPC nodes; tests adjust their latency and error rates."""
+    started = [MockRpcServer(port=0, seed=i).start() for i in range(3)]
+    yield started
+    for server in started:
+        server.stop()
+
+
+@pytest.fixture
+def make_router():
+    routers = []
+
+    def make(urls, **options):
+        router = RpcRouter(urls, max_retries=0, **options)
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        router.close()
+
+
+def slot_calls(server):
+    return server.stats()["requests"].get("getSlot", 0)
+
+
+def signed_transfer():
+    payer = Keypair()
+    ix = transfer(TransferParams(from_pubkey=payer.pubkey(), to_pubkey=Keypair().pubkey(), lamports=1))
+    return Transaction.new_signed_with_payer([ix], payer.pubkey(), [payer], Hash.default())
+
+
+def test_read_fails_over_from_erroring_endpoint(servers, make_router):
+    failing, healthy = servers[:2]
+    failing.error_rate = 1.0
+    router = make_router([failing.url, healthy.url])
+
+    assert router.get_slot().value > 0
+
+    assert failing.stats()["injected"]["unavailable"] == 1
+    assert slot_calls(healthy) == 1
+    assert router.best().url == healthy.url
+
+
+def test_read_fails_over_from_timed_out_endpoint(servers, make_router):
+    slow, healthy = servers[:2]
+    slow.latency = 2.0
+    router = make_router([slow.url, healthy.url], timeout=0.3)
+
+    started = time.perf_counter()
+    assert router.get_slot().value > 0
+
+    assert time.perf_counter() - started < 2.0
+    assert slot_calls(healthy) == 1
+    assert router.best().url == healthy.url
+
+
+def test_scores_move_reads_to_faster_endpoint(servers, make_router):
+    first, second = servers[:2]
+    router = make_router([first.url, second.url])
+    router.probe()
+    best = next(s for s in (first, second) if s.url == router.best().url)
+    other = second if best is first else first
+
+    # The best endpoint turns slow; its moving average catches up within a few probes
+    best.latency = 0.1
+    for _ in range(3):
+        router.probe()
+    before = slot_calls(best)
+    for _ in range(10):
+        router.get_slot()
+
+    assert router.best().url == other.url
+    assert slot_calls(best) == before
+    endpoint = next(e for e in router.endpoints if e.url == best.url)
+    assert endpoint.latency_ms > 50
+
+
+def test_errors_raise_the_score(servers, make_router):
+    flaky, healthy = servers[:2]
+    router = make_router([flaky.url, healthy.url])
+    router.probe()
+    flaky.error_rate = 1.0
+    router.probe()
+
+    ranked = router.stats()
+    assert [e["url"] for e in ranked] == [healthy.url, flaky.url]
+    assert ranked[1]["error_rate"] > 0
+
+
+def test_send_is_broadcast_to_top_k(servers, make_router):
+    servers[2].latency = 0.05
+    router = make_router([s.url for s in servers], broadcast_k=2)
+    router.probe()
+    tx = signed_transfer()
+
+    signature = router.send_raw_transaction(bytes(tx)).value
+
+    assert signature == tx.signatures[0]
+    # The first response wins; the other send may still be in flight
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not all(str(signature) in s.signatures for s in servers[:2]):
+        time.sleep(0.01)
+    assert all(str(signature) in s.signatures for s in servers[:2])
+    assert str(signature) not in servers[2].signatures
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from storage import CidIndex, StorageClient, content_hash
+
+
+class FakeStorage(StorageClient):
+    """Counts pins; pins block until `release` is set."""
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.pins = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def _pin(self, data):
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("pin failed")
+        self.pins.append(data)
+        return "cid-" + content_hash(data)[:16]
+
+    def _pin_bytes(self, data, filename, content_type):
+        return self._pin(data)
+
+    def _pin_json(self, payload):
+        return self._pin(payload)
+
+
+@pytest.fixture
+def fake_storage():
+    client = FakeStorage()
+    yield client
+    client.close()
+
+
+def test_identical_content_is_uploaded_once(fake_storage):
+    first = fake_storage.upload_bytes(b"image", "a.png", "image/png")
+    second = fake_storage.upload_bytes(b"image", "b.png", "image/png")
+
+    assert first == second
+    assert len(fake_storage.pins) == 1
+    stats = fake_storage.stats()
+    assert stats["uploads"] == 1
+    assert stats["index_hits"] == 1
+    assert stats["in_flight_hits"] == 0
+    assert stats["bytes_uploaded"] == len(b"image")
+
+
+def test_json_is_deduplicated_regardless_of_key_order(fake_storage):
+    first = fake_storage.upload_json({"name": "Token", "symbol": "TKN"})
+    second = fake_storage.upload_json({"symbol": "TKN", "name": "Token"})
+
+    assert first == second
+    assert len(fake_storage.pins) == 1
+
+
+def test_concurrent_identical_uploads_share_one_pin(fake_storage):
+    fake_storage.release.clear()
+    futures = [fake_storage.submit_bytes(b"image", "a.png") for _ in range(4)]
+    # Wait until the other three joined the first upload
+    for _ in range(500):
+        if fake_storage.stats()["in_flight_hits"] == 3:
+            break
+        threading.Event().wait(0.01)
+    fake_storage.release.set()
+
+    uris = {future.result(timeout=5) for future in futures}
+
+    assert len(uris) == 1
+    assert len(fake_storage.pins) == 1
+    stats = fake_storage.stats()
+    assert stats["uploads"] == 1
+    assert stats["in_flight_hits"] == 3
+    assert stats["index_hits"] == 0
+
+
+def test_failed_upload_is_not_indexed(fake_storage):
+    fake_storage.fail = True
+    with pytest.raises(RuntimeError):
+        fake_storage.upload_bytes(b"image", "a.png")
+
+    fake_storage.fail = False
+    uri = fake_storage.upload_bytes(b"image", "a.png")
+
+    assert uri == fake_storage.uri_for("cid-" + content_hash(b"image")[:16])
+    assert fake_storage.stats()["uploads"] == 1
+    assert fake_storage.stats()["index_hits"] == 0
+
+
+def test_index_persists_between_clients(tmp_path):
+    path = str(tmp_path / "index.json")
+    first = FakeStorage(index=CidIndex(path))
+    uri = first.upload_bytes(b"image", "a.png")
+    first.close()
+
+    second = FakeStorage(index=CidIndex(path))
+    assert second.upload_bytes(b"image", "a.png") == uri
+    assert second.pins == []
+    assert second.stats()["index_hits"] == 1
+    second.close()
+
+
+def test_backend_must_implement_both_pins():
+    class BytesOnly(StorageClient):
+        def _pin_bytes(self, data, filename, content_type):
+            return "cid"
+
+    with pytest.raises(TypeError):
+        BytesOnly()
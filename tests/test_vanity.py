@@ -0,0 +1,87 @@
+from solders.keypair import Keypair
+
+from pipeline import launch_token
+from vanity import KeyPool
+
+
+def test_failed_send_puts_vanity_key_back(tmp_path, rpc, storage, make_creator, image):
+    pool = KeyPool(str(tmp_path / "keys.pool"), passphrase="test")
+    mint = Keypair()
+    pool.add([mint])
+    creator = make_creator(key_pool=pool)
+    # Every send is rejected with "Blockhash not found"
+    rpc.blockhash_error_rate = 1.0
+
+    result = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage, max_retries=1)
+
+    assert not result["success"]
+    assert "Blockhash not found" in result["error"]
+    assert not rpc.signatures
+    assert pool.addresses() == [str(mint.pubkey())]
+
+
+def test_sent_launch_uses_up_vanity_key(tmp_path, storage, make_creator, image):
+    pool = KeyPool(str(tmp_path / "keys.pool"), passphrase="test")
+    mint = Keypair()
+    pool.add([mint])
+    creator = make_creator(key_pool=pool)
+
+    result = launch_token(creator, "Test Token", "TEST", image, 0, storage=storage)
+
+    assert result["success"], result.get("error")
+    assert result["mint"] == str(mint.pubkey())
+    assert len(KeyPool(str(tmp_path / "keys.pool"), passphrase="test")) == 0
+
+
+def _pop_addresses(path, count, results):
+    pool = KeyPool(path, passphrase="test")
+    results.put([str(pool.pop().pubkey()) for _ in range(count)])
+
+
+def test_processes_never_pop_the_same_key(tmp_path):
+    import multiprocessing
+
+    path = str(tmp_path / "keys.pool")
+    KeyPool(path, passphrase="test").add([Keypair() for _ in range(8)])
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_pop_addresses, args=(path, 2, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    popped = [address for _ in workers for address in results.get(timeout=30)]
+    for worker in workers:
+        worker.join()
+
+    assert len(set(popped)) == 8
+
+
+def test_pools_on_one_file_share_adds_and_removals(tmp_path):
+    path = str(tmp_path / "keys.pool")
+    grinder = KeyPool(path, passphrase="test")
+    launcher = KeyPool(path, passphrase="test")
+    first, second = Keypair(), Keypair()
+    grinder.add([first])
+
+    used = launcher.pop()
+    grinder.add([second])
+    launcher.mark_used(used)
+
+    assert used == first
+    assert grinder.addresses() == [str(second.pubkey())]
+    # The other instance sees the reservation and does not hand out a reserved key
+    other = launcher.pop()
+    assert other == second and grinder.pop() is None
+
+
+def test_reservation_of_exited_process_is_reclaimed(tmp_path):
+    import multiprocessing
+
+    path = str(tmp_path / "keys.pool")
+    mint = Keypair()
+    KeyPool(path, passphrase="test").add([mint])
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_pop_addresses, args=(path, 1, results))
+    worker.start()
+    assert results.get(timeout=30) == [str(mint.pubkey())]
+    worker.join()
+
+    assert KeyPool(path, passphrase="test").pop() == mint
@@ -0,0 +1,357 @@
+import bisect
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+
+# Upper bounds (s) of the span duration histogram buckets; the last bucket is +Inf
+DURATION_BUCKETS_S = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+METRIC_PREFIX = "pump"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+
+
+def _counter_key(name, labels):
+    return name if not labels else name + "".join(f":{v}" for _, v in sorted(labels.items()))
+
+
+class _NullSpan:
+    """Span handed out while tracing is disabled; every method is a no-op."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    One timed phase of a launch.
+
+    Spans nest through a context variable, so children opened in the same
+    thread or asyncio task get the enclosing span as parent. Counters
+    incremented while a span is open are attached to it and rolled up into
+    its parent when it closes.
+    """
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent", "trace_id", "counters",
+                 "started_at", "_started", "_token")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_ids)
+        self.parent = None
+        self.trace_id = self.span_id
+        self.counters = {}
+        self.started_at = None
+        self._started = None
+        self._token = None
+
+    def set(self, **attrs):
+        """Attach attributes to the span (e.g. a signature known only at the end)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        if self.parent is not None:
+            self.trace_id = self.parent.trace_id
+        self._token = _current_span.set(self)
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        _current_span.reset(self._token)
+        if self.parent is not None:
+            for key, value in self.counters.items():
+                self.parent.counters[key] = self.parent.counters.get(key, 0) + value
+        self.tracer._finish({
+            "type": "span",
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "start": round(self.started_at, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": "ok" if exc_type is None else "error",
+            "error": None if exc is None else str(exc),
+            "attrs": self.attrs,
+            "counters": self.counters,
+        })
+        return False
+
+
+class Tracer:
+    """
+    Collect spans and counters and hand them to sinks.
+
+    With no sinks the tracer is disabled: span() returns a shared no-op span
+    and count() returns immediately, so instrumented code pays one attribute
+    check per call.
+    """
+    def __init__(self, sinks=None):
+        """
+        Initialize the tracer.
+
+        Args:
+            sinks (list, optional): Sinks receiving finished spans and counters
+        """
+        self.sinks = list(sinks or [])
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.sinks)
+
+    def span(self, name, **attrs):
+        """
+        Open a span (use as a context manager).
+
+        Args:
+            name (str): Phase name (e.g. "send")
+            **attrs: Attributes recorded with the span
+
+        Returns:
+            Span: The span, or a no-op span while tracing is disabled
+        """
+        if not self.sinks:
+            return _NULL_SPAN
+        return Span(self, name, attrs)
+
+    def count(self, name, value=1, **labels):
+        """
+        Increment a counter, globally and on the current span.
+
+        Args:
+            name (str): Counter name (e.g. "rpc_calls")
+            value (int): Increment
+            **labels: Counter labels (e.g. method="sendTransaction")
+        """
+        if not self.sinks:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        current = _current_span.get()
+        if current is not None:
+            span_key = _counter_key(name, labels)
+            current.counters[span_key] = current.counters.get(span_key, 0) + value
+
+    def _finish(self, record):
+        for sink in self.sinks:
+            sink.on_span(record)
+
+    def counter_snapshot(self):
+        """Return the global counters as a list of (name, labels dict, value)."""
+        with self._lock:
+            return [(name, dict(labels), value) for (name, labels), value in self.counters.items()]
+
+    def flush(self):
+        """Hand the current counters to every sink."""
+        counters = self.counter_snapshot()
+        for sink in self.sinks:
+            sink.flush(counters)
+
+    def close(self):
+        """Flush and close every sink."""
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+
+class Sink:
+    """
+    Interface for span and counter sinks.
+
+    on_span() is called once per finished span with its record; flush() is
+    called with the global counters when the tracer is flushed or closed.
+    """
+    def on_span(self, record):
+        pass
+
+    def flush(self, counters):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink(Sink):
+    """Write one JSON object per finished span, and a counters record on flush."""
+    def __init__(self, path):
+        """
+        Initialize the sink.
+
+        Args:
+            path (str): JSONL file the records are appended to
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def on_span(self, record):
+        self._write(record)
+
+    def flush(self, counters):
+        self._write({
+            "type": "counters",
+            "time": round(time.time(), 6),
+            "counters": [{"name": name, "labels": labels, "value": value} for name, labels, value in counters],
+        })
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusSink(Sink):
+    """
+    Aggregate spans into per-phase duration histograms and expose them, with
+    the counters, in the Prometheus text format.
+
+    The exposition is written to `path` on every flush (atomically, so a
+    node_exporter textfile collector can pick it up) and is available from
+    render() at any time.
+    """
+    def __init__(self, path=None, prefix=METRIC_PREFIX):
+        """
+        Initialize the sink.
+
+        Args:
+            path (str, optional): File the exposition is written to on flush
+            prefix (str): Metric name prefix
+        """
+        self.path = path
+        self.prefix = prefix
+        self._histograms = {}
+        self._errors = {}
+        self._counters = []
+        self._lock = threading.Lock()
+
+    def on_span(self, record):
+        seconds = record["duration_ms"] / 1000
+        with self._lock:
+            histogram = self._histograms.get(record["name"])
+            if histogram is None:
+                histogram = self._histograms[record["name"]] = {
+                    "buckets": [0] * (len(DURATION_BUCKETS_S) + 1), "count": 0, "sum": 0.0,
+                }
+            histogram["buckets"][bisect.bisect_left(DURATION_BUCKETS_S, seconds)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            if record["status"] == "error":
+                self._errors[record["name"]] = self._errors.get(record["name"], 0) + 1
+
+    def render(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        name = f"{self.prefix}_span_duration_seconds"
+        lines = [f"# HELP {name} Duration of launch phases.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for span_name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                bounds = [str(b) for b in DURATION_BUCKETS_S] + ["+Inf"]
+                for bound, bucket in zip(bounds, histogram["buckets"]):
+                    cumulative += bucket
+                    lines.append(f'{name}_bucket{{span="{span_name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{span="{span_name}"}} {histogram["sum"]:.6f}')
+                lines.append(f'{name}_count{{span="{span_name}"}} {histogram["count"]}')
+            errors = dict(self._errors)
+            counters = list(self._counters)
+
+        name = f"{self.prefix}_span_errors_total"
+        lines += [f"# HELP {name} Launch phases that raised.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{span="{span_name}"}} {count}' for span_name, count in sorted(errors.items())]
+
+        by_name = {}
+        for counter_name, labels, value in counters:
+            by_name.setdefault(counter_name, []).append((labels, value))
+        for counter_name, samples in sorted(by_name.items()):
+            name = f"{self.prefix}_{counter_name}_total"
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self, counters):
+        with self._lock:
+            self._counters = counters
+        if self.path:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+
+
+# Process-wide tracer used by the instrumented modules; disabled until configured
+_tracer = Tracer()
+
+
+def get_tracer():
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def configure(*sinks):
+    """
+    Enable tracing with the given sinks (no sinks disables it).
+
+    Returns:
+        Tracer: The process-wide tracer
+    """
+    _tracer.sinks = list(sinks)
+    return _tracer
+
+
+def configure_from_env():
+    """
+    Enable tracing from TRACE_FILE (JSON lines) and METRICS_FILE (Prometheus text).
+
+    Returns:
+        Tracer: The process-wide tracer (disabled if neither variable is set)
+    """
+    sinks = []
+    if os.getenv("TRACE_FILE"):
+        sinks.append(JsonLinesSink(os.getenv("TRACE_FILE")))
+    if os.getenv("METRICS_FILE"):
+        sinks.append(PrometheusSink(os.getenv("METRICS_FILE")))
+    return configure(*sinks)
+
+
+def span(name, **attrs):
+    """Open a span on the process-wide tracer. See Tracer.span()."""
+    if not _tracer.sinks:
+        return _NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def count(name, value=1, **labels):
+    """Increment a counter on the process-wide tracer. See Tracer.count()."""
+    if _tracer.sinks:
+        _tracer.count(name, value, **labels)
@@ -0,0 +1,390 @@
+import argparse
+import base64
+import contextlib
+import getpass
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from solders.keypair import Keypair
+
+try:
+    import fcntl
+except ImportError:  # Windows: the pool is then only safe within one process
+    fcntl = None
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+DEFAULT_POOL_PATH = "mint_keys.pool"
+# Seconds a popped key stays reserved if its launch never reports back
+DEFAULT_RESERVATION_TTL = 3600.0
+# Keypairs generated between two progress reports / stop checks in a worker
+WORKER_BATCH = 2_000
+
+
+def validate_pattern(pattern, case_sensitive=True):
+    """
+    Check that a vanity pattern can appear in a base58 address.
+
+    Args:
+        pattern (str): Prefix or suffix to look for
+        case_sensitive (bool): Whether the match is case-sensitive
+
+    Raises:
+        ValueError: If the pattern contains characters that never appear in base58
+    """
+    for char in pattern:
+        if char in BASE58_ALPHABET:
+            continue
+        if not case_sensitive and char.swapcase() in BASE58_ALPHABET:
+            continue
+        raise ValueError(f"'{char}' never appears in a base58 address (excluded: 0, O, I, l)")
+
+
+def expected_attempts(prefix="", suffix="", case_sensitive=True):
+    """Rough number of keypairs to try per match for the given pattern."""
+    attempts = 1
+    for char in prefix + suffix:
+        if case_sensitive or char.swapcase() not in BASE58_ALPHABET or char.isdigit():
+            attempts *= 58
+        else:
+            attempts *= 29  # both cases of the letter match
+    return attempts
+
+
+def _grind_worker(worker_id, prefix, suffix, case_sensitive, stop_event, found_queue, progress_queue):
+    if not case_sensitive:
+        prefix, suffix = prefix.lower(), suffix.lower()
+    started = time.perf_counter()
+    total = 0
+    while not stop_event.is_set():
+        for _ in range(WORKER_BATCH):
+            keypair = Keypair()
+            address = str(keypair.pubkey())
+            if not case_sensitive:
+                address = address.lower()
+            if address.startswith(prefix) and address.endswith(suffix):
+                found_queue.put(bytes(keypair))
+        total += WORKER_BATCH
+        progress_queue.put((worker_id, total, time.perf_counter() - started))
+
+
+class VanityGrinder:
+    """
+    Search for mint keypairs whose address matches a prefix and/or suffix.
+
+    The search runs in one process per core; each worker reports its keys/sec
+    so throughput can be monitored while grinding.
+    """
+    def __init__(self, prefix="", suffix="", case_sensitive=True, workers=None):
+        """
+        Initialize the grinder.
+
+        Args:
+            prefix (str): Required address prefix
+            suffix (str): Required address suffix (e.g. "pump")
+            case_sensitive (bool): Whether the match is case-sensitive
+            workers (int, optional): Number of worker processes (defaults to all cores)
+        """
+        if not prefix and not suffix:
+            raise ValueError("A prefix or a suffix is required")
+        validate_pattern(prefix, case_sensitive)
+        validate_pattern(suffix, case_sensitive)
+        self.prefix = prefix
+        self.suffix = suffix
+        self.case_sensitive = case_sensitive
+        self.workers = workers or os.cpu_count() or 1
+        self.worker_stats = {}
+
+    def keys_per_second(self):
+        """
+        Return per-worker and total grinding throughput.
+
+        Returns:
+            dict: {worker_id: keys/sec, ..., "total": keys/sec}
+        """
+        rates = {
+            worker_id: (total / elapsed if elapsed else 0.0)
+            for worker_id, (total, elapsed) in self.worker_stats.items()
+        }
+        rates["total"] = sum(rates.values())
+        return rates
+
+    def grind(self, count=1, timeout=None, on_found=None, on_progress=None, report_interval=2.0):
+        """
+        Grind until `count` matching keypairs are found or the timeout expires.
+
+        Args:
+            count (int): Number of keypairs to find
+            timeout (float, optional): Maximum seconds to search
+            on_found (callable, optional): Called with each Keypair as it is found
+            on_progress (callable, optional): Called with keys_per_second() every report_interval
+            report_interval (float): Seconds between progress callbacks
+
+        Returns:
+            list: Matching Keypair objects
+        """
+        stop_event = multiprocessing.Event()
+        found_queue = multiprocessing.Queue()
+        progress_queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_grind_worker,
+                args=(i, self.prefix, self.suffix, self.case_sensitive,
+                      stop_event, found_queue, progress_queue),
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        found = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        next_report = time.monotonic() + report_interval
+        try:
+            while len(found) < count:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                try:
+                    keypair = Keypair.from_bytes(found_queue.get(timeout=0.1))
+                    found.append(keypair)
+                    if on_found:
+                        on_found(keypair)
+                except queue.Empty:
+                    pass
+                self._drain_progress(progress_queue)
+                if on_progress and time.monotonic() >= next_report:
+                    on_progress(self.keys_per_second())
+                    next_report = time.monotonic() + report_interval
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._drain_progress(progress_queue)
+        return found
+
+    def _drain_progress(self, progress_queue):
+        while True:
+            try:
+                worker_id, total, elapsed = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.worker_stats[worker_id] = (total, elapsed)
+
+
+def _encode_secret(keypair):
+    return base64.b64encode(bytes(keypair)).decode("ascii")
+
+
+class KeyPool:
+    """
+    Encrypted on-disk pool of pre-ground mint keypairs.
+
+    Keys are encrypted with Fernet using a key derived from a passphrase
+    (scrypt). The launcher pops keys from the pool so vanity launches cost
+    nothing at launch time. Every read-modify-write of the pool file holds an
+    exclusive flock on a sidecar lock file, and reservations are stored in the
+    pool file, so grinders and launchers in different processes can share one
+    pool without losing keys or popping the same one twice.
+    """
+    def __init__(self, path=DEFAULT_POOL_PATH, passphrase=None, reservation_ttl=DEFAULT_RESERVATION_TTL):
+        """
+        Initialize the pool.
+
+        Args:
+            path (str): Pool file path (the lock file is path + ".lock")
+            passphrase (str, optional): Encryption passphrase (defaults to KEY_POOL_PASSPHRASE)
+            reservation_ttl (float): Seconds after which a key popped but never used or put back
+                is offered again
+        """
+        try:
+            from cryptography.fernet import Fernet  # noqa: F401
+        except ImportError:
+            raise ImportError("The key pool requires the 'cryptography' package: pip install cryptography")
+        passphrase = passphrase or os.getenv("KEY_POOL_PASSPHRASE")
+        if not passphrase:
+            raise ValueError("A passphrase is required (argument or KEY_POOL_PASSPHRASE)")
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.reservation_ttl = reservation_ttl
+        self._passphrase = passphrase.encode("utf-8")
+        self._lock = threading.Lock()
+        # scrypt is slow on purpose, so the key is derived once per salt
+        self._salt = None
+        self._fernet = None
+        # Decrypted keys of the last token read, so an unchanged file is not decrypted again
+        self._token = None
+        self._secrets = []
+
+    def _cipher(self, salt):
+        if salt != self._salt:
+            from cryptography.fernet import Fernet
+
+            key = hashlib.scrypt(self._passphrase, salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
+            self._salt, self._fernet = salt, Fernet(base64.urlsafe_b64encode(key))
+        return self._fernet
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # Threads of this process queue on the mutex, other processes on the flock
+        with self._lock:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)  # also releases the flock
+
+    def _load(self):
+        # Call with the lock held. Returns (secrets, reservations), both safe to modify.
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return [], {}
+        if stored["data"] != self._token:
+            salt = base64.b64decode(stored["salt"])
+            try:
+                plaintext = self._cipher(salt).decrypt(stored["data"].encode("ascii"))
+            except Exception:
+                raise ValueError(f"Unable to decrypt {self.path}: wrong passphrase or corrupted file")
+            self._token, self._secrets = stored["data"], json.loads(plaintext)
+        return list(self._secrets), dict(stored.get("reserved", {}))
+
+    def _save(self, secrets, reserved):
+        # Call with the lock held. Fernet adds a random IV per encryption, so the scrypt salt can be kept
+        salt = self._salt or os.urandom(16)
+        token = self._cipher(salt).encrypt(json.dumps(secrets).encode("utf-8")).decode("ascii")
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # Reserved addresses are public keys, so they are stored in the clear
+            json.dump({"version": 2, "salt": base64.b64encode(salt).decode("ascii"),
+                       "data": token, "reserved": reserved}, f)
+        os.replace(tmp_path, self.path)
+        self._token, self._secrets = token, list(secrets)
+
+    def _is_stale(self, reservation):
+        if time.time() - reservation["at"] > self.reservation_ttl:
+            return True
+        if reservation["host"] != socket.gethostname() or os.name != "posix":
+            return False
+        # A reservation held by a process that exited without releasing it
+        try:
+            os.kill(reservation["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def add(self, keypairs):
+        """
+        Add keypairs to the pool.
+
+        Args:
+            keypairs (list): Keypair objects to store
+        """
+        with self._locked():
+            secrets, reserved = self._load()
+            secrets.extend(_encode_secret(kp) for kp in keypairs)
+            self._save(secrets, reserved)
+
+    def pop(self, suffix="", prefix=""):
+        """
+        Reserve and return a keypair from the pool.
+
+        The key stays in the pool file, reserved for this process, until
+        mark_used() removes it or put_back() releases it, so a launch that
+        fails before it is sent keeps its key. Reservations of processes that
+        exited, or older than reservation_ttl, are offered again.
+
+        Args:
+            suffix (str, optional): Only consider keys whose address ends with this
+            prefix (str, optional): Only consider keys whose address starts with this
+
+        Returns:
+            Keypair: A stored keypair, or None if no matching key is left
+        """
+        with self._locked():
+            secrets, reserved = self._load()
+            reserved = {address: r for address, r in reserved.items() if not self._is_stale(r)}
+            for secret in secrets:
+                keypair = Keypair.from_bytes(base64.b64decode(secret))
+                address = str(keypair.pubkey())
+                if address in reserved or not (address.startswith(prefix) and address.endswith(suffix)):
+                    continue
+                reserved[address] = {"pid": os.getpid(), "host": socket.gethostname(), "at": time.time()}
+                self._save(secrets, reserved)
+                return keypair
+            return None
+
+    def mark_used(self, keypair):
+        """Remove a key returned by pop() from the pool file (no-op for keys not from the pool)."""
+        secret = _encode_secret(keypair)
+        with self._locked():
+            secrets, reserved = self._load()
+            if secret not in secrets:
+                return
+            reserved.pop(str(keypair.pubkey()), None)
+            self._save([s for s in secrets if s != secret], reserved)
+
+    def put_back(self, keypair):
+        """Make a key returned by pop() available again (no-op for keys not from the pool)."""
+        with self._locked():
+            secrets, reserved = self._load()
+            if reserved.pop(str(keypair.pubkey()), None) is not None:
+                self._save(secrets, reserved)
+
+    def addresses(self):
+        """Return the addresses of all keys in the pool."""
+        with self._locked():
+            secrets, _ = self._load()
+        return [str(Keypair.from_bytes(base64.b64decode(s)).pubkey()) for s in secrets]
+
+    def __len__(self):
+        with self._locked():
+            return len(self._load()[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grind vanity mint keypairs into an encrypted pool")
+    parser.add_argument("--prefix", default="", help="Required address prefix")
+    parser.add_argument("--suffix", default="", help="Required address suffix (e.g. pump)")
+    parser.add_argument("--ignore-case", action="store_true", help="Case-insensitive match")
+    parser.add_argument("-n", "--count", type=int, default=1, help="Number of keys to find")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--pool", default=DEFAULT_POOL_PATH, help="Encrypted key pool file")
+    args = parser.parse_args(argv)
+
+    passphrase = os.getenv("KEY_POOL_PASSPHRASE") or getpass.getpass("Key pool passphrase: ")
+    pool = KeyPool(args.pool, passphrase)
+    grinder = VanityGrinder(args.prefix, args.suffix, not args.ignore_case, args.workers)
+    print(f"Grinding with {grinder.workers} workers "
+          f"(~{expected_attempts(args.prefix, args.suffix, not args.ignore_case):,} keys per match)...")
+
+    def on_found(keypair):
+        pool.add([keypair])
+        print(f"Found: {keypair.pubkey()}")
+
+    def on_progress(rates):
+        per_worker = ", ".join(f"w{k}={v:,.0f}" for k, v in sorted(rates.items()) if k != "total")
+        print(f"{rates['total']:,.0f} keys/s ({per_worker})")
+
+    found = grinder.grind(args.count, args.timeout, on_found=on_found, on_progress=on_progress)
+    print(f"\n{len(found)} key(s) added, {len(pool)} in {args.pool}")
+    return 0 if len(found) == args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())